@@ -49,6 +49,7 @@ import fnmatch
 import owlready2
 
 from ontopy.ontology import World
+from ontopy.loadreport import LoadReport
 from ontopy.patch import get_preferred_label as get_label
 from ontopy import onto_path
 
@@ -1057,6 +1058,24 @@ def main(
             "check."
         ),
     )
+    parser.add_argument(
+        "--parallel",
+        metavar="N",
+        type=int,
+        help=(
+            "Parse the ontology and its imported ontologies in N processes. "
+            "Only applies to local files in formats not parsed by Owlready2, "
+            "like Turtle."
+        ),
+    )
+    parser.add_argument(
+        "--profile-load",
+        action="store_true",
+        help=(
+            "Print a report of the time spent in each phase of loading the "
+            "ontology and each of its imported ontologies to stderr."
+        ),
+    )
     parser.add_argument(
         "--local",
         "-l",
@@ -1198,11 +1217,16 @@ def main(
         )
 
     onto = world.get_ontology(args.iri)
+    report = LoadReport() if args.profile_load else None
     onto.load(
         only_local=args.local,
         url_from_catalog=args.url_from_catalog,
         catalog_file=args.catalog_file,
+        parallel=args.parallel,
+        report=report,
     )
+    if report:
+        print(report, file=sys.stderr)
 
     # Configure tests
     TestEMMOConventions.config = {}
@@ -19,7 +19,10 @@ from . import patch
 # Import World and get_ontology(), which are our main entry points
 from .ontology import World, get_ontology
 
+# Planning of loading an ontology and its imports
+from .loadplan import plan_load
+
 # Global list of ontology search paths
 from owlready2 import onto_path
 
-__all__ = ("__version__", "World", "get_ontology", "onto_path")
+__all__ = ("__version__", "World", "get_ontology", "onto_path", "plan_load")
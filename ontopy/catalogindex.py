@@ -0,0 +1,143 @@
+"""Persistent index of read catalog files.
+
+Reading the Protègè catalog files of a large repository parses every
+`catalog-v001.xml` with ElementTree, for every invocation of a tool.
+If the environment variable `ONTOPY_CACHE_DIR` is set, the result of
+reading local catalog files with `ontopy.utils.read_catalog()` (the
+IRI to location mappings and the set of directories) is stored in the
+`catalogs` sub-directory of the cache directory, together with the
+modification times of all catalog files that were read.
+
+The next time the same catalog is read with the same options, in the
+same or another process, the stored result is returned if none of the
+catalog files has a new modification time.  Results that depend on
+catalog files on the web are not stored.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ontopy.loadcache import get_cache_dir
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Optional, Set, Tuple, Union
+
+
+# Increment when the layout of index entries changes
+INDEX_FORMAT = 1
+
+
+def get_catalog_index(
+    directory: "Optional[Union[str, Path]]" = None,
+) -> "Optional[CatalogIndex]":
+    """Returns the catalog index.
+
+    Arguments:
+        directory: Index directory.  Defaults to the `catalogs`
+            sub-directory of `ONTOPY_CACHE_DIR`.
+
+    Returns:
+        The catalog index or None if caching is disabled.
+    """
+    if directory is None:
+        cache_dir = get_cache_dir()
+        if cache_dir is None:
+            return None
+        directory = cache_dir / "catalogs"
+    return CatalogIndex(directory)
+
+
+def mtime(path: str) -> "Optional[int]":
+    """Returns the modification time of `path` in nanoseconds or None if
+    it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class CatalogIndex:
+    """Persistent index of the results of reading catalog files.
+
+    Arguments:
+        directory: The index directory.  It is created if needed.
+    """
+
+    def __init__(self, directory: "Union[str, Path]"):
+        self.directory = Path(directory)
+
+    def key(self, path: str, **options) -> str:
+        """Returns the index key for reading the catalog at `path` with
+        the given keyword arguments to `read_catalog()`."""
+        data = {
+            "format": INDEX_FORMAT,
+            "path": os.path.abspath(path),
+            "options": {k: str(v) for k, v in sorted(options.items())},
+        }
+        text = json.dumps(data, sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def lookup(self, key: str) -> "Optional[Tuple[Dict[str, str], Set]]":
+        """Returns the `(iris, dirs)` tuple stored for `key` or None if
+        there is no valid entry.
+
+        An entry is valid if the modification times of all catalog files
+        it was read from are unchanged.
+        """
+        try:
+            with open(self._entry_file(key), "rt", encoding="utf8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        for path, stored in entry["files"].items():
+            if mtime(path) != stored:
+                return None
+        return entry["iris"], set(entry["dirs"])
+
+    def store(
+        self,
+        key: str,
+        iris: "Dict[str, str]",
+        dirs: "Iterable[str]",
+        files: "Iterable[str]",
+    ) -> None:
+        """Store the result of reading a catalog.
+
+        Arguments:
+            key: Index key returned by `key()`.
+            iris: Dict mapping IRIs to locations.
+            dirs: Directories of the catalog files.
+            files: Paths to all catalog files that were read.
+        """
+        entry = {
+            "iris": iris,
+            "dirs": sorted(dirs),
+            "files": {path: mtime(path) for path in files},
+        }
+        entry_file = self._entry_file(key)
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, such that concurrent processes
+        # never see incomplete entries
+        with tempfile.NamedTemporaryFile(
+            "wt",
+            dir=entry_file.parent,
+            prefix=".tmp",
+            suffix=".tmp",
+            delete=False,
+            encoding="utf8",
+        ) as handle:
+            json.dump(entry, handle, indent=2)
+        os.replace(handle.name, entry_file)
+
+    def clear(self) -> None:
+        """Remove all index entries."""
+        for entry_file in self.directory.glob("*.json"):
+            entry_file.unlink()
+
+    def _entry_file(self, key: str) -> Path:
+        """Returns the path to the index entry for `key`."""
+        return self.directory / f"{key}.json"
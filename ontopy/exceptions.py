@@ -49,6 +49,10 @@ class ReadCatalogError(IOError):
     """Error reading catalog file."""
 
 
+class MissingImportError(EMMOntoPyException):
+    """Raised when imported ontologies cannot be found."""
+
+
 class ExcelError(EMMOntoPyException):
     """Raised on errors in Excel file."""
 
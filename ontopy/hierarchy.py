@@ -0,0 +1,568 @@
+"""Index of the class hierarchy of a world.
+
+The `HierarchyIndex` class implemented in this module is owned by
+`ontopy.ontology.World` and available as `Ontology.hierarchy`.
+
+All named classes in the world are numbered and the direct
+`rdfs:subClassOf` relations between them are stored as parent and
+child adjacency lists in compressed sparse row (CSR) form.  The
+transitive closure of the hierarchy is stored as bitsets (Python
+integers), such that ancestor, descendant and subclass queries become
+bit operations.  Equivalent classes are treated like Owlready2 does,
+i.e. a class and its equivalent classes share their ancestors.
+
+The index is built lazily with a few queries against the quadstore.
+It is invalidated by the triple hooks installed by `World` when
+`rdfs:subClassOf`, `owl:equivalentClass` or class declarations
+change, and rebuilt the next time it is needed.  Queries about classes
+that are not in the index (like classes in other worlds) fall back to
+the corresponding Owlready2 methods.
+"""
+
+# pylint: disable=protected-access
+from array import array
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from owlready2 import Thing
+from owlready2.base import (
+    rdf_type,
+    rdfs_subclassof,
+    owl_class,
+    owl_equivalentclass,
+    owl_thing,
+)
+
+from ontopy.labelindex import RDFS_CLASS
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+    from owlready2 import ThingClass
+
+    from ontopy.ontology import World
+
+
+def iterbits(bits: int) -> "Iterator[int]":
+    """Yield the positions of the set bits in the integer `bits`."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _csr(edges: "Dict[int, List[int]]", size: int):
+    """Returns adjacency lists `edges` mapping node number to list of
+    node numbers in CSR form, i.e. as a (indptr, indices) tuple."""
+    indptr = array("l", [0])
+    indices = array("l")
+    for node in range(size):
+        indices.extend(edges.get(node, ()))
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+class HierarchyIndex:
+    """Index of the class hierarchy of a world.
+
+    Arguments:
+        world: The world to index.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, world: "World"):
+        self.world = world
+        self.version = 0  # incremented each time the index is invalidated
+        self._valid = False
+        self.storids = array("q")  # maps node number to storid
+        self.numbers = {}  # maps storid to node number
+        self.parents_indptr = self.parents_indices = None
+        self.children_indptr = self.children_indices = None
+        self._ancestors = []  # ancestor bitsets, including self
+        self._strict = []  # ancestor bitsets, excluding self
+        self._descendants = None  # descendant bitsets, built on demand
+        self._class_types = ()  # storids of owl:Class and rdfs:Class
+        self._distances = {}  # maps (node, ancestor) to generations
+        self._mros = {}  # maps node to (MRO positions, MRO length)
+
+    def invalidate(self) -> None:
+        """Mark the index as invalid.  It will be rebuilt on next use."""
+        self.version += 1
+        self._valid = False
+        self.storids = array("q")
+        self.numbers = {}
+        self.parents_indptr = self.parents_indices = None
+        self.children_indptr = self.children_indices = None
+        self._ancestors = []
+        self._strict = []
+        self._descendants = None
+        self._distances = {}
+        self._mros = {}
+
+    def obj_triples_changed(self, p: "Optional[int]", o: "Optional[int]"):
+        """Invalidate the index if object triples with predicate `p` and
+        object `o` that may affect the hierarchy have been changed.
+        None means any predicate or object."""
+        # pylint: disable=invalid-name
+        if not self._valid:
+            return
+        if p in (None, rdfs_subclassof, owl_equivalentclass) or (
+            p == rdf_type and (o is None or o in self._class_types)
+        ):
+            self.invalidate()
+
+    def update(self) -> None:
+        """Make sure that the index is valid."""
+        if not self._valid:
+            self._build()
+            self._valid = True
+
+    def _build(self) -> None:
+        """Build the index from the quadstore."""
+        # pylint: disable=too-many-locals,too-many-branches
+        execute = self.world.graph.execute
+        types = [owl_class]
+        rdfs_class = self.world._abbreviate(RDFS_CLASS, False)
+        if rdfs_class:
+            types.append(rdfs_class)
+        self._class_types = tuple(types)
+
+        nodes = {owl_thing}
+        sql = (
+            "SELECT DISTINCT s FROM objs WHERE p=? AND s>0 "
+            f"AND o IN ({','.join('?' * len(types))})"
+        )
+        nodes.update(s for (s,) in execute(sql, (rdf_type, *types)))
+        subclassof = set(
+            execute(
+                "SELECT DISTINCT s, o FROM objs WHERE p=? AND s>0 AND o>0",
+                (rdfs_subclassof,),
+            )
+        )
+        equivalents = set(
+            execute(
+                "SELECT DISTINCT s, o FROM objs WHERE p=? AND s>0 AND o>0",
+                (owl_equivalentclass,),
+            )
+        )
+        for edges in (subclassof, equivalents):
+            for s, o in edges:
+                nodes.add(s)
+                nodes.add(o)
+
+        self.storids = array("q", sorted(nodes))
+        self.numbers = numbers = {s: i for i, s in enumerate(self.storids)}
+        size = len(self.storids)
+        thing = numbers[owl_thing]
+
+        # Direct parents, with owl:Thing as implicit parent
+        parents = {}
+        for s, o in subclassof:
+            if s != o:
+                parents.setdefault(numbers[s], []).append(numbers[o])
+        for node in range(size):
+            if node != thing and node not in parents:
+                parents[node] = [thing]
+        children = {}
+        for node, nodeparents in parents.items():
+            for parent in nodeparents:
+                children.setdefault(parent, []).append(node)
+        self.parents_indptr, self.parents_indices = _csr(parents, size)
+        self.children_indptr, self.children_indices = _csr(children, size)
+
+        # Edges used for the transitive closure.  Equivalent classes
+        # are connected in both directions.
+        up = {node: list(nodeparents) for node, nodeparents in parents.items()}
+        for s, o in equivalents:
+            up.setdefault(numbers[s], []).append(numbers[o])
+            up.setdefault(numbers[o], []).append(numbers[s])
+
+        ancestors = [0] * size
+        for component in _strongly_connected_components(up, size):
+            bits = 0
+            for node in component:
+                bits |= 1 << node
+            for node in component:
+                for parent in up.get(node, ()):
+                    bits |= ancestors[parent]
+            for node in component:
+                ancestors[node] = bits
+
+        strict = [0] * size
+        for node in range(size):
+            bits = 0
+            for parent in self._parent_numbers(node):
+                bits |= ancestors[parent]
+            strict[node] = bits
+        self._ancestors = ancestors
+        self._strict = strict
+        self._descendants = None
+
+    def _parent_numbers(self, node: int) -> "array":
+        """Returns the node numbers of the direct parents of `node`."""
+        return self.parents_indices[
+            self.parents_indptr[node] : self.parents_indptr[node + 1]
+        ]
+
+    def _child_numbers(self, node: int) -> "array":
+        """Returns the node numbers of the direct children of `node`."""
+        return self.children_indices[
+            self.children_indptr[node] : self.children_indptr[node + 1]
+        ]
+
+    def _descendant_bits(self) -> "List[int]":
+        """Returns list of descendant bitsets, including self."""
+        if self._descendants is None:
+            descendants = [0] * len(self.storids)
+            for node, bits in enumerate(self._ancestors):
+                for ancestor in iterbits(bits):
+                    descendants[ancestor] |= 1 << node
+            self._descendants = descendants
+        return self._descendants
+
+    def number(self, cls: "ThingClass") -> "Optional[int]":
+        """Returns the node number of `cls` or None if `cls` is not
+        in the index."""
+        self.update()
+        if getattr(cls, "namespace", None) is None:
+            return None
+        if cls.namespace.world is not self.world and cls.storid != owl_thing:
+            return None
+        return self.numbers.get(cls.storid)
+
+    def entities(self, bits: int) -> "Set[ThingClass]":
+        """Returns the set of classes corresponding to bitset `bits`."""
+        get = self.world._get_by_storid
+        storids = self.storids
+        return {get(storids[node]) for node in iterbits(bits)}
+
+    def bits(self, classes: "Iterable[ThingClass]") -> int:
+        """Returns a bitset for the indexed classes in `classes`."""
+        bits = 0
+        for cls in classes:
+            node = self.number(cls)
+            if node is not None:
+                bits |= 1 << node
+        return bits
+
+    def ancestor_bits(self, cls: "ThingClass", include_self=True) -> int:
+        """Returns the ancestors of `cls` as a bitset.
+
+        Raises KeyError if `cls` is not in the index.
+        """
+        node = self.number(cls)
+        if node is None:
+            raise KeyError(cls)
+        return self._ancestors[node] if include_self else self._strict[node]
+
+    def descendant_bits(self, cls: "ThingClass", include_self=True) -> int:
+        """Returns the descendants of `cls` as a bitset.
+
+        Raises KeyError if `cls` is not in the index.
+        """
+        node = self.number(cls)
+        if node is None:
+            raise KeyError(cls)
+        bits = self._descendant_bits()[node]
+        return bits if include_self else bits & ~(1 << node)
+
+    def ancestors(
+        self, cls: "ThingClass", include_self: bool = True
+    ) -> "Set[ThingClass]":
+        """Returns the set of ancestors of `cls`.
+
+        Like `cls.ancestors()`, equivalent classes and their ancestors
+        are included.
+        """
+        try:
+            return self.entities(self.ancestor_bits(cls, include_self))
+        except KeyError:
+            return cls.ancestors(include_self=include_self)
+
+    def descendants(
+        self, cls: "ThingClass", include_self: bool = True
+    ) -> "Set[ThingClass]":
+        """Returns the set of descendants of `cls`.
+
+        Like `cls.descendants()`, equivalent classes and their
+        descendants are included.
+        """
+        try:
+            return self.entities(self.descendant_bits(cls, include_self))
+        except KeyError:
+            return cls.descendants(include_self=include_self)
+
+    def parents(
+        self, cls: "ThingClass", strict: bool = False
+    ) -> "Set[ThingClass]":
+        """Returns the set of direct parents of `cls`.
+
+        If `strict` is true, parents that are ancestors of other parents
+        are excluded.
+        """
+        node = self.number(cls)
+        if node is None:
+            return cls.get_parents(strict=strict)
+        parents = self._parent_numbers(node)
+        bits = 0
+        for parent in parents:
+            bits |= 1 << parent
+        if strict:
+            for parent in parents:
+                bits &= ~self._strict[parent]
+        return self.entities(bits)
+
+    def children(self, cls: "ThingClass") -> "Set[ThingClass]":
+        """Returns the set of direct children of `cls`."""
+        node = self.number(cls)
+        if node is None:
+            return set(cls.subclasses())
+        bits = 0
+        for child in self._child_numbers(node):
+            bits |= 1 << child
+        return self.entities(bits)
+
+    def distance(self, descendant: "ThingClass", ancestor: "ThingClass") -> int:
+        """Returns the shortest number of generations from `ancestor`
+        down to `descendant`.
+
+        The distance is found with a breadth-first search upwards from
+        `descendant`, only following parents that have `ancestor` among
+        their ancestors.  Like the original recursive implementation of
+        `Ontology.number_of_generations()`, the search also ends at
+        classes that only reach `ancestor` via equivalent classes.
+        Results are cached until the hierarchy changes.
+
+        Raises KeyError if any of the classes are not in the index and
+        ValueError if `ancestor` is not an ancestor of `descendant`.
+        """
+        node = self.number(descendant)
+        target = self.number(ancestor)
+        if node is None or target is None:
+            raise KeyError(descendant if node is None else ancestor)
+        return self._distance(node, target)
+
+    def _distance(self, node: int, target: int) -> int:
+        """Returns the number of generations between node numbers `node`
+        and `target`.  See distance()."""
+        key = (node, target)
+        if key in self._distances:
+            return self._distances[key]
+        ancestors = self._ancestors
+        if not ancestors[node] >> target & 1:
+            raise ValueError("Descendant is not a descendant of ancestor")
+
+        generations = 0
+        frontier = [node]
+        visited = {node}
+        while frontier:
+            following = []
+            for current in frontier:
+                parents = [
+                    parent
+                    for parent in self._parent_numbers(current)
+                    if ancestors[parent] >> target & 1
+                ]
+                if current == target or not parents:
+                    self._distances[key] = generations
+                    return generations
+                for parent in parents:
+                    if parent not in visited:
+                        visited.add(parent)
+                        following.append(parent)
+            frontier = following
+            generations += 1
+        # Only reached for cyclic subclass relations
+        self._distances[key] = generations
+        return generations
+
+    def depth(self, cls: "ThingClass") -> int:
+        """Returns the number of generations from owl:Thing down to `cls`.
+
+        Raises KeyError if `cls` is not in the index.
+        """
+        return self.distance(cls, Thing)
+
+    def mro_positions(self, node: int) -> "Tuple[Dict[int, int], int]":
+        """Returns the method resolution order of the class with node
+        number `node` as a `(positions, length)` tuple, where `positions`
+        maps the node numbers of the indexed classes in the MRO to their
+        position and `length` is the total length of the MRO.
+
+        The MRO is what `Ontology.closest_common_ancestor()` walks.  It is
+        cached until the hierarchy changes.
+        """
+        if node not in self._mros:
+            mro = self.world._get_by_storid(self.storids[node]).mro()
+            positions = {}
+            for position, cls in enumerate(mro):
+                number = self.number(cls)
+                if number is not None:
+                    positions.setdefault(number, position)
+            self._mros[node] = (positions, len(mro))
+        return self._mros[node]
+
+    def closest_common_ancestor(
+        self, *classes: "ThingClass"
+    ) -> "Optional[ThingClass]":
+        """Returns the closest common ancestor of `classes` as found by
+        `Ontology.closest_common_ancestor()`, or None if it cannot be
+        determined from the index."""
+        nodes = [self.number(cls) for cls in classes]
+        if not nodes or None in nodes:
+            return None
+        node = self._closest_common_ancestor(nodes)
+        if node is None:
+            return None
+        return self.world._get_by_storid(self.storids[node])
+
+    def _closest_common_ancestor(self, nodes: "List[int]") -> "Optional[int]":
+        """Returns the node number of the closest common ancestor of
+        `nodes`, or None if it cannot be determined from the index.
+
+        `Ontology.closest_common_ancestor()` pops one element from each
+        MRO in turn and returns the first class that has been popped from
+        all MROs.  The order of the pops only depends on the lengths of
+        the MROs, so the class is selected from the cached MRO positions
+        of the common ancestors.  None is returned if an MRO contains
+        classes that are not in the index before owl:Thing.
+        """
+        thing = self.numbers[owl_thing]
+        mros = [self.mro_positions(node) for node in nodes]
+        for positions, _ in mros:
+            if positions.get(thing, len(positions)) >= len(positions):
+                return None
+        times = _pop_times(tuple(length for _, length in mros))
+        # The positions are in MRO order, so the candidates can be
+        # visited in the order they are popped from the first MRO
+        best, best_node = sum(map(len, times)), None
+        for anc, position in mros[0][0].items():
+            if times[0][position] >= best:
+                break
+            time = times[0][position]
+            for i in range(1, len(mros)):
+                position = mros[i][0].get(anc)
+                if position is None:
+                    break
+                time = max(time, times[i][position])
+            else:
+                if time < best:
+                    best, best_node = time, anc
+        return best_node
+
+    def descendant_count(self, node: int) -> int:
+        """Returns the number of descendants, including itself, of the
+        class with node number `node`."""
+        return bin(self._descendant_bits()[node]).count("1")
+
+    def issubclass(self, cls: "ThingClass", parent: "ThingClass") -> bool:
+        """Returns true if `parent` is an ancestor of, or equal to, `cls`."""
+        node = self.number(cls)
+        other = self.number(parent)
+        if node is None or other is None:
+            return parent in cls.ancestors()
+        return bool(self._ancestors[node] >> other & 1)
+
+    def is_root(self, cls: "ThingClass") -> bool:
+        """Returns true if `cls` has no other ancestors than itself and
+        owl:Thing."""
+        node = self.number(cls)
+        if node is None:
+            return not cls.ancestors().difference({cls, Thing})
+        mask = 1 << node | 1 << self.numbers[owl_thing]
+        return not self._ancestors[node] & ~mask
+
+
+@lru_cache(maxsize=1024)
+def _pop_times(lengths: "Tuple[int, ...]") -> "List[List[int]]":
+    """Returns a list with, for each of a set of lists with the given
+    `lengths`, the step at which each element is popped by the
+    round-robin walk in `Ontology.closest_common_ancestor()`.
+
+    Like the walk, a list following a list that is exhausted is skipped
+    in that round.
+    """
+    times = [[0] * length for length in lengths]
+    active = [i for i, length in enumerate(lengths) if length]
+    positions = [0] * len(lengths)
+    step = 0
+    while active:
+        index = 0
+        while index < len(active):
+            i = active[index]
+            times[i][positions[i]] = step
+            step += 1
+            positions[i] += 1
+            if positions[i] == lengths[i]:
+                del active[index]
+            index += 1
+    return times
+
+
+def _strongly_connected_components(
+    edges: "Dict[int, List[int]]", size: int
+) -> "Iterator[List[int]]":
+    """Yield the strongly connected components of the graph with nodes
+    `0..size-1` and adjacency lists `edges`.
+
+    This is an iterative version of Tarjan's algorithm.  A component is
+    yielded after all components reachable from it.
+    """
+    index = [-1] * size
+    lowlink = [0] * size
+    onstack = [False] * size
+    stack = []
+    counter = 0
+    for root in range(size):
+        if index[root] >= 0:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        onstack[root] = True
+        while work:
+            node, successors = work[-1]
+            succ = _next_unvisited(node, successors, index, lowlink, onstack)
+            if succ is not None:
+                index[succ] = lowlink[succ] = counter
+                counter += 1
+                stack.append(succ)
+                onstack[succ] = True
+                work.append((succ, iter(edges.get(succ, ()))))
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    onstack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                yield component
+
+
+def _next_unvisited(
+    node: int,
+    successors: "Iterator[int]",
+    index: "List[int]",
+    lowlink: "List[int]",
+    onstack: "List[bool]",
+) -> "Optional[int]":
+    """Help function for `_strongly_connected_components()` that advances
+    `successors` of `node` to the next unvisited node and returns it, or
+    None if all successors have been visited.
+
+    The lowlink of `node` is updated for visited successors on the stack.
+    """
+    for succ in successors:
+        if index[succ] < 0:
+            return succ
+        if onstack[succ]:
+            lowlink[node] = min(lowlink[node], index[succ])
+    return None
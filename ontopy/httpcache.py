@@ -0,0 +1,452 @@
+"""Local cache of ontologies and catalog files downloaded over the web.
+
+The cache is enabled by setting the environment variable
+`ONTOPY_HTTP_CACHE_DIR` to a directory.  If it is not set, but
+`ONTOPY_CACHE_DIR` is (see `ontopy.loadcache`), the `http`
+sub-directory of the latter is used.  When enabled, it is used by
+`Ontology.load()`, `read_catalog()` and `convert_imported()` for all
+web locations.
+
+Downloaded content is stored under its SHA-256 hash in the `objects`
+sub-directory, such that identical content served from different URLs
+is only stored once.  For each URL, a small JSON file in the `index`
+sub-directory records the hash of its content, the response headers
+and when it was fetched.
+
+A cached URL is considered fresh for `ONTOPY_HTTP_CACHE_TTL` seconds
+(default one day).  After that it is revalidated with the `ETag` and
+`Last-Modified` headers of the cached response, such that unchanged
+content is not downloaded again.  If the server cannot be reached, the
+cached copy is used with a warning.  Setting `ONTOPY_OFFLINE=1` never
+accesses the network and only serves cached content.
+
+The cache can be inspected and maintained with `ontokit cache`.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import threading
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError, URLError
+
+import requests
+
+from ontopy.loadcache import CACHE_DIR_ENV, sha256
+
+if TYPE_CHECKING:
+    from typing import BinaryIO, Iterator, Mapping, Optional, Tuple, Union
+
+    import rdflib
+
+
+HTTP_CACHE_DIR_ENV = "ONTOPY_HTTP_CACHE_DIR"
+HTTP_CACHE_TTL_ENV = "ONTOPY_HTTP_CACHE_TTL"
+OFFLINE_ENV = "ONTOPY_OFFLINE"
+
+# Number of seconds a cached response is used without revalidation
+DEFAULT_TTL = 24 * 3600
+
+# Timeout in seconds for web requests
+TIMEOUT = 60
+
+# Default number of concurrent downloads of a DownloadPool
+DOWNLOAD_WORKERS = 8
+
+WEB_PROTOCOLS = ("http://", "https://", "ftp://")
+
+# Thread-local storage for the requests sessions
+_local = threading.local()
+
+
+def get_http_cache(
+    directory: "Optional[Union[str, Path]]" = None,
+    ttl: "Optional[float]" = None,
+    offline: "Optional[bool]" = None,
+) -> "Optional[HTTPCache]":
+    """Returns the HTTP cache configured by the environment.
+
+    Arguments:
+        directory: Cache directory.  Defaults to the value of the
+            `ONTOPY_HTTP_CACHE_DIR` environment variable or the `http`
+            sub-directory of `ONTOPY_CACHE_DIR`.
+        ttl: Number of seconds cached content is used without
+            revalidation.  Defaults to `ONTOPY_HTTP_CACHE_TTL` or one day.
+        offline: Whether to never access the network.  Defaults to true
+            if `ONTOPY_OFFLINE` is set to "1", "true" or "yes".
+
+    Returns:
+        The HTTP cache or None if caching is disabled.
+    """
+    if directory is None:
+        directory = os.environ.get(HTTP_CACHE_DIR_ENV)
+    if not directory and os.environ.get(CACHE_DIR_ENV):
+        directory = Path(os.environ[CACHE_DIR_ENV]).expanduser() / "http"
+    if not directory:
+        return None
+    if ttl is None:
+        ttl = float(os.environ.get(HTTP_CACHE_TTL_ENV, DEFAULT_TTL))
+    if offline is None:
+        offline = os.environ.get(OFFLINE_ENV, "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+    return HTTPCache(directory, ttl=ttl, offline=offline)
+
+
+def urlretrieve(url: str, filename: str) -> "Tuple[str, Message]":
+    """Like `urllib.request.urlretrieve()`, but uses the HTTP cache if
+    it is enabled.
+
+    Returns:
+        A `(filename, headers)` tuple.
+    """
+    cache = get_http_cache()
+    if cache is None:
+        _, headers = download(url, filename)
+        return filename, _message(headers)
+    return cache.urlretrieve(url, filename)
+
+
+def download(
+    url: str, filename: str, headers: "Optional[dict]" = None
+) -> "Tuple[str, dict]":
+    """Download `url` to `filename`.
+
+    HTTP(S) requests are made with a `requests.Session` shared by all
+    requests from the current thread, such that connections are kept
+    alive and reused.
+
+    Arguments:
+        url: The URL to download.
+        filename: Name of the file to write the content to.
+        headers: Additional request headers.
+
+    Returns:
+        A `(final_url, headers)` tuple with the URL after redirections and
+        the response headers.
+
+    Raises:
+        urllib.error.HTTPError: For responses with status 300 or larger,
+            including 304 (not modified).
+        urllib.error.URLError: If the server cannot be reached.
+    """
+    if not url.startswith(("http://", "https://")):
+        request = urllib.request.Request(url, headers=headers or {})
+        # The URL can only contain the schemes from `WEB_PROTOCOLS`.
+        try:
+            with urllib.request.urlopen(  # nosec
+                request, timeout=TIMEOUT
+            ) as response, open(filename, "wb") as handle:
+                shutil.copyfileobj(response, handle)
+                return response.geturl(), dict(response.headers.items())
+        except URLError:
+            raise
+        except OSError as exc:  # e.g. timeouts
+            raise URLError(exc) from exc
+
+    try:
+        with get_session().get(
+            url, headers=headers, timeout=TIMEOUT, stream=True
+        ) as response:
+            if response.status_code >= 300:
+                raise HTTPError(
+                    response.url,
+                    response.status_code,
+                    response.reason,
+                    _message(response.headers),
+                    None,
+                )
+            with open(filename, "wb") as handle:
+                for block in response.iter_content(1 << 20):
+                    handle.write(block)
+            return response.url, dict(response.headers.items())
+    except requests.RequestException as exc:
+        raise URLError(exc) from exc
+
+
+def get_session() -> "requests.Session":
+    """Returns the `requests.Session` for the current thread."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _message(headers: "Mapping[str, str]") -> Message:
+    """Returns `headers` as an `email.message.Message`, like the headers
+    returned by urllib."""
+    message = Message()
+    for name, value in headers.items():
+        message[name] = value
+    return message
+
+
+def parse_graph(graph: "rdflib.Graph", source: str, **kwargs) -> "rdflib.Graph":
+    """Parse `source` into rdflib graph `graph`.
+
+    If `source` is a web location and the HTTP cache is enabled, it is
+    parsed from the cache.  Additional keyword arguments are passed to
+    `rdflib.Graph.parse()`.
+    """
+    source = str(source)
+    cache = get_http_cache()
+    if cache is not None and source.startswith(WEB_PROTOCOLS):
+        kwargs.setdefault("publicID", source)
+        source = str(cache.fetch(source))
+    return graph.parse(source, **kwargs)
+
+
+class DownloadPool:
+    """Downloads URLs concurrently in a pool of threads.
+
+    Each thread reuses its connections (see `download()`) and the HTTP
+    cache is used if it is enabled.  The downloaded files are stored in
+    a temporary directory, which is removed by `close()`.  The pool is
+    typically used as a context manager.
+
+    Arguments:
+        filename: Name of the downloaded files.
+        max_workers: Maximum number of concurrent downloads.
+    """
+
+    def __init__(self, filename: str, max_workers: int = DOWNLOAD_WORKERS):
+        self.filename = filename
+        self.max_workers = max_workers
+        self.futures = {}
+        self._executor = None
+        self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, url: str) -> None:
+        """Start downloading `url`, unless it is already submitted."""
+        if url in self.futures:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            self._tmpdir = tempfile.mkdtemp()
+        dest = Path(self._tmpdir) / str(len(self.futures)) / self.filename
+        dest.parent.mkdir()
+        self.futures[url] = self._executor.submit(urlretrieve, url, str(dest))
+
+    def result(self, url: str) -> "Optional[Tuple[str, Message]]":
+        """Wait for the download of `url`, which is submitted if needed.
+
+        Returns:
+            A `(filename, headers)` tuple or None if `url` could not be
+            downloaded.
+        """
+        self.submit(url)
+        try:
+            return self.futures[url].result()
+        except URLError:
+            return None
+
+    def close(self) -> None:
+        """Cancel pending downloads and remove the downloaded files."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._executor = self._tmpdir = None
+        self.futures.clear()
+
+
+class HTTPCache:
+    """Content-addressed cache of web resources.
+
+    Arguments:
+        directory: The cache directory.  It is created if needed.
+        ttl: Number of seconds cached content is used without
+            revalidation.
+        offline: Whether to only serve cached content.
+    """
+
+    def __init__(
+        self,
+        directory: "Union[str, Path]",
+        ttl: float = DEFAULT_TTL,
+        offline: bool = False,
+    ):
+        self.directory = Path(directory).expanduser()
+        self.ttl = ttl
+        self.offline = offline
+
+    def fetch(self, url: str) -> Path:
+        """Returns the path to a local copy of `url`.
+
+        The content is downloaded if it is not cached and revalidated if
+        the cached copy is older than `ttl` seconds.
+
+        Raises:
+            urllib.error.URLError: If `url` cannot be downloaded and is not
+                cached.  An `HTTPError` is raised for error responses.
+        """
+        entry = self.lookup(url)
+        if entry is not None and (
+            self.offline or time.time() - entry["fetched"] < self.ttl
+        ):
+            return self._object_file(entry["sha256"])
+        if self.offline:
+            raise URLError(f"not in the HTTP cache (offline mode): {url}")
+
+        headers = {}
+        if entry is not None:
+            # Header names are case-insensitive
+            cached = requests.structures.CaseInsensitiveDict(entry["headers"])
+            if "ETag" in cached:
+                headers["If-None-Match"] = cached["ETag"]
+            if "Last-Modified" in cached:
+                headers["If-Modified-Since"] = cached["Last-Modified"]
+        objects = self.directory / "objects"
+        objects.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=objects, prefix=".tmp", delete=False
+        ) as handle:
+            pass
+        try:
+            final_url, response_headers = download(url, handle.name, headers)
+        except HTTPError as exc:
+            os.remove(handle.name)
+            if entry is None or not (exc.code == 304 or exc.code >= 500):
+                raise
+            if exc.code == 304:  # not modified
+                entry["fetched"] = time.time()
+                self._write_entry(entry)
+            else:
+                warnings.warn(
+                    f"Cannot revalidate {url} ({exc}), using cached copy"
+                )
+            return self._object_file(entry["sha256"])
+        except URLError as exc:
+            os.remove(handle.name)
+            if entry is None:
+                raise
+            warnings.warn(f"Cannot revalidate {url} ({exc}), using cached copy")
+            return self._object_file(entry["sha256"])
+        return self._store(url, handle.name, final_url, response_headers)
+
+    def open(self, url: str) -> "BinaryIO":
+        """Returns a binary file object with the content of `url`."""
+        return open(self.fetch(url), "rb")
+
+    def urlretrieve(self, url: str, filename: str) -> "Tuple[str, Message]":
+        """Copy the content of `url` to `filename`.
+
+        Returns:
+            A `(filename, headers)` tuple, like `urllib.request.urlretrieve()`.
+        """
+        shutil.copyfile(self.fetch(url), filename)
+        return filename, _message(self.lookup(url)["headers"])
+
+    def lookup(self, url: str) -> "Optional[dict]":
+        """Returns the index entry for `url` or None if it is not cached."""
+        try:
+            with open(self._entry_file(url), "rt", encoding="utf8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not self._object_file(entry["sha256"]).exists():
+            return None
+        return entry
+
+    def entries(self) -> "Iterator[dict]":
+        """Iterate over all index entries."""
+        for path in sorted(self.directory.glob("index/*.json")):
+            try:
+                with open(path, "rt", encoding="utf8") as handle:
+                    yield json.load(handle)
+            except (OSError, ValueError):
+                continue
+
+    def remove(self, url: str) -> bool:
+        """Remove `url` from the cache.  Returns true if it was cached.
+
+        The content is removed by the next call to `prune()`.
+        """
+        try:
+            os.remove(self._entry_file(url))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def prune(self, max_age: "Optional[float]" = None) -> int:
+        """Remove entries fetched more than `max_age` seconds ago and all
+        content that is no longer referenced.
+
+        Returns:
+            The number of removed entries.
+        """
+        removed = 0
+        referenced = set()
+        for entry in list(self.entries()):
+            if max_age is not None and time.time() - entry["fetched"] > max_age:
+                removed += self.remove(entry["url"])
+            else:
+                referenced.add(entry["sha256"])
+        for path in self.directory.glob("objects/*"):
+            # Skip temporary files of ongoing downloads
+            if not path.name.startswith(".") and path.name not in referenced:
+                path.unlink()
+        return removed
+
+    def clear(self) -> None:
+        """Remove all content of the cache."""
+        shutil.rmtree(self.directory / "index", ignore_errors=True)
+        shutil.rmtree(self.directory / "objects", ignore_errors=True)
+
+    def _store(
+        self, url: str, filename: str, final_url: str, headers: dict
+    ) -> Path:
+        """Move downloaded file `filename` into the cache."""
+        digest = sha256(filename)
+        object_file = self._object_file(digest)
+        os.replace(filename, object_file)
+        self._write_entry(
+            {
+                "url": url,
+                "final_url": final_url,
+                "sha256": digest,
+                "size": object_file.stat().st_size,
+                "fetched": time.time(),
+                "headers": headers,
+            }
+        )
+        return object_file
+
+    def _write_entry(self, entry: dict) -> None:
+        """Atomically write index entry."""
+        entry_file = self._entry_file(entry["url"])
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wt",
+            dir=entry_file.parent,
+            prefix=".tmp",
+            suffix=".tmp",
+            delete=False,
+            encoding="utf8",
+        ) as handle:
+            json.dump(entry, handle, indent=2)
+        os.replace(handle.name, entry_file)
+
+    def _entry_file(self, url: str) -> Path:
+        """Returns the path to the index entry for `url`."""
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / "index" / f"{key}.json"
+
+    def _object_file(self, digest: str) -> Path:
+        """Returns the path to the content with the given hash."""
+        return self.directory / "objects" / digest
@@ -0,0 +1,519 @@
+"""Index for fast lookup of entities by label.
+
+The `LabelIndex` class implemented in this module is owned by
+`ontopy.ontology.World` and used by `Ontology.get_by_label()` and
+`Ontology.get_by_label_all()`.
+
+The index maps label literals to the storids of the entities
+annotated with them and the name-part of the IRI of declared entities
+to their storids.  It is built lazily with a single query against
+the quadstore and then kept up to date incrementally by the triple
+hooks that `World` installs on itself and its ontologies.  Changes
+that bypass these hooks (like parsing a new ontology) invalidate the
+index, which is then rebuilt the next time it is needed.
+"""
+
+# pylint: disable=protected-access
+import re
+from bisect import bisect_left, insort
+from collections import OrderedDict, defaultdict
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING
+
+from owlready2.base import (
+    rdf_type,
+    owl_class,
+    owl_named_individual,
+    owl_object_property,
+    owl_data_property,
+    owl_annotation_property,
+)
+
+if TYPE_CHECKING:
+    from typing import Hashable, Iterable, Iterator, Optional, Set
+
+    from ontopy.ontology import World
+
+
+RDFS_CLASS = "http://www.w3.org/2000/01/rdf-schema#Class"
+
+# Storids of the types whose instances are listed by
+# Ontology.get_entities().  rdfs:Class is not a universal
+# abbreviation in Owlready2 and is resolved per world.
+ENTITY_TYPES = {
+    owl_class,
+    owl_named_individual,
+    owl_object_property,
+    owl_data_property,
+    owl_annotation_property,
+}
+
+
+def iri_name(iri: str) -> str:
+    """Returns the name-part of `iri`, i.e. the part after the last
+    slash (/) or hash (#)."""
+    return iri[max(iri.rfind("#"), iri.rfind("/")) + 1 :]
+
+
+class GlobIndex:
+    """A set of strings that can be searched with glob patterns.
+
+    Patterns starting with a literal prefix, like "Atom*", are answered
+    with a range scan over the sorted strings.  Other patterns, like
+    "*Atom" or "?tom", use a trigram index of the strings, provided
+    that the pattern contains a literal part of at least three
+    characters.  Only patterns without any literal part require a full
+    scan.
+
+    The sorted list and the trigram index are built on first use and
+    then updated incrementally.
+
+    Arguments:
+        keys: Initial strings in the set.
+    """
+
+    def __init__(self, keys: "Iterable[str]" = ()):
+        self._keys = set(keys)
+        self._sorted = None
+        self._trigrams = None
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self) -> None:
+        """Remove all strings."""
+        self._keys.clear()
+        self._sorted = None
+        self._trigrams = None
+
+    def add(self, key: str) -> None:
+        """Add string `key`."""
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        if self._sorted is not None:
+            insort(self._sorted, key)
+        if self._trigrams is not None:
+            for trigram in _trigrams(key):
+                self._trigrams[trigram].add(key)
+
+    def discard(self, key: str) -> None:
+        """Remove string `key` if present."""
+        if key not in self._keys:
+            return
+        self._keys.discard(key)
+        if self._sorted is not None:
+            del self._sorted[bisect_left(self._sorted, key)]
+        if self._trigrams is not None:
+            for trigram in _trigrams(key):
+                self._trigrams[trigram].discard(key)
+
+    def match(self, pattern: str) -> "Iterator[str]":
+        """Yield all strings matching glob pattern `pattern`.
+
+        The pattern syntax is the one of `fnmatch.fnmatchcase()`.
+        """
+        match = _SPECIAL.search(pattern)
+        if not match:
+            if pattern in self._keys:
+                yield pattern
+        elif match.start():
+            yield from self._match_prefix(pattern[: match.start()], pattern)
+        else:
+            for key in self._candidates(pattern):
+                if fnmatchcase(key, pattern):
+                    yield key
+
+    def _match_prefix(self, prefix: str, pattern: str) -> "Iterator[str]":
+        """Yield all strings starting with `prefix` that match `pattern`,
+        using the sorted list of strings."""
+        if self._sorted is None:
+            self._sorted = sorted(self._keys)
+        keys = self._sorted
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            if fnmatchcase(key, pattern):
+                yield key
+
+    def _candidates(self, pattern: str) -> "Set[str]":
+        """Returns the strings containing all trigrams of the literal
+        parts of `pattern`, using the trigram index."""
+        trigrams = set()
+        for literal in _BRACKETS.sub("*", pattern).split("*"):
+            for part in literal.split("?"):
+                trigrams.update(_trigrams(part))
+        if not trigrams:
+            return self._keys
+        if self._trigrams is None:
+            self._trigrams = defaultdict(set)
+            for key in self._keys:
+                for trigram in _trigrams(key):
+                    self._trigrams[trigram].add(key)
+        postings = sorted(
+            (self._trigrams.get(trigram, set()) for trigram in trigrams),
+            key=len,
+        )
+        return set.intersection(*postings)
+
+
+# Glob special characters and bracket expressions
+_SPECIAL = re.compile(r"[*?[]")
+_BRACKETS = re.compile(r"\[[!^]?\]?[^]]*\]")
+
+
+def _trigrams(string: str) -> "Set[str]":
+    """Returns the set of trigrams in `string`."""
+    return {string[i : i + 3] for i in range(len(string) - 2)}
+
+
+class LabelIndex:  # pylint: disable=too-many-instance-attributes
+    """World-level index mapping labels to storids.
+
+    Only data triples whose predicate is among the label annotations
+    that have been requested so far are indexed.  Requesting a new
+    label annotation extends the index with a query for that
+    annotation only.
+
+    The index also maps the name-part of the IRI of all declared
+    entities to their storids and keeps a bounded cache of failed
+    lookups.
+
+    Arguments:
+        world: The world to index.
+        max_misses: Maximum number of failed lookups to remember.
+    """
+
+    def __init__(self, world: "World", max_misses: int = 4096):
+        self.world = world
+        self.predicates = set()  # storids of indexed label annotations
+        self._labels = {}  # maps label to list of (s, p, c, d) entries
+        self._subjects = defaultdict(set)  # maps storid to set of labels
+        self._valid = False
+        self._label_keys = GlobIndex()
+        self._names = {}  # maps name to list of (s, c) entries
+        self._name_keys = GlobIndex()
+        self._declared = defaultdict(set)  # maps storid to set of names
+        self._names_valid = False
+        self._entity_types = None
+        self.max_misses = max_misses
+        self._misses = OrderedDict()
+
+    def invalidate(self) -> None:
+        """Mark the index as invalid.  It will be rebuilt on next use."""
+        self._valid = False
+        self._labels.clear()
+        self._label_keys.clear()
+        self._subjects.clear()
+        self._names_valid = False
+        self._names.clear()
+        self._name_keys.clear()
+        self._declared.clear()
+        self._entity_types = None
+        self._misses.clear()
+
+    def is_miss(self, key: "Hashable") -> bool:
+        """Returns true if `key` is registered as a failed lookup."""
+        if key in self._misses:
+            self._misses.move_to_end(key)
+            return True
+        return False
+
+    def add_miss(self, key: "Hashable") -> None:
+        """Register `key` as a failed lookup.
+
+        The least recently used keys are discarded when more than
+        `max_misses` keys are registered.
+        """
+        self._misses[key] = True
+        self._misses.move_to_end(key)
+        while len(self._misses) > self.max_misses:
+            self._misses.popitem(last=False)
+
+    def update(self, predicates: "Iterable[int]") -> None:
+        """Make sure that the index is valid and includes all label
+        annotations in `predicates` (given as storids)."""
+        if not self._valid:
+            self.predicates.update(predicates)
+            self._index_predicates(self.predicates)
+            self._valid = True
+            return
+        missing = set(predicates).difference(self.predicates)
+        if missing:
+            self.predicates.update(missing)
+            self._index_predicates(missing)
+
+    def _index_predicates(self, predicates: "Set[int]") -> None:
+        """Add all data triples with predicate in `predicates` to the
+        index."""
+        if not predicates:
+            return
+        sql = (
+            "SELECT c, s, p, o, d FROM datas WHERE p IN "
+            f"({','.join('?' * len(predicates))})"
+        )
+        for c, s, p, o, d in self.world.graph.execute(sql, tuple(predicates)):
+            self._add(c, s, p, o, d)
+
+    def _add(self, c, s, p, o, d):
+        """Add a single entry to the index."""
+        # pylint: disable=invalid-name,too-many-arguments
+        # pylint: disable=too-many-positional-arguments
+        if not isinstance(o, str) or s < 0:
+            return
+        entries = self._labels.get(o)
+        if entries is None:
+            entries = self._labels[o] = []
+            self._label_keys.add(o)
+        entry = (s, p, c, d)
+        if entry not in entries:
+            entries.append(entry)
+            self._subjects[s].add(o)
+
+    def lookup(
+        self,
+        label: str,
+        predicates: "Iterable[int]",
+        contexts: "Optional[Set[int]]" = None,
+        lang: "Optional[str]" = None,
+    ) -> "Iterator[int]":
+        """Yield storids of entities annotated with `label`.
+
+        Arguments:
+            label: The label to look up.
+            predicates: Storids of the label annotations to consider.
+                The result is ordered after the order of `predicates`.
+            contexts: If given, only consider triples defined in the
+                ontologies with these contexts (storids of the ontologies'
+                sub-graphs).
+            lang: If given, only consider labels with this language tag.
+
+        Yields:
+            Storids of matching entities.  The same storid may be yielded
+            more than once if it matches more than one annotation.
+        """
+        predicates = list(predicates)
+        self.update(predicates)
+        entries = self._labels.get(label)
+        if not entries:
+            return
+        dlang = f"@{lang}" if lang else None
+        for predicate in predicates:
+            for s, p, c, d in entries:
+                if p != predicate:
+                    continue
+                if contexts is not None and c not in contexts:
+                    continue
+                if dlang and d != dlang:
+                    continue
+                yield s
+
+    def _get_entity_types(self, refresh: bool = False) -> "Set[int]":
+        """Returns storids of types whose instances are entities.
+
+        If `refresh` is true and rdfs:Class was not in the world the
+        last time, check again.
+        """
+        if self._entity_types is None or (
+            refresh and len(self._entity_types) == len(ENTITY_TYPES)
+        ):
+            types = set(ENTITY_TYPES)
+            rdfs_class = self.world._abbreviate(RDFS_CLASS, False)
+            if rdfs_class:
+                types.add(rdfs_class)
+            self._entity_types = types
+        return self._entity_types
+
+    def _update_names(self) -> None:
+        """Make sure that the name index is valid."""
+        if self._names_valid:
+            return
+        types = self._get_entity_types()
+        sql = (
+            "SELECT q.c, q.s, r.iri FROM objs q, resources r "
+            "WHERE q.p=? AND r.storid=q.s AND q.s>0 AND q.o IN "
+            f"({','.join('?' * len(types))})"
+        )
+        for c, s, iri in self.world.graph.execute(sql, (rdf_type, *types)):
+            self._add_name(c, s, iri_name(iri))
+        self._names_valid = True
+
+    def _add_name(self, c, s, name):
+        """Add a single entry to the name index."""
+        # pylint: disable=invalid-name
+        entries = self._names.get(name)
+        if entries is None:
+            entries = self._names[name] = []
+            self._name_keys.add(name)
+        if (s, c) not in entries:
+            entries.append((s, c))
+            self._declared[s].add(name)
+
+    def _remove_name(self, s, c=None):
+        """Remove entries for storid `s` from the name index.  If `c` is
+        given, only the entry for context `c` is removed."""
+        # pylint: disable=invalid-name
+        for name in self._declared.pop(s, ()):
+            entries = [
+                entry
+                for entry in self._names[name]
+                if not (entry[0] == s and (c is None or entry[1] == c))
+            ]
+            if entries:
+                self._names[name] = entries
+                if c is not None and any(e[0] == s for e in entries):
+                    self._declared[s].add(name)
+            else:
+                del self._names[name]
+                self._name_keys.discard(name)
+
+    def lookup_name(
+        self, name: str, contexts: "Optional[Set[int]]" = None
+    ) -> "Iterator[int]":
+        """Yield storids of declared entities with IRI name-part `name`.
+
+        Arguments:
+            name: The name-part of the IRI to look up.
+            contexts: If given, only consider entities declared in the
+                ontologies with these contexts.
+
+        Yields:
+            Storids of matching entities.
+        """
+        self._update_names()
+        seen = set()
+        for s, c in self._names.get(name, ()):
+            if s in seen or (contexts is not None and c not in contexts):
+                continue
+            seen.add(s)
+            yield s
+
+    def names(self) -> "Iterator[str]":
+        """Returns an iterator over all indexed entity names."""
+        self._update_names()
+        return iter(self._names)
+
+    def match_names(self, pattern: str) -> "Iterator[str]":
+        """Yield all indexed entity names matching glob `pattern`."""
+        self._update_names()
+        yield from self._name_keys.match(pattern)
+
+    def match_labels(
+        self, pattern: str, predicates: "Iterable[int]"
+    ) -> "Iterator[str]":
+        """Yield all indexed labels matching glob `pattern`.
+
+        The index is first extended to include the label annotations in
+        `predicates`.  Note that the yielded labels may be used with
+        other annotations than those in `predicates`.
+        """
+        self.update(predicates)
+        yield from self._label_keys.match(pattern)
+
+    def triple_added(self, c, s, p, o, d):
+        """Update the index after a data triple has been added."""
+        # pylint: disable=invalid-name,too-many-arguments
+        # pylint: disable=too-many-positional-arguments
+        self._misses.clear()
+        if self._valid and p in self.predicates:
+            self._add(c, s, p, o, d)
+
+    def obj_triple_added(self, c, s, p, o):
+        """Update the index after an object triple has been added."""
+        # pylint: disable=invalid-name
+        self._misses.clear()
+        if self._names_valid and p == rdf_type and s > 0:
+            types = self._get_entity_types()
+            if o not in types and o > 0:
+                types = self._get_entity_types(refresh=True)
+            if o in types:
+                self._add_name(c, s, iri_name(self.world._unabbreviate(s)))
+
+    def obj_triples_removed(self, s, p, o):
+        """Update the index after object triples have been removed.
+
+        Arguments that are None act as wildcards.
+        """
+        # pylint: disable=invalid-name
+        if not self._names_valid or p not in (None, rdf_type):
+            return
+        if s is None:
+            self._names_valid = False
+            self._names.clear()
+            self._name_keys.clear()
+            self._declared.clear()
+        elif s in self._declared and (
+            o is None or o in self._get_entity_types()
+        ):
+            # Cheaper to re-query the remaining declarations of `s` than
+            # to track which type each entry comes from
+            names = self._declared[s]
+            self._remove_name(s)
+            types = self._get_entity_types()
+            for (c,) in self.world.graph.execute(
+                "SELECT DISTINCT c FROM objs WHERE s=? AND p=? AND o IN "
+                f"({','.join('?' * len(types))})",
+                (s, rdf_type, *types),
+            ):
+                for name in names:
+                    self._add_name(c, s, name)
+
+    def resource_renamed(self, storid: int, iri: str) -> None:
+        """Update the index after the IRI of `storid` has changed."""
+        self._misses.clear()
+        if self._names_valid and storid in self._declared:
+            contexts = {
+                c
+                for name in self._declared[storid]
+                for s, c in self._names[name]
+                if s == storid
+            }
+            self._remove_name(storid)
+            for c in contexts:
+                self._add_name(c, storid, iri_name(iri))
+
+    def triples_removed(self, c, s, p, o, d):
+        """Update the index after data triples have been removed.
+
+        Arguments that are None act as wildcards.  A None context means
+        that matching triples are removed from all ontologies.
+        """
+        # pylint: disable=invalid-name,too-many-arguments
+        # pylint: disable=too-many-positional-arguments
+        if not self._valid or (p is not None and p not in self.predicates):
+            return
+        if s is None:
+            self._valid = False
+            self._labels.clear()
+            self._label_keys.clear()
+            self._subjects.clear()
+            return
+        for label in list(self._subjects.get(s, ())):
+            if o is not None and label != o:
+                continue
+            entries = [
+                entry
+                for entry in self._labels[label]
+                if not (
+                    entry[0] == s
+                    and (p is None or entry[1] == p)
+                    and (c is None or entry[2] == c)
+                    and (d is None or entry[3] == d)
+                )
+            ]
+            if entries:
+                self._labels[label] = entries
+            else:
+                del self._labels[label]
+                self._label_keys.discard(label)
+            if not any(entry[0] == s for entry in entries):
+                self._subjects[s].discard(label)
+        if not self._subjects.get(s, True):
+            del self._subjects[s]
@@ -0,0 +1,321 @@
+"""Persistent cache of loaded ontologies.
+
+The `LoadCache` class implemented in this module is used by
+`Ontology.load()` if the environment variable `ONTOPY_CACHE_DIR` is
+set to a directory (or the `cache_dir` argument of `load()` is given).
+
+When an ontology is loaded into an empty world, the populated SQLite
+quadstore, which then contains the ontology together with its whole
+import closure, is copied to the cache directory.  It is stored
+together with a manifest listing all files that were read (the
+ontologies and catalog files, with their modification time, size and
+SHA-256 hash) and the IRI mappings read from catalog files.  The next
+time the same ontology is loaded into an empty world with the same
+options, the cached quadstore is copied into the world instead of
+parsing the sources, provided that none of the files has changed.
+
+Ontologies that are downloaded are recorded by their URL and are not
+checked for changes.  Remove the cache directory or load with
+`reload=True` to refresh them.
+"""
+
+# pylint: disable=protected-access
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import owlready2
+from owlready2.base import rdf_type, owl_ontology
+from owlready2.namespace import Metadata
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional, Union
+
+    from ontopy.ontology import Ontology, World
+
+
+CACHE_DIR_ENV = "ONTOPY_CACHE_DIR"
+
+# Increment when the layout of cache entries changes
+CACHE_FORMAT = 1
+
+WEB_PROTOCOLS = ("http://", "https://", "ftp://")
+
+
+def get_cache_dir(
+    cache_dir: "Optional[Union[str, Path]]" = None,
+) -> "Optional[Path]":
+    """Returns the cache directory.
+
+    Arguments:
+        cache_dir: Cache directory.  Defaults to the value of the
+            `ONTOPY_CACHE_DIR` environment variable.
+
+    Returns:
+        Path to the cache directory or None if caching is disabled.
+    """
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+    return Path(cache_dir).expanduser() if cache_dir else None
+
+
+def is_pristine(world: "World", onto: "Ontology") -> bool:
+    """Returns true if `world` contains nothing but the (empty)
+    ontology `onto`, such that a cached quadstore can replace it."""
+    for other in world.ontologies.values():
+        if other is not onto and other.base_iri != "http://anonymous/":
+            return False
+    graph = world.graph
+    if graph.execute("SELECT COUNT() FROM datas").fetchone()[0]:
+        return False
+    return not graph.execute(
+        "SELECT COUNT() FROM objs WHERE p!=? OR o!=?",
+        (rdf_type, owl_ontology),
+    ).fetchone()[0]
+
+
+def file_info(path: "Union[str, Path]") -> dict:
+    """Returns a dict with modification time, size and SHA-256 hash of
+    file `path`."""
+    stat = os.stat(path)
+    return {
+        "path": str(path),
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "sha256": sha256(path),
+    }
+
+
+def sha256(path: "Union[str, Path]") -> str:
+    """Returns the SHA-256 hex digest of the content of file `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_unchanged(info: dict) -> bool:
+    """Returns true if the file described by `info` (as returned by
+    `file_info()`) is unchanged.
+
+    The hash is only recomputed if the modification time or size
+    differ.
+    """
+    try:
+        stat = os.stat(info["path"])
+    except OSError:
+        return False
+    if stat.st_size != info["size"]:
+        return False
+    if stat.st_mtime == info["mtime"]:
+        return True
+    return sha256(info["path"]) == info["sha256"]
+
+
+def replace_quadstore(
+    world: "World",
+    source: "Union[sqlite3.Connection, bytes]",
+    contexts: "Optional[Iterable[int]]" = None,
+) -> None:
+    """Replace the quadstore of `world` with a copy of another quadstore
+    and rebind the ontologies of `world` to it.
+
+    Arguments:
+        world: The world.  It is expected to be pristine (see
+            `is_pristine()`).
+        source: Connection to the SQLite database to copy or the
+            database serialised with `sqlite3.Connection.serialize()`.
+        contexts: If given, only the triples and ontologies of these
+            contexts (`c` in the quadstore) are kept.
+    """
+    graph = world.graph
+    graph.db.commit()
+    if isinstance(source, bytes):
+        graph.db.deserialize(source)
+    else:
+        source.backup(graph.db)
+    if contexts is not None:
+        values = ",".join(str(int(c)) for c in contexts)
+        for table in "objs", "datas", "ontologies":
+            graph.execute(f"DELETE FROM {table} WHERE c NOT IN ({values})")
+
+    # Rebind the ontologies to the new quadstore, like
+    # owlready2.World.set_backend() does
+    graph.c_2_onto.clear()
+    graph.onto_2_subgraph.clear()
+    graph.prop_fts = {
+        storid for (storid,) in graph.execute("SELECT storid FROM prop_fts")
+    }
+    graph.current_changes = graph.db.total_changes
+    ontologies = {id(onto): onto for onto in world.ontologies.values()}
+    for onto in ontologies.values():
+        onto.graph, _ = graph.sub_graph(onto)
+        for method in (
+            onto.graph.__class__.BASE_METHODS
+            + onto.graph.__class__.ONTO_METHODS
+        ):
+            setattr(onto, method, getattr(onto.graph, method))
+        world._install_triple_hooks(onto)
+        onto.storid = world._abbreviate(onto.base_iri[:-1])
+        onto.metadata = Metadata(onto, onto.storid)
+
+
+class LoadCache:
+    """Cache of quadstores of loaded ontologies.
+
+    Arguments:
+        directory: The cache directory.  It is created if needed.
+    """
+
+    def __init__(self, directory: "Union[str, Path]"):
+        self.directory = Path(directory)
+
+    def key(self, onto: "Ontology", **options) -> str:
+        """Returns the cache key for loading `onto` with the given
+        keyword arguments to `Ontology.load()`.
+
+        The key also depends on the versions of EMMOntoPy and Owlready2,
+        since they affect the result.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from ontopy import __version__
+
+        filename = options.get("filename")
+        if filename and not str(filename).startswith(WEB_PROTOCOLS):
+            options["filename"] = os.path.abspath(filename)
+        data = {
+            "format": CACHE_FORMAT,
+            "iri": onto._orig_base_iri,
+            "options": {k: str(v) for k, v in sorted(options.items())},
+            "ontopy": __version__,
+            "owlready2": owlready2.VERSION,
+        }
+        text = json.dumps(data, sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def lookup(self, key: str) -> "Optional[dict]":
+        """Returns the manifest of the cache entry for `key` or None if
+        there is no valid entry.
+
+        An entry is valid if none of its files has changed and
+        `owlready2.onto_path`, which is used for locating imported
+        ontologies, is the same as when the entry was stored (apart
+        from the directories added while loading it).
+        """
+        manifest_file = self.directory / f"{key}.json"
+        if not manifest_file.exists() or not self._store_file(key).exists():
+            return None
+        try:
+            with open(manifest_file, "rt", encoding="utf8") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        onto_path = set(map(str, owlready2.onto_path))
+        initial = set(manifest["onto_path"])
+        if not initial <= onto_path <= initial.union(manifest["added_paths"]):
+            return None
+        if not all(is_unchanged(info) for info in manifest["files"]):
+            return None
+        return manifest
+
+    def restore(self, world: "World", key: str, manifest: dict) -> None:
+        """Replace the quadstore of `world` with the cached quadstore for
+        `key`.
+
+        The world is expected to be pristine (see `is_pristine()`).
+        """
+        source = sqlite3.connect(self._store_file(key))
+        try:
+            replace_quadstore(world, source)
+        finally:
+            source.close()
+
+        # Restore the catalog state of the world
+        for url, (mtime, iris, dirs) in manifest["catalogs"].items():
+            world._cached_catalogs[url] = (mtime, iris, set(dirs))
+        world._iri_mappings.update(manifest["iri_mappings"])
+        for path in manifest["added_paths"]:
+            if path not in owlready2.onto_path:
+                owlready2.onto_path.append(path)
+
+    def store(
+        self,
+        world: "World",
+        key: str,
+        sources: "Iterable[str]",
+        onto_path: "Iterable[str]",
+    ) -> None:
+        """Store the quadstore of `world` in the cache.
+
+        Arguments:
+            world: The world to store.
+            key: Cache key returned by `key()`.
+            sources: URLs or paths of all ontologies that were loaded.
+            onto_path: `owlready2.onto_path` before loading.
+        """
+        manifest = self._manifest(world, sources, onto_path)
+        manifest_file = self.directory / f"{key}.json"
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        world.graph.db.commit()
+        # Write to temporary files first, such that concurrent processes
+        # never see incomplete entries.  The old manifest is removed
+        # before the store is replaced and the new manifest is only moved
+        # in place after the new store, such that `lookup()` never pairs
+        # a manifest with a store it does not describe.
+        with tempfile.TemporaryDirectory(dir=self.directory) as tmpdir:
+            tmp_store = Path(tmpdir) / "store.sqlite3"
+            target = sqlite3.connect(tmp_store)
+            try:
+                world.graph.db.backup(target)
+            finally:
+                target.close()
+            tmp_manifest = Path(tmpdir) / "manifest.json"
+            with open(tmp_manifest, "wt", encoding="utf8") as handle:
+                json.dump(manifest, handle, indent=2)
+            try:
+                manifest_file.unlink()
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_store, self._store_file(key))
+            os.replace(tmp_manifest, manifest_file)
+
+    @staticmethod
+    def _manifest(
+        world: "World", sources: "Iterable[str]", onto_path: "Iterable[str]"
+    ) -> dict:
+        """Returns the manifest describing the quadstore of `world`.
+
+        See `store()` for a description of the arguments.
+        """
+        files, urls = [], []
+        for source in dict.fromkeys(sources):
+            if source.startswith(WEB_PROTOCOLS):
+                urls.append(source)
+            elif os.path.isfile(source):
+                files.append(file_info(source))
+        catalogs = {}
+        for url, (mtime, iris, dirs) in world._cached_catalogs.items():
+            catalogs[url] = (mtime, iris, sorted(dirs))
+            if mtime and os.path.isfile(url):
+                files.append(file_info(url))
+        return {
+            "files": files,
+            "urls": urls,
+            "catalogs": catalogs,
+            "iri_mappings": world._iri_mappings,
+            "onto_path": list(map(str, onto_path)),
+            "added_paths": [
+                str(path)
+                for path in owlready2.onto_path
+                if path not in onto_path
+            ],
+        }
+
+    def _store_file(self, key: str) -> Path:
+        """Returns the path to the cached quadstore for `key`."""
+        return self.directory / f"{key}.sqlite3"
@@ -0,0 +1,656 @@
+"""Planning of loading an ontology and its import closure.
+
+`plan_load()` finds the import closure of an ontology without loading
+it.  Only the ontology headers of the files are read: the Turtle and
+RDF/XML (or OWL/XML) readers stop parsing when the `owl:Ontology`
+statement or element is complete, unless the rest of the file may
+contain more `owl:imports`, N-Triples files are scanned line by line
+and other formats are parsed with rdflib.  Imported ontologies
+are resolved like `Ontology.load()` resolves them: via the catalog
+files in the directories of the files that are read, via
+`owlready2.onto_path` and otherwise from the web.
+
+The returned `LoadPlan` tells which imports are local, remote or
+missing, the format and size of each file and in which order (or
+which groups in parallel) the ontologies can be loaded:
+
+```python
+from ontopy import plan_load
+
+plan = plan_load("emmo.ttl")
+plan.check()  # raises MissingImportError if imports cannot be found
+for level in plan.levels():
+    print([entry.location for entry in level])
+```
+"""
+
+import os
+import re
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin
+
+import defusedxml.ElementTree as ET
+import owlready2
+import rdflib
+from rdflib.util import guess_format
+
+from ontopy.exceptions import MissingImportError, ReadCatalogError
+from ontopy.httpcache import DownloadPool
+from ontopy.quadstore import NT_LINE
+from ontopy.utils import FMAP, read_catalog
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+WEB_PROTOCOLS = ("http://", "https://", "ftp://")
+
+_OWL = "http://www.w3.org/2002/07/owl#"
+_RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+OWL_IMPORTS = _OWL + "imports"
+OWL_ONTOLOGY = _OWL + "Ontology"
+RDF_TYPE = _RDF + "type"
+
+# Formats of media types returned by web servers
+MEDIA_TYPES = {
+    "text/turtle": "turtle",
+    "application/x-turtle": "turtle",
+    "application/rdf+xml": "xml",
+    "application/owl+xml": "xml",
+    "application/xml": "xml",
+    "text/xml": "xml",
+    "application/n-triples": "ntriples",
+    "application/n-quads": "nquads",
+    "application/ld+json": "json-ld",
+}
+
+
+class PlanEntry:  # pylint: disable=too-many-instance-attributes
+    """An ontology in the import closure.
+
+    Attributes:
+        iri: The IRI that the ontology is imported with.  For the root
+            ontology, this is the IRI or path passed to `plan_load()`.
+        location: Resolved file path or URL.
+        ontology_iri: The IRI declared in the header of the ontology or
+            None if it is not read.
+        format: rdflib format of the file or None if unknown.
+        size: Size of the file in bytes or None if unknown.
+        remote: Whether `location` is on the web.
+        missing: Whether the ontology cannot be found.
+        error: Description of why the ontology is missing or its header
+            could not be read.
+        imports: List of IRIs of imported ontologies.  None if the header
+            has not been read, e.g. for remote ontologies when not
+            fetching.
+    """
+
+    def __init__(self, iri: str, location: str):
+        self.iri = iri
+        self.location = location
+        self.ontology_iri = None
+        self.format = None
+        self.size = None
+        self.remote = location.startswith(WEB_PROTOCOLS)
+        self.missing = False
+        self.error = None
+        self.imports = None
+
+    def __repr__(self):
+        return f"<PlanEntry {self.iri} {self.status}>"
+
+    @property
+    def status(self) -> str:
+        """One of "missing", "remote" or "local"."""
+        if self.missing:
+            return "missing"
+        return "remote" if self.remote else "local"
+
+
+class LoadPlan:
+    """The import closure of an ontology as returned by `plan_load()`.
+
+    Attributes:
+        root: IRI (as passed to `plan_load()`) of the root ontology.
+        entries: Dict mapping import IRIs to `PlanEntry` objects, in
+            breadth-first order starting with the root.
+        iri_mappings: IRI mappings read from catalog files.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.entries = {}
+        self.iri_mappings = {}
+
+    def __repr__(self):
+        return f"<LoadPlan {self.root} {len(self.entries)} ontologies>"
+
+    def __str__(self):
+        lines = []
+        for entry in self.entries.values():
+            size = "" if entry.size is None else str(entry.size)
+            lines.append(
+                f"{entry.status:<8} {entry.format or '':<9} {size:>10}  "
+                f"{entry.iri} -> {entry.location}"
+            )
+            if entry.error:
+                lines.append(f"{'':30}{entry.error}")
+        return "\n".join(lines)
+
+    @property
+    def missing(self) -> "List[PlanEntry]":
+        """Entries that cannot be found."""
+        return [e for e in self.entries.values() if e.missing]
+
+    @property
+    def remote(self) -> "List[PlanEntry]":
+        """Entries on the web."""
+        return [e for e in self.entries.values() if e.remote]
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the files of known size."""
+        return sum(e.size for e in self.entries.values() if e.size)
+
+    def edges(self) -> "List[Tuple[str, str]]":
+        """Returns a list of `(importer, imported)` IRI pairs."""
+        return [
+            (entry.iri, iri)
+            for entry in self.entries.values()
+            for iri in entry.imports or ()
+        ]
+
+    def order(self) -> "List[PlanEntry]":
+        """Returns the entries in load order, i.e. each ontology comes
+        after the ontologies it imports (unless they import each other
+        cyclically)."""
+        visited = set()
+        postorder = []
+
+        def visit(iri):
+            visited.add(iri)
+            entry = self.entries[iri]
+            for imported in entry.imports or ():
+                if imported not in visited:
+                    visit(imported)
+            postorder.append(entry)
+
+        visit(self.root)
+        return postorder
+
+    def levels(self) -> "List[List[PlanEntry]]":
+        """Returns the entries grouped in levels that can be loaded in
+        parallel.  All ontologies imported by the ontologies of a level
+        are in the preceding levels.  Ontologies that import each other
+        cyclically are put in the same level."""
+        remaining = {e.iri: e for e in self.order()}
+        done = set()
+        levels = []
+        while remaining:
+            level = [
+                e
+                for e in remaining.values()
+                if all(i in done for i in e.imports or ())
+            ]
+            if not level:  # import cycle
+                level = list(remaining.values())
+            for entry in level:
+                del remaining[entry.iri]
+            done.update(e.iri for e in level)
+            levels.append(level)
+        return levels
+
+    def check(self) -> None:
+        """Raise MissingImportError if any ontology cannot be found."""
+        missing = self.missing
+        if missing:
+            raise MissingImportError(
+                "Cannot find imported ontologies:\n  "
+                + "\n  ".join(
+                    f"{e.iri} -> {e.location}: {e.error}" for e in missing
+                )
+            )
+
+
+def plan_load(
+    iri_or_path: "Union[str, Path]",
+    *,
+    catalog_file: str = "catalog-v001.xml",
+    fetch: bool = False,
+) -> LoadPlan:
+    """Returns a plan for loading an ontology and its import closure
+    without loading it.
+
+    Arguments:
+        iri_or_path: IRI, URL or path of the ontology to load.
+        catalog_file: Name of the catalog files.
+        fetch: Whether to download remote ontologies (concurrently and
+            via the HTTP cache if it is enabled) to read their headers.
+            By default, the imports of remote ontologies are not followed.
+
+    Returns:
+        The load plan.
+    """
+    root = str(iri_or_path)
+    plan = LoadPlan(root)
+    mappings = plan.iri_mappings
+    directories = set()
+
+    def read_directory(directory):
+        if directory in directories:
+            return
+        directories.add(directory)
+        if directory.startswith(WEB_PROTOCOLS):
+            catalog = f"{directory}/{catalog_file}"
+        else:
+            catalog = os.path.join(directory, catalog_file)
+            if not os.path.exists(catalog):
+                return
+        try:
+            mappings.update(read_catalog(catalog))
+        except ReadCatalogError:
+            pass
+
+    if root.startswith("file://"):
+        root = root[7:]
+    if root.startswith(WEB_PROTOCOLS):
+        location = resolve(root, mappings)
+    else:
+        location = os.path.normpath(os.path.abspath(root))
+        read_directory(os.path.dirname(location))
+    plan.entries[plan.root] = PlanEntry(plan.root, location)
+
+    with DownloadPool("ontology") as downloads:
+        frontier = [plan.entries[plan.root]]
+        while frontier:
+            if fetch:
+                for entry in frontier:
+                    if entry.remote:
+                        downloads.submit(entry.location)
+            next_frontier = []
+            for entry in frontier:
+                if entry.remote and not fetch:
+                    entry.format = guess_format(entry.location, fmap=FMAP)
+                    continue
+                _read_entry(entry, downloads)
+                if entry.missing or entry.imports is None:
+                    continue
+                read_directory(os.path.dirname(entry.location))
+                for iri in entry.imports:
+                    if iri not in plan.entries:
+                        imported = PlanEntry(iri, resolve(iri, mappings))
+                        plan.entries[iri] = imported
+                        next_frontier.append(imported)
+            frontier = next_frontier
+    return plan
+
+
+def resolve(iri: str, iri_mappings: "Dict[str, str]") -> str:
+    """Returns the location of the ontology with IRI `iri`.
+
+    The location is looked up in `iri_mappings` (read from catalog
+    files) and `owlready2.onto_path`.  If not found, it is `iri` itself.
+    """
+    url = iri.rstrip("/#")
+    location = iri_mappings.get(url, iri_mappings.get(iri, url))
+    if location.startswith("file://"):
+        return location[7:]
+    if location.startswith(WEB_PROTOCOLS):
+        # pylint: disable=protected-access
+        name = location.rsplit("/", 1)[-1]
+        try:
+            return owlready2.namespace._get_onto_file(location, name, "r", True)
+        except FileNotFoundError:
+            pass
+    return location
+
+
+def _read_entry(entry: PlanEntry, downloads: DownloadPool) -> None:
+    """Help function for plan_load() that reads the header of `entry`."""
+    path = entry.location
+    fmt = guess_format(path, fmap=FMAP)
+    if entry.remote:
+        result = downloads.result(path)
+        if result is None:
+            entry.missing = True
+            entry.error = "cannot be downloaded"
+            return
+        path, headers = result
+        media_type = headers.get("Content-Type", "").split(";")[0].strip()
+        fmt = fmt or MEDIA_TYPES.get(media_type)
+    elif not os.path.isfile(path):
+        entry.missing = True
+        entry.error = "no such file"
+        return
+    entry.size = os.path.getsize(path)
+    entry.format = fmt or sniff_format(path)
+    try:
+        entry.ontology_iri, entry.imports = read_header(
+            path, entry.format, base=entry.location
+        )
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        entry.error = f"cannot read header: {exc}"
+        entry.imports = []
+
+
+def sniff_format(path: str) -> str:
+    """Returns the rdflib format of file `path` guessed from its first
+    bytes."""
+    with open(path, "rb") as handle:
+        head = handle.read(1000).lstrip()
+    if head.startswith((b"<?xml", b"<rdf:RDF", b"<Ontology", b"<!DOCTYPE")):
+        return "xml"
+    if head.startswith((b"{", b"[")):
+        return "json-ld"
+    if NT_LINE.match(head.split(b"\n", 1)[0].decode("utf8", "replace")):
+        return "ntriples"
+    return "turtle"
+
+
+def read_header(
+    path: str,
+    format: str,  # pylint: disable=redefined-builtin
+    base: "Optional[str]" = None,
+) -> "Tuple[Optional[str], List[str]]":
+    """Reads the header of the ontology in file `path`.
+
+    Arguments:
+        path: Path to the file.
+        format: rdflib format of the file.
+        base: Base IRI used for resolving relative IRIs.  Defaults to
+            `path`.
+
+    Returns:
+        A `(ontology_iri, imports)` tuple, where `ontology_iri` is the IRI
+        of the ontology (or None if no ontology is declared) and
+        `imports` the list of IRIs of the imported ontologies.
+    """
+    base = base or path
+    if format == "turtle":
+        with open(path, "rt", encoding="utf8") as handle:
+            return _turtle_header(handle, base)
+    if format == "xml":
+        with open(path, "rb") as handle:
+            return _xml_header(handle, base)
+    if format in ("ntriples", "nt", "nt11", "nquads"):
+        with open(path, "rt", encoding="utf8") as handle:
+            return _ntriples_header(handle)
+    graph = rdflib.Graph()
+    graph.parse(path, format=format, publicID=base)
+    ontologies = list(
+        graph.subjects(rdflib.RDF.type, rdflib.URIRef(OWL_ONTOLOGY))
+    )
+    imports = [
+        str(o) for o in graph.objects(predicate=rdflib.URIRef(OWL_IMPORTS))
+    ]
+    return (str(ontologies[0]) if ontologies else None), imports
+
+
+_ABSOLUTE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+def _join(base: str, iri: str) -> str:
+    """Resolves `iri` relative to `base`.  Unlike urljoin(), absolute
+    IRIs are returned unchanged, including empty fragments."""
+    if _ABSOLUTE.match(iri):
+        return iri
+    return urljoin(base, iri)
+
+
+def _ntriples_header(handle) -> "Tuple[Optional[str], List[str]]":
+    """Scans an N-Triples or N-Quads file for ontologies and imports."""
+    ontology_iri = None
+    imports = []
+    for line in handle:
+        if OWL_IMPORTS in line or OWL_ONTOLOGY in line:
+            match = NT_LINE.match(line)
+            if not match:
+                continue
+            subject, _, predicate, obj = match.groups()[:4]
+            if predicate == OWL_IMPORTS and obj:
+                imports.append(obj)
+            elif predicate == RDF_TYPE and obj == OWL_ONTOLOGY:
+                ontology_iri = ontology_iri or subject
+    return ontology_iri, imports
+
+
+# Number of characters or bytes read at a time when scanning files
+_CHUNKSIZE = 1 << 20
+
+# Start tags of elements that may be owl:imports (or OWL/XML Import)
+_XML_IMPORTS = re.compile(rb"<(?:[\w.-]+:)?[Ii]mports?[\s/>]")
+
+
+def _iter_matches(handle, pattern: "re.Pattern", overlap: int):
+    """Yields the matches of `pattern` in the rest of file `handle`.
+
+    The file is read in chunks of `_CHUNKSIZE` characters (or bytes).
+    Consecutive chunks are searched with an overlap of `overlap`
+    characters, which must not be shorter than any match.
+    """
+    tail = handle.read(0)
+    while True:
+        chunk = handle.read(_CHUNKSIZE)
+        if not chunk:
+            return
+        data = tail + chunk
+        for match in pattern.finditer(data):
+            # Matches ending in `tail` were yielded with the previous chunk
+            if match.end() > len(tail):
+                yield match
+        tail = data[len(data) - overlap :]
+
+
+def _xml_header(handle, base: str) -> "Tuple[Optional[str], List[str]]":
+    """Reads the header of an RDF/XML or OWL/XML file.  Parsing stops
+    when the owl:Ontology element (RDF/XML) or the imports (OWL/XML) have
+    been read, unless the rest of the file may contain more imports."""
+    about = f"{{{_RDF}}}about"
+    xml_base = "{http://www.w3.org/XML/1998/namespace}base"
+    start = handle.tell()
+    candidates = sum(1 for _ in _iter_matches(handle, _XML_IMPORTS, 256))
+    handle.seek(start)
+    ontology_iri = None
+    imports = []
+    seen = 0  # number of import elements read
+    depth = 0
+    owlxml = False
+    for event, elem in ET.iterparse(handle, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                base = _join(base, elem.get(xml_base, ""))
+                owlxml = elem.tag == f"{{{_OWL}}}Ontology"
+                if owlxml:
+                    ontology_iri = elem.get("ontologyIRI")
+            elif (
+                elem.tag == f"{{{_OWL}}}Ontology"
+                and about in elem.attrib
+                and ontology_iri is None
+            ):
+                ontology_iri = _join(base, elem.get(about))
+            continue
+        depth -= 1
+        if elem.tag == f"{{{_OWL}}}imports":
+            resource = elem.get(f"{{{_RDF}}}resource") or elem.text or ""
+            imports.append(_join(base, resource.strip()))
+            seen += 1
+        elif elem.tag == f"{{{_OWL}}}Import":
+            imports.append(_join(base, (elem.text or "").strip()))
+            seen += 1
+        elif owlxml and depth == 1:
+            name = elem.tag.rsplit("}", 1)[-1]
+            if name not in ("Prefix", "Import", "Annotation"):
+                break
+        elif (
+            not owlxml
+            and elem.tag == f"{{{_OWL}}}Ontology"
+            and seen >= candidates
+        ):
+            break
+    return ontology_iri, imports
+
+
+# Tokens of Turtle statements, with strings replaced by ""
+_TURTLE_TOKEN = re.compile(
+    r'<[^>]*>|""|\^\^|@[A-Za-z][\w-]*|[+-]?\d*\.\d+(?:[eE][+-]?\d+)?'
+    r'|[^\s;,<>()\[\]"]*:[^\s;,<>()\[\]"]*(?<!\.)'
+    r'|[^\s;,.<>()\[\]"]+|[;,.\[\]()]|\S'
+)
+_TURTLE_SPECIAL = re.compile(r"\"\"\"|'''|\"|'|#|<[^>\s]*>")
+_TURTLE_SHORT = {
+    '"': re.compile(r'(?:[^"\\\n]|\\.)*"'),
+    "'": re.compile(r"(?:[^'\\\n]|\\.)*'"),
+}
+
+
+def _turtle_tokens(handle) -> "Iterator[str]":
+    """Yields the tokens of the Turtle document read from `handle`, with
+    comments removed and strings replaced by ""."""
+    delim = None  # delimiter of current long string
+    # Use readline(), which unlike iteration keeps handle.tell() working
+    for line in iter(handle.readline, ""):
+        code = []
+        pos = 0
+        while True:
+            if delim:
+                end = line.find(delim, pos)
+                while end > 0 and _escaped(line, end):
+                    end = line.find(delim, end + 1)
+                if end < 0:
+                    break
+                pos = end + 3
+                delim = None
+                code.append('""')
+                continue
+            match = _TURTLE_SPECIAL.search(line, pos)
+            if not match:
+                code.append(line[pos:])
+                break
+            code.append(line[pos : match.start()])
+            token = match.group()
+            pos = match.end()
+            if token == "#":
+                break
+            if token.startswith("<"):
+                code.append(f" {token} ")
+            elif len(token) == 3:
+                delim = token
+            else:
+                short = _TURTLE_SHORT[token].match(line, pos)
+                pos = short.end() if short else len(line)
+                code.append(' "" ')
+        yield from _TURTLE_TOKEN.findall("".join(code))
+
+
+def _escaped(line: str, index: int) -> bool:
+    """Returns true if the character at `index` is escaped."""
+    count = 0
+    while index > count and line[index - count - 1] == "\\":
+        count += 1
+    return count % 2 == 1
+
+
+def _turtle_header(handle, base: str) -> "Tuple[Optional[str], List[str]]":
+    """Reads the header of a Turtle file.  Reading stops after the
+    statement declaring the ontology, unless the rest of the file
+    refers to the OWL namespace and may thus contain more imports."""
+    prefixes = {}
+    ontology_iri = None
+    imports = []
+    tokens = _turtle_tokens(handle)
+
+    def expand(token):
+        if token.startswith("<"):
+            return _join(base, token[1:-1])
+        if token == "a":
+            return RDF_TYPE
+        prefix, sep, local = token.partition(":")
+        if sep and prefix in prefixes:
+            return prefixes[prefix] + local.replace("\\", "")
+        return token
+
+    for token in tokens:
+        directive = token.lower()
+        if directive in ("@prefix", "prefix"):
+            name, iri = next(tokens), next(tokens)
+            prefixes[name[:-1]] = _join(base, iri[1:-1])
+            if directive == "@prefix":
+                next(tokens)
+            continue
+        if directive in ("@base", "base"):
+            base = _join(base, next(tokens)[1:-1])
+            if directive == "@base":
+                next(tokens)
+            continue
+
+        statement = _turtle_statement(token, tokens)
+        pairs = [
+            (expand(predicate), expand(obj))
+            for predicate, obj in _turtle_pairs(statement)
+        ]
+        imports.extend(obj for pred, obj in pairs if pred == OWL_IMPORTS)
+        if ontology_iri is None and (RDF_TYPE, OWL_ONTOLOGY) in pairs:
+            ontology_iri = expand(statement[0])
+            if not _may_import(handle, prefixes):
+                break
+    return ontology_iri, imports
+
+
+def _turtle_statement(first: str, tokens: "Iterator[str]") -> "List[str]":
+    """Returns the tokens of the Turtle statement starting with `first`,
+    excluding the final ".".  The remaining tokens are read from
+    `tokens`."""
+    statement = [first]
+    depth = 1 if first in "[(" else 0
+    for token in tokens:
+        if token in "[(":
+            depth += 1
+        elif token in "])":
+            depth -= 1
+        elif token == "." and depth <= 0:
+            break
+        statement.append(token)
+    return statement
+
+
+def _turtle_pairs(statement: "List[str]") -> "List[Tuple[str, str]]":
+    """Returns the unexpanded `(predicate, object)` tokens of `statement`,
+    excluding those inside of blank nodes and collections."""
+    pairs = []
+    predicate = None
+    depth = 0
+    for token in statement[1:]:
+        if token in "[(":
+            depth += 1
+        elif token in "])":
+            depth -= 1
+        elif depth or token == ",":
+            pass
+        elif token == ";":
+            predicate = None
+        elif predicate is None:
+            predicate = token
+        else:
+            pairs.append((predicate, token))
+    return pairs
+
+
+def _may_import(handle, prefixes: "Dict[str, str]") -> bool:
+    """Returns whether the rest of the Turtle file `handle` may contain
+    imports, i.e. whether it refers to the OWL namespace, either with
+    a full IRI or with one of `prefixes`.
+
+    The file is scanned in chunks and `handle` is rewound afterwards.
+    """
+    needles = [_OWL] + [
+        f"{prefix}:imports"
+        for prefix, namespace in prefixes.items()
+        if namespace == _OWL
+    ]
+    pattern = re.compile("|".join(map(re.escape, needles)))
+    start = handle.tell()
+    found = any(_iter_matches(handle, pattern, max(map(len, needles))))
+    handle.seek(start)
+    return found
@@ -0,0 +1,252 @@
+"""Profiling of `Ontology.load()`.
+
+Pass a `LoadReport` instance as the `report` argument to
+`Ontology.load()` to record how much time is spent in the different
+phases of loading the ontology and each of its imported ontologies:
+
+```python
+from ontopy import get_ontology
+from ontopy.loadreport import LoadReport
+
+report = LoadReport()
+onto = get_ontology("emmo.ttl").load(report=report)
+print(report)
+```
+
+The phases are:
+
+- `cache`: looking up, restoring and storing entries of the persistent
+  cache of loaded ontologies (see `ontopy.loadcache`).
+- `catalog`: reading catalog files.
+- `download`: downloading via the HTTP cache (see `ontopy.httpcache`).
+  Downloads made by rdflib or Owlready2 when the HTTP cache is
+  disabled are included in the parsing phases.
+- `rdflib`: parsing formats not supported by Owlready2 with rdflib
+  into the quadstore.
+- `stream`: streaming local N-Triples and N-Quads files into the
+  quadstore.
+- `insert`: inserting triples parsed by the worker processes of
+  `load(parallel=N)`, including waiting for them.
+- `owlready2`: parsing with Owlready2.
+- `convert`: converting the ontology to RDF/XML with
+  `ontopy.utils.convert_imported()` after Owlready2 failed to parse it.
+- `owlready2-retry`: parsing the converted ontology with Owlready2.
+- `prefix`: setting prefixes with `Ontology.set_common_prefix()`.
+
+Times are exclusive, i.e. the time spent loading imported ontologies
+is only accounted to the imported ontologies.  If `memory` is true,
+the Python memory allocated in each phase is traced with `tracemalloc`.
+Memory allocated by the SQLite quadstore is not included.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, List, Optional
+
+    from ontopy.ontology import Ontology
+
+
+class ModuleReport:
+    """Timing of loading a single ontology.
+
+    Attributes:
+        iri: Base IRI of the ontology.
+        location: The file or URL that the ontology was loaded from.
+        depth: Import depth.  The ontology that `load()` was called on has
+            depth zero.
+        time: Total time spent loading the ontology, including its
+            imported ontologies.
+        phases: Dict mapping phase names to the exclusive time spent in
+            them.
+        memory: Dict mapping phase names to the net number of bytes of
+            Python memory allocated in them, including imported
+            ontologies.  Empty if memory is not traced.
+        fallback: Whether Owlready2 failed to parse the ontology and it
+            was converted to RDF/XML.
+    """
+
+    def __init__(self, iri: str, depth: int = 0):
+        self.iri = iri
+        self.location = None
+        self.depth = depth
+        self.time = 0.0
+        self.phases = {}
+        self.memory = {}
+        self.fallback = False
+
+    def __repr__(self):
+        return f"<ModuleReport {self.iri} {self.time:.3f}s>"
+
+    @property
+    def self_time(self) -> float:
+        """Time spent in the phases of this ontology, excluding imported
+        ontologies."""
+        return sum(self.phases.values())
+
+    def asdict(self) -> dict:
+        """Returns the report as a dict."""
+        return {
+            "iri": self.iri,
+            "location": self.location,
+            "depth": self.depth,
+            "time": self.time,
+            "self_time": self.self_time,
+            "phases": dict(self.phases),
+            "memory": dict(self.memory),
+            "fallback": self.fallback,
+        }
+
+
+class LoadReport:
+    """Timing and memory report of `Ontology.load()`.
+
+    Arguments:
+        memory: Whether to trace memory allocations.  This slows down
+            loading considerably.
+
+    Attributes:
+        modules: List of `ModuleReport`, one for each loaded ontology in
+            the order they started loading.
+        time: Total time spent loading.
+        peak_memory: Peak traced Python memory in bytes or None if memory
+            is not traced.
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.modules = []
+        self.time = 0.0
+        self.peak_memory = None
+        self._stack = []  # modules currently loading
+        self._nested = 0.0  # time accounted to modules, see module()
+
+    def __repr__(self):
+        return f"<LoadReport {len(self.modules)} modules {self.time:.3f}s>"
+
+    def __str__(self):
+        return self.format()
+
+    @property
+    def current(self) -> "Optional[ModuleReport]":
+        """The module currently being loaded."""
+        return self._stack[-1] if self._stack else None
+
+    @contextmanager
+    def module(self, onto: "Ontology") -> "Iterator[ModuleReport]":
+        """Context manager recording the loading of ontology `onto`."""
+        top = not self._stack
+        if top and self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        else:
+            started_tracing = False
+        module = ModuleReport(onto.base_iri, depth=len(self._stack))
+        self.modules.append(module)
+        self._stack.append(module)
+        nested = self._nested
+        start = time.perf_counter()
+        try:
+            yield module
+        finally:
+            module.time = time.perf_counter() - start
+            module.iri = onto.base_iri
+            # Replace the time of nested modules with the total time of
+            # this module, such that enclosing phases can exclude it
+            self._nested = nested + module.time
+            self._stack.pop()
+            if top:
+                self.time += module.time
+                if self.memory:
+                    self.peak_memory = max(
+                        self.peak_memory or 0,
+                        tracemalloc.get_traced_memory()[1],
+                    )
+                if started_tracing:
+                    tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> "Iterator[None]":
+        """Context manager recording the time spent in phase `name` of the
+        current module.  Does nothing if no module is being loaded."""
+        module = self.current
+        if module is None:
+            yield
+            return
+        traced = self.memory and tracemalloc.is_tracing()
+        memory = tracemalloc.get_traced_memory()[0] if traced else 0
+        nested = self._nested
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start - (self._nested - nested)
+            module.phases[name] = module.phases.get(name, 0.0) + elapsed
+            # Exclude this phase from enclosing phases of the same module
+            self._nested += elapsed
+            if traced:
+                allocated = tracemalloc.get_traced_memory()[0] - memory
+                module.memory[name] = module.memory.get(name, 0) + allocated
+
+    def phase_totals(self) -> "Dict[str, float]":
+        """Returns a dict mapping phase names to the total time spent in
+        them for all modules."""
+        totals = {}
+        for module in self.modules:
+            for name, elapsed in module.phases.items():
+                totals[name] = totals.get(name, 0.0) + elapsed
+        return totals
+
+    def slowest(self, n: int = 10) -> "List[ModuleReport]":
+        """Returns the `n` modules with the largest exclusive time."""
+        return sorted(self.modules, key=lambda m: -m.self_time)[:n]
+
+    def asdict(self) -> dict:
+        """Returns the report as a dict, e.g. for serialising to JSON."""
+        return {
+            "time": self.time,
+            "peak_memory": self.peak_memory,
+            "phases": self.phase_totals(),
+            "modules": [module.asdict() for module in self.modules],
+        }
+
+    def format(self) -> str:
+        """Returns the report as a human readable table.
+
+        Modules are listed in load order and indented by import depth.
+        Times are in seconds and memory in MiB.
+        """
+        names = list(self.phase_totals())
+        header = ["total", "self"] + names
+        lines = [
+            " ".join(f"{h:>9}" for h in header) + "  ontology",
+        ]
+        for module in self.modules:
+            values = [module.time, module.self_time] + [
+                module.phases.get(name, 0.0) for name in names
+            ]
+            flag = " (fallback)" if module.fallback else ""
+            lines.append(
+                " ".join(f"{v:9.3f}" for v in values)
+                + "  "
+                + "  " * module.depth
+                + f"{module.iri}{flag}"
+            )
+        lines.append("")
+        lines.append(
+            f"Loaded {len(self.modules)} ontologies in {self.time:.3f} s"
+        )
+        for name, elapsed in sorted(
+            self.phase_totals().items(), key=lambda item: -item[1]
+        ):
+            line = f"  {name:<16} {elapsed:9.3f} s"
+            if self.memory:
+                allocated = sum(m.memory.get(name, 0) for m in self.modules)
+                line += f" {allocated / 2**20:9.1f} MiB"
+            lines.append(line)
+        if self.peak_memory is not None:
+            lines.append(f"Peak memory: {self.peak_memory / 2**20:.1f} MiB")
+        return "\n".join(lines)
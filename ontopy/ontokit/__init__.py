@@ -2,7 +2,7 @@
 
 from importlib import import_module
 
-__all__ = ["docs", "setup"]
+__all__ = ["cache", "docs", "setup"]
 
 
 def __getattr__(name):
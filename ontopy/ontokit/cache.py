@@ -0,0 +1,92 @@
+"""Module for the ontokit cache sub-command."""
+
+import time
+
+from ontopy.httpcache import get_http_cache
+
+
+def cache_arguments(subparsers):
+    """Define arguments for the cache sub-command."""
+    parser = subparsers.add_parser(
+        "cache",
+        help="Inspect and maintain the local cache of downloaded ontologies.",
+    )
+    parser.set_defaults(subcommand=cache_subcommand)
+
+    parser.add_argument(
+        "action",
+        choices=["list", "fetch", "remove", "prune", "clear"],
+        help=(
+            "`list` shows the cached URLs, `fetch` downloads or revalidates "
+            "the given URLs (e.g. for later offline use), `remove` removes "
+            "the given URLs, `prune` removes unreferenced content and "
+            "entries older than --max-age and `clear` empties the cache."
+        ),
+    )
+
+    parser.add_argument(
+        "urls",
+        metavar="URL",
+        nargs="*",
+        help="URLs to fetch or remove.",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        "-d",
+        metavar="PATH",
+        help=(
+            "Cache directory. Defaults to the ONTOPY_HTTP_CACHE_DIR "
+            "environment variable or the `http` sub-directory of "
+            "ONTOPY_CACHE_DIR."
+        ),
+    )
+
+    parser.add_argument(
+        "--max-age",
+        metavar="SECONDS",
+        type=float,
+        help="Used with `prune`. Remove entries fetched longer ago.",
+    )
+
+    parser.add_argument(
+        "--ttl",
+        metavar="SECONDS",
+        type=float,
+        default=0,
+        help=(
+            "Used with `fetch`. Only revalidate entries fetched longer ago. "
+            "The default is to always revalidate."
+        ),
+    )
+
+
+def cache_subcommand(args):
+    """Implements the cache sub-command."""
+    cache = get_http_cache(args.cache_dir, ttl=args.ttl, offline=False)
+    if cache is None:
+        raise ValueError(
+            "No cache directory. Use --cache-dir or set the "
+            "ONTOPY_HTTP_CACHE_DIR environment variable."
+        )
+
+    if args.action == "list":
+        for entry in cache.entries():
+            fetched = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(entry["fetched"])
+            )
+            print(f"{fetched}  {entry['size']:>10}  {entry['url']}")
+    elif args.action == "fetch":
+        for url in args.urls:
+            print(f"{url} -> {cache.fetch(url)}")
+    elif args.action == "remove":
+        for url in args.urls:
+            if not cache.remove(url):
+                print(f"Not cached: {url}")
+        cache.prune()
+    elif args.action == "prune":
+        removed = cache.prune(args.max_age)
+        print(f"Removed {removed} entries")
+    elif args.action == "clear":
+        cache.clear()
+    return 0
@@ -8,14 +8,20 @@ If desirable some of these additions may be moved back into owlready2.
 # pylint: disable=disable=too-many-arguments,too-many-positional-arguments
 from typing import TYPE_CHECKING, Optional, Union
 import os
+import filecmp
 import fnmatch
+import functools
 import itertools
 import inspect
 import warnings
 import uuid
 import tempfile
+import shutil
+import sqlite3
 import types
 import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from collections import defaultdict
 from collections.abc import Iterable
@@ -29,9 +35,27 @@ from owlready2 import locstr
 from owlready2.entity import ThingClass
 from owlready2.prop import ObjectPropertyClass, DataPropertyClass
 from owlready2 import AnnotationPropertyClass
-from owlready2.base import rdf_type
+from owlready2.base import rdf_type, rdf_property, owl_imports, owl_ontology
 
 from ontopy.factpluspluswrapper.sync_factpp import sync_reasoner_factpp
+from ontopy.hierarchy import HierarchyIndex
+from ontopy.httpcache import get_http_cache
+from ontopy.similarity import similarity_matrix
+from ontopy.labelindex import LabelIndex
+from ontopy.loadcache import (
+    LoadCache,
+    get_cache_dir,
+    is_pristine,
+    replace_quadstore,
+)
+from ontopy.quadstore import (
+    STREAMING_FORMATS,
+    ParallelParser,
+    insert_triples,
+    parse_into,
+    stream_into,
+)
+from ontopy.rdfwriter import WRITER_FORMATS, write_graph, write_stored_graph
 from ontopy.utils import (  # pylint: disable=cyclic-import
     english,
     asstring,
@@ -60,6 +84,30 @@ if TYPE_CHECKING:
     from typing import Iterator, List, Sequence, Tuple, Generator
 
 
+# Type IRIs of the entities returned by Ontology.get_entities()
+_OWL = "http://www.w3.org/2002/07/owl#"
+
+# Namespaces whose IRIs never trigger loading of deferred imports
+RESERVED_NAMESPACES = (
+    _OWL,
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "http://www.w3.org/2000/01/rdf-schema#",
+    "http://www.w3.org/2001/XMLSchema#",
+)
+ENTITY_TYPE_IRIS = {
+    "classes": (_OWL + "Class", "http://www.w3.org/2000/01/rdf-schema#Class"),
+    "individuals": (_OWL + "NamedIndividual",),
+    "object_properties": (_OWL + "ObjectProperty",),
+    "data_properties": (_OWL + "DatatypeProperty",),
+    "annotation_properties": (_OWL + "AnnotationProperty",),
+    "properties": (
+        _OWL + "ObjectProperty",
+        _OWL + "AnnotationProperty",
+        _OWL + "DatatypeProperty",
+        "http://www.w3.org/1999/02/22-rdf-syntax-ns#Property",
+    ),
+}
+
 # Default annotations to look up
 DEFAULT_LABEL_ANNOTATIONS = [
     "http://www.w3.org/2004/02/skos/core#prefLabel",
@@ -68,6 +116,17 @@ DEFAULT_LABEL_ANNOTATIONS = [
 ]
 
 
+def _hooked(method, hook):
+    """Returns a function that calls `method` and then `hook` with the
+    same arguments."""
+
+    def wrapper(*args, **kwargs):
+        method(*args, **kwargs)
+        hook(*args, **kwargs)
+
+    return wrapper
+
+
 def get_ontology(*args, **kwargs):
     """Returns a new Ontology from `base_iri`.
 
@@ -75,15 +134,295 @@ def get_ontology(*args, **kwargs):
     return World().get_ontology(*args, **kwargs)
 
 
-class World(owlready2.World):
+class World(owlready2.World):  # pylint: disable=too-many-instance-attributes
     """A subclass of owlready2.World."""
 
     def __init__(self, *args, **kwargs):
         # Caches stored in the world
         self._cached_catalogs = {}  # maps url to (mtime, iris, dirs)
         self._iri_mappings = {}  # all iri mappings loaded so far
+        self._label_index = LabelIndex(self)
+        self._hierarchy = HierarchyIndex(self)
+        self._imports_generation = 0  # incremented when owl:imports change
+        self._load_sources = None  # records sources while filling the cache
+        self._restoring = False  # true while loading from a cached quadstore
+        self._load_report = None  # LoadReport of ongoing load, if any
+        self._parallel_parser = None  # parses imports in parallel when set
+        self._lazy_imports = {}  # maps base iri to imports not yet loaded
+        self._deferring_imports = False  # true while loading lazily
         super().__init__(*args, **kwargs)
 
+    def __getitem__(self, iri):
+        entity = super().__getitem__(iri)
+        if (
+            entity is None
+            and self._lazy_imports
+            and not self._deferring_imports
+            and isinstance(iri, str)
+            and not iri.startswith(RESERVED_NAMESPACES)
+        ):
+            # Load deferred imports whose namespace matches, then one
+            # import level at a time until the entity is found
+            matching = [
+                onto
+                for base_iri, onto in self._lazy_imports.items()
+                if iri.startswith(base_iri)
+            ]
+            if matching:
+                self._load_lazy_imports(matching)
+                entity = super().__getitem__(iri)
+            while entity is None and self._lazy_imports:
+                self._load_lazy_imports()
+                entity = super().__getitem__(iri)
+        return entity
+
+    def _load_lazy_imports(self, ontologies=None):
+        """Load imported ontologies that were deferred by
+        `Ontology.load(lazy_imports=True)`.
+
+        Arguments:
+            ontologies: The deferred ontologies to load.  Defaults to all
+                currently deferred ontologies.  Their imported ontologies
+                are deferred in turn.
+        """
+        if ontologies is None:
+            ontologies = list(self._lazy_imports.values())
+        for onto in ontologies:
+            if self._lazy_imports.pop(onto.base_iri, None) is onto:
+                onto.load(lazy_imports=True)
+
+    def set_backend(self, *args, **kwargs):
+        super().set_backend(*args, **kwargs)
+        # Owlready2 rebinds the raw triple methods when changing backend
+        self._install_triple_hooks(self)
+        for onto in self.ontologies.values():
+            self._install_triple_hooks(onto)
+        self._invalidate_indexes()
+        self._install_change_tracking()
+
+    def _install_change_tracking(self):
+        """Record the contexts of all added and removed triples in the
+        temporary table `ontopy_changed`.
+
+        SQLite triggers are used, such that changes made by all code
+        paths (including parsing and SPARQL updates) are recorded.  The
+        ontologies already in the quadstore are recorded as changed.
+        """
+        db = self.graph.db
+        db.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS ontopy_changed "
+            "(c INTEGER PRIMARY KEY)"
+        )
+        for table in "objs", "datas":
+            for event, rows in (
+                ("INSERT", ("NEW",)),
+                ("DELETE", ("OLD",)),
+                ("UPDATE", ("OLD", "NEW")),
+            ):
+                inserts = " ".join(
+                    f"INSERT OR IGNORE INTO ontopy_changed VALUES ({row}.c);"
+                    for row in rows
+                )
+                db.execute(
+                    "CREATE TEMP TRIGGER IF NOT EXISTS "
+                    f"ontopy_{table}_{event.lower()} AFTER {event} "
+                    f"ON main.{table} BEGIN {inserts} END"
+                )
+        db.execute(
+            "INSERT OR IGNORE INTO ontopy_changed SELECT c FROM ontologies"
+        )
+
+    def _is_changed(self, onto):
+        """Returns whether triples have been added to or removed from
+        ontology `onto` since it was marked as unchanged."""
+        return bool(
+            self.graph.execute(
+                "SELECT 1 FROM ontopy_changed WHERE c=?", (onto.graph.c,)
+            ).fetchone()
+        )
+
+    def _mark_unchanged(self, onto):
+        """Mark ontology `onto` as unchanged."""
+        self.graph.execute(
+            "DELETE FROM ontopy_changed WHERE c=?", (onto.graph.c,)
+        )
+
+    def _install_triple_hooks(self, namespace):
+        """Wrap the raw triple methods of `namespace`, which is either
+        this world or one of its ontologies, such that the indexes of
+        this world are kept up to date when triples are added or removed.
+
+        This follows the approach used by the owlready2.observe module.
+        """
+        # pylint: disable=invalid-name
+        if namespace.graph is None:
+            return
+        index = self._label_index
+        c = None if namespace is self else namespace.graph.c
+
+        def obj_triples_removed(s=None, p=None, o=None):
+            index.obj_triples_removed(s, p, o)
+            self._obj_triples_changed(p, o)
+
+        def data_triples_removed(s=None, p=None, o=None, d=None):
+            index.triples_removed(c, s, p, o, d)
+
+        hooks = {
+            "_del_obj_triple_raw_spo": obj_triples_removed,
+            "_del_data_triple_raw_spod": data_triples_removed,
+        }
+        for name, hook in hooks.items():
+            setattr(
+                namespace, name, _hooked(getattr(namespace.graph, name), hook)
+            )
+
+        if namespace is self:
+            self._install_refactor_hooks()
+            return
+
+        def obj_triple_added(s, p, o):
+            index.obj_triple_added(c, s, p, o)
+            self._obj_triples_changed(p, o)
+
+        def obj_triple_set(s, p, o):
+            index.obj_triples_removed(s, p, None)
+            index.obj_triple_added(c, s, p, o)
+            self._obj_triples_changed(p, None)
+
+        def data_triple_set(s, p, o, d):
+            index.triples_removed(None, s, p, None, None)
+            index.triple_added(c, s, p, o, d)
+
+        hooks = {
+            "_add_obj_triple_raw_spo": obj_triple_added,
+            "_set_obj_triple_raw_spo": obj_triple_set,
+            "_add_data_triple_raw_spod": functools.partial(
+                index.triple_added, c
+            ),
+            "_set_data_triple_raw_spod": data_triple_set,
+        }
+        for name, hook in hooks.items():
+            setattr(
+                namespace, name, _hooked(getattr(namespace.graph, name), hook)
+            )
+
+    def _install_refactor_hooks(self):
+        """Wrap the methods of this world that change IRIs, such that the
+        indexes of this world are kept up to date."""
+
+        def onto_renamed(*_):
+            self._invalidate_indexes()
+
+        hooks = {
+            "_refactor": self._label_index.resource_renamed,
+            "_refactor_onto": onto_renamed,
+        }
+        for name, hook in hooks.items():
+            setattr(self, name, _hooked(getattr(self.graph, name), hook))
+
+    def _invalidate_indexes(self):
+        """Invalidate all indexes of this world.
+
+        This is called after changes that bypass the triple hooks, like
+        loading a new ontology.  The indexes are rebuilt lazily.
+        """
+        self._label_index.invalidate()
+        self._hierarchy.invalidate()
+        self._imports_generation += 1
+
+    def _obj_triples_changed(self, p, o):
+        """Update the indexes of this world after object triples with
+        predicate `p` and object `o` have been added or removed.  None
+        means any predicate or object."""
+        # pylint: disable=invalid-name
+        if p is None or p == owl_imports:
+            self._imports_generation += 1
+        self._hierarchy.obj_triples_changed(p, o)
+
+    def _get_by_iris(self, iris, chunksize=500):
+        """Returns a dict mapping the IRIs in `iris` that correspond to
+        entities in this world to their entities.
+
+        The IRIs are resolved with one query per `chunksize` IRIs.
+        """
+        iris = list(iris)
+        result = {}
+        for i in range(0, len(iris), chunksize):
+            chunk = iris[i : i + chunksize]
+            sql = (
+                "SELECT storid, iri FROM resources WHERE iri IN "
+                f"({','.join('?' * len(chunk))})"
+            )
+            for storid, iri in self.graph.execute(sql, chunk).fetchall():
+                entity = self._get_by_storid(storid, iri)
+                if entity is not None:
+                    result[iri] = entity
+        return result
+
+    def _query_entities(self, entity_types, ontologies):
+        """Yield all entities of the given types declared in any of the
+        ontologies in `ontologies`, which must belong to this world.
+
+        See `Ontology._entities()` for valid values of `entity_types`.
+        Entities of type rdf:Property (included in "properties") are
+        returned as IRIs, after all other entities.
+        """
+        type_of = {}  # maps type storid to entity type
+        for entity_type in entity_types:
+            for iri in ENTITY_TYPE_IRIS[entity_type]:
+                storid = self._abbreviate(iri, False)
+                if storid:
+                    type_of.setdefault(storid, entity_type)
+        if not type_of:
+            return
+
+        seen = set()
+        rdf_properties = []
+        for s, o in self._query_declarations(type_of, ontologies):
+            if s in seen:
+                continue
+            if o == rdf_property:
+                rdf_properties.append(s)
+                continue
+            entity = self._get_by_storid(s)
+            if type_of[o] == "individuals" and not isinstance(
+                entity, owlready2.Thing
+            ):
+                continue
+            seen.add(s)
+            yield entity
+        for s in rdf_properties:
+            if s not in seen:
+                seen.add(s)
+                yield self._unabbreviate(s)
+
+    def _query_declarations(self, type_storids, ontologies):
+        """Returns a list of `(s, o)` pairs for all rdf:type triples with
+        an object in `type_storids` in the ontologies in `ontologies`.
+
+        The pairs are grouped by type and then by ontology, in the order
+        of `type_storids` and `ontologies`.
+        """
+        contexts = [onto.graph.c for onto in ontologies]
+        type_order = " ".join(
+            f"WHEN {int(storid)} THEN {i}"
+            for i, storid in enumerate(type_storids)
+        )
+        context_order = " ".join(
+            f"WHEN {int(c)} THEN {i}" for i, c in enumerate(contexts)
+        )
+        sql = (
+            "SELECT s, o FROM objs WHERE p=? AND s>0 "
+            f"AND o IN ({','.join('?' * len(type_storids))}) "
+            f"AND c IN ({','.join('?' * len(contexts))}) "
+            f"ORDER BY CASE o {type_order} END, CASE c {context_order} END"
+        )
+        # Fetch all rows up front, since callers may modify the
+        # ontology while iterating
+        return self.graph.execute(
+            sql, (rdf_type, *type_storids, *contexts)
+        ).fetchall()
+
     def get_ontology(
         self,
         base_iri: str = "emmo-inferred",
@@ -182,7 +521,9 @@ class World(owlready2.World):
         )
 
 
-class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
+class Ontology(
+    owlready2.Ontology
+):  # pylint: disable=too-many-public-methods,too-many-instance-attributes
     """A generic class extending owlready2.Ontology.
 
     Additional attributes:
@@ -200,10 +541,21 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         self.iri = None
         self.label_annotations = DEFAULT_LABEL_ANNOTATIONS[:]
         self.prefix = None
+        # Maps (path, format, iri) of files known to contain the current
+        # triples of this ontology to their (mtime, size), see save()
+        self._synced_files = {}
+        if isinstance(self.world, World):
+            self.world._install_triple_hooks(self)
 
     # Name of special unlabeled entities, like Thing, Nothing, etc...
     _special_labels = None
 
+    # Cached recursive import closure as a (stamps, closure) tuple
+    _import_closure = None
+
+    # Local file or URL that the ontology was last loaded from
+    _load_location = None
+
     # Some properties for customising dir() listing - useful in
     # interactive sessions...
     _dir_preflabel = isinteractive()
@@ -283,6 +635,12 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         # Play nice with inspect...
         pass
 
+    def _entity_destroyed(self, entity):
+        """Called by owlready2.destroy_entity()."""
+        super()._entity_destroyed(entity)
+        if isinstance(self.world, World):
+            self.world._invalidate_indexes()
+
     def __hash__(self):
         """Returns a hash based on base_iri.
         This is done to keep Ontology hashable when defining __eq__.
@@ -357,9 +715,33 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         the `prefix` argument a warning will be issued and the
         `prefix` argument will take precedence.
 
-        A NoSuchLabelError is raised if `label` cannot be found.
+        A NoSuchLabelError is raised if `label` cannot be found.  If
+        imported ontologies were deferred by `load(lazy_imports=True)`,
+        they are loaded one import level at a time until `label` is
+        found.
         """
         # pylint: disable=too-many-arguments,too-many-branches,invalid-name
+        # pylint: disable=too-many-return-statements
+        world = self.world
+        if imported and world._lazy_imports and not world._deferring_imports:
+            world._deferring_imports = True  # do not load in world[iri]
+            try:
+                while True:
+                    try:
+                        return self.get_by_label(
+                            label,
+                            label_annotations=label_annotations,
+                            prefix=prefix,
+                            imported=imported,
+                            colon_in_label=colon_in_label,
+                        )
+                    except NoSuchLabelError:
+                        if not world._lazy_imports:
+                            raise
+                        world._load_lazy_imports()
+            finally:
+                world._deferring_imports = False
+
         if not isinstance(label, str):
             raise TypeError(
                 f"Invalid label definition, must be a string: '{label}'"
@@ -406,20 +788,22 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
                 f"with prefix '{prefix}'."
             )
 
+        # Repeated failed lookups are answered from the negative cache
+        index = self.world._label_index
+        miss = (label, tuple(label_annotations), imported, self.storid)
+        if index.is_miss(miss):
+            raise NoSuchLabelError(f"No label annotations matches '{label}'")
+
         # Label is a full IRI
         entity = self.world[label]
         if entity:
             return entity
 
-        get_triples = (
-            self.world._get_data_triples_spod_spod
-            if imported
-            else self._get_data_triples_spod_spod
-        )
-
-        for storid in self._to_storids(label_annotations):
-            for s, _, _, _ in get_triples(None, storid, label, None):
-                return self.world[self._unabbreviate(s)]
+        contexts = None if imported else {self.graph.c}
+        for storid in index.lookup(
+            label, self._to_storids(label_annotations), contexts
+        ):
+            return self.world[self._unabbreviate(storid)]
 
         # Special labels
         if self._special_labels and label in self._special_labels:
@@ -431,12 +815,201 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             return entity
 
         # Check label is the name of an entity
-        for entity in self.get_entities(imported=imported):
-            if label == entity.name:
-                return entity
+        for entity in self._get_by_name([label], imported=imported):
+            return entity
 
+        # Changes in other worlds do not clear the negative cache
+        if not imported or all(
+            onto.world is self.world
+            for onto in self.get_imported_ontologies(recursive=True)
+        ):
+            index.add_miss(miss)
         raise NoSuchLabelError(f"No label annotations matches '{label}'")
 
+    def get_by_labels(
+        self,
+        labels: "Iterable[str]",
+        *,
+        label_annotations: str = None,
+        prefix: str = None,
+        imported: bool = True,
+        colon_in_label: bool = None,
+        on_missing: str = "raise",
+    ) -> "Tuple[dict, List[str], dict]":
+        """Look up many labels at once.
+
+        This gives the same result as calling `get_by_label()` for each
+        label, but label annotations are only resolved once and full
+        IRIs are resolved with a single query against the quadstore.
+
+        Arguments:
+           labels: Iterable of labels to look up.  Like in get_by_label(),
+               each label may be written as 'label' or 'prefix:label'.
+           label_annotations: a sequence of label annotation names to look up.
+               Defaults to the `label_annotations` property.
+           prefix: if provided, it should be the last component of
+               the base iri of an ontology (with trailing slash (/) or hash
+               (#) stripped off).  The search for matching labels will be
+               limited to this namespace.
+           imported: Whether to also look for labels in imported ontologies.
+           colon_in_label: Whether to accept colon (:) in a label or name-part
+               of IRI.  Defaults to the `colon_in_label` property of `self`.
+               Setting this true cannot be combined with `prefix`.
+           on_missing: What to do if some labels cannot be found or are
+               ambiguous within a prefix.  Should be one of "raise" (raise
+               NoSuchLabelError or AmbiguousLabelError), "warn" (issue a
+               warning) or "ignore".
+
+        Returns:
+            entities: Dict mapping each label that could be resolved to
+                the entity that get_by_label() would have returned.
+            missing: List of labels that could not be found.
+            ambiguous: Dict mapping labels matching several entities to
+                the set of matching entities.  Ambiguous labels with a
+                prefix are not included in `entities`.
+        """
+        # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+        # pylint: disable=too-many-statements
+        if on_missing not in ("raise", "warn", "ignore"):
+            raise ValueError(
+                "`on_missing` must be 'raise', 'warn' or 'ignore', "
+                f"got {on_missing!r}"
+            )
+        if label_annotations is None:
+            label_annotations = self.label_annotations
+        if colon_in_label is None:
+            colon_in_label = self._colon_in_label
+        if colon_in_label and prefix:
+            raise ValueError(
+                "`prefix` cannot be combined with `colon_in_label`"
+            )
+
+        # Split labels into plain labels and labels with a prefix
+        plain = {}  # maps label to lookup key
+        prefixed = {}  # maps label to (lookup key, prefix)
+        for label in labels:
+            if not isinstance(label, str):
+                raise TypeError(
+                    f"Invalid label definition, must be a string: '{label}'"
+                )
+            key, pre = label, prefix
+            if not colon_in_label:
+                splitlabel = label.split(":", 1)
+                if len(splitlabel) == 2 and not splitlabel[1].startswith("//"):
+                    key = splitlabel[1]
+                    if prefix and prefix != splitlabel[0]:
+                        warnings.warn(
+                            f"Prefix given both as argument ({prefix}) "
+                            f"and in label ({splitlabel[0]}). "
+                            "Prefix given in argument takes precedence. "
+                        )
+                    if not prefix:
+                        pre = splitlabel[0]
+            if pre:
+                prefixed[label] = (key, pre)
+            else:
+                plain[label] = key
+
+        index = self.world._label_index
+        storids = self._to_storids(label_annotations)
+        entities = {}
+        missing = []
+        ambiguous = {}
+
+        # Labels with a prefix
+        byname = defaultdict(set)
+        for entity in self._get_by_name({key for key, _ in prefixed.values()}):
+            byname[entity.name].add(entity)
+        for label, (key, pre) in prefixed.items():
+            if "*" in key:
+                entityset = self.get_by_label_all(
+                    key, label_annotations=label_annotations, prefix=pre
+                )
+            else:
+                entityset = {
+                    self.world._get_by_storid(s)
+                    for s in index.lookup(key, storids)
+                }
+                if self._special_labels and key in self._special_labels:
+                    entityset.add(self._special_labels[key])
+                entityset.update(byname.get(key, ()))
+                entityset = {
+                    ent
+                    for ent in entityset
+                    if ent is not None and ent.namespace.ontology.prefix == pre
+                }
+            if len(entityset) == 1:
+                entities[label] = entityset.pop()
+            elif entityset:
+                ambiguous[label] = entityset
+            else:
+                missing.append(label)
+
+        # Plain labels, resolved in the same order as get_by_label()
+        misskeys = {
+            label: (key, tuple(label_annotations), imported, self.storid)
+            for label, key in plain.items()
+        }
+        pending = {
+            label: key
+            for label, key in plain.items()
+            if not index.is_miss(misskeys[label])
+        }
+        missing.extend(label for label in plain if label not in pending)
+        # Changes in other worlds do not clear the negative cache
+        cache_misses = not imported or all(
+            onto.world is self.world
+            for onto in self.get_imported_ontologies(recursive=True)
+        )
+        iris = self.world._get_by_iris(
+            set(pending.values())
+            | {self.base_iri + key for key in pending.values()}
+        )
+        contexts = None if imported else {self.graph.c}
+        byname = defaultdict(list)
+        for entity in self._get_by_name(
+            set(pending.values()), imported=imported
+        ):
+            byname[entity.name].append(entity)
+        for label, key in pending.items():
+            matches = []
+            for storid in index.lookup(key, storids, contexts):
+                if storid not in matches:
+                    matches.append(storid)
+            if len(matches) > 1:
+                ambiguous[label] = {
+                    self.world._get_by_storid(s) for s in matches
+                }
+            if key in iris:
+                entities[label] = iris[key]
+            elif matches:
+                entities[label] = self.world._get_by_storid(matches[0])
+            elif self._special_labels and key in self._special_labels:
+                entities[label] = self._special_labels[key]
+            elif self.base_iri + key in iris:
+                entities[label] = iris[self.base_iri + key]
+            elif key in byname:
+                entities[label] = byname[key][0]
+            else:
+                missing.append(label)
+                if cache_misses:
+                    index.add_miss(misskeys[label])
+
+        unresolved = missing + [
+            label for label in ambiguous if label in prefixed
+        ]
+        if unresolved and on_missing != "ignore":
+            msg = "Cannot resolve labels: " + ", ".join(
+                f"'{label}'" for label in unresolved
+            )
+            if on_missing == "warn":
+                warnings.warn(msg)
+            elif missing:
+                raise NoSuchLabelError(msg)
+            else:
+                raise AmbiguousLabelError(msg)
+        return entities, missing, ambiguous
+
     def get_by_label_all(
         self,
         label,
@@ -465,6 +1038,7 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             Set of all matching entities or an empty set if no matches
             could be found.
         """
+        self.load_imports()
         if not isinstance(label, str):
             raise TypeError(
                 f"Invalid label definition, " f"must be a string: {label!r}"
@@ -481,38 +1055,38 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
 
         # Check label annotations
         if exact_match:
-            for storid in self._to_storids(label_annotations):
-                entities.update(
-                    self.world._get_by_storid(s)
-                    for s, _, _ in self.world._get_data_triples_spod_spod(
-                        None, storid, str(label), None
-                    )
+            entities.update(
+                self.world._get_by_storid(s)
+                for s in self.world._label_index.lookup(
+                    str(label), self._to_storids(label_annotations)
                 )
+            )
         else:
-            for storid in self._to_storids(label_annotations):
-                label_entity = self._unabbreviate(storid)
-                key = (
-                    label_entity.name
-                    if hasattr(label_entity, "name")
-                    else label_entity
+            # Like `World.search()`, only treat the label as a glob
+            # pattern if it contains a "*"
+            index = self.world._label_index
+            storids = self._to_storids(label_annotations)
+            if "*" in label:
+                keys = list(
+                    index.match_labels(label.replace("[^", "[!"), storids)
+                )
+            else:
+                keys = [label]
+            for key in keys:
+                entities.update(
+                    self.world._get_by_storid(s)
+                    for s in index.lookup(key, storids)
                 )
-                entities.update(self.world.search(**{key: label}))
 
         if self._special_labels and label in self._special_labels:
             entities.update(self._special_labels[label])
 
         # Check name-part of IRI
         if exact_match:
-            entities.update(
-                ent for ent in self.get_entities() if ent.name == str(label)
-            )
+            names = [str(label)]
         else:
-            matches = fnmatch.filter(
-                (ent.name for ent in self.get_entities()), label
-            )
-            entities.update(
-                ent for ent in self.get_entities() if ent.name in matches
-            )
+            names = self._match_entity_names(label)
+        entities.update(self._get_by_name(names))
 
         if prefix:
             return set(
@@ -522,6 +1096,70 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             )
         return entities
 
+    def _get_by_name(self, names, imported=True):
+        """Yield entities whose IRI name-part is in the sequence `names`
+        and are declared in this ontology or, if `imported` is true, in
+        any of its recursively imported ontologies.
+
+        Imported ontologies may live in other worlds, so the lookup is
+        done in the name index of each world separately.
+        """
+        ontologies = [self]
+        if imported:
+            ontologies.extend(self.get_imported_ontologies(recursive=True))
+        worlds = defaultdict(set)
+        for onto in ontologies:
+            worlds[onto.world].add(onto)
+
+        for world, ontos in worlds.items():
+            if isinstance(world, World):
+                contexts = {onto.graph.c for onto in ontos}
+                for name in names:
+                    for storid in world._label_index.lookup_name(
+                        name, contexts
+                    ):
+                        entity = world._get_by_storid(storid)
+                        if entity is not None and entity.name == name:
+                            yield entity
+            else:
+                for onto in ontos:
+                    for entity in itertools.chain(
+                        onto.classes(),
+                        onto.individuals(),
+                        onto.properties(),
+                    ):
+                        if entity.name in names:
+                            yield entity
+
+    def _match_entity_names(self, pattern, imported=True):
+        """Returns a set with the IRI name-part of all entities in all
+        worlds that this ontology and, if `imported` is true, its
+        recursively imported ontologies belong to, that matches the
+        glob pattern `pattern`."""
+        ontologies = [self]
+        if imported:
+            ontologies.extend(self.get_imported_ontologies(recursive=True))
+        names = set()
+        for world in {onto.world for onto in ontologies}:
+            if isinstance(world, World):
+                names.update(world._label_index.match_names(pattern))
+        for onto in ontologies:
+            if not isinstance(onto.world, World):
+                names.update(
+                    fnmatch.filter(
+                        (
+                            entity.name
+                            for entity in itertools.chain(
+                                onto.classes(),
+                                onto.individuals(),
+                                onto.properties(),
+                            )
+                        ),
+                        pattern,
+                    )
+                )
+        return names
+
     def _to_storids(self, sequence, create_if_missing=False):
         """Return a list of storid's corresponding to the elements in the
         sequence `sequence`.
@@ -617,7 +1255,7 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
                     iri_base=iri_base, prefix=prefix, visited=visited
                 )
 
-    def load(  # pylint: disable=too-many-arguments,arguments-renamed
+    def load(  # pylint: disable=too-many-arguments,too-many-locals,arguments-renamed
         self,
         *,
         only_local=False,
@@ -630,6 +1268,10 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         emmo_based=True,
         prefix=None,
         prefix_emmo=None,
+        cache_dir=None,
+        parallel=None,
+        lazy_imports=False,
+        report=None,
         **kwargs,
     ):
         """Load the ontology.
@@ -664,6 +1306,27 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         prefix_emmo: bool, default None. If emmo_based is True it
             defaults to True and sets the prefix of all imported ontologies
             with base_iri starting with 'http://emmo.info/emmo' to emmo
+        cache_dir: str | Path | None
+            Directory for caching the parsed ontology and its imports
+            between sessions.  Defaults to the `ONTOPY_CACHE_DIR`
+            environment variable.  The cache is only used when loading
+            into an empty world.  See `ontopy.loadcache`.
+        parallel: int | None
+            If larger than one, the ontology and its imported ontologies
+            are parsed in this number of worker processes, while they are
+            inserted into the quadstore one by one.  Only local files in
+            formats parsed by rdflib (like Turtle) are parsed in parallel.
+        lazy_imports: bool
+            Whether to defer loading of imported ontologies until they are
+            needed.  Imported ontologies are then created, but only loaded
+            when looked up with `get_by_label()` or `world[iri]`, or when
+            traversed with `get_imported_ontologies()` or
+            `get_entities(imported=True)`.  Use `load_imports()` to load
+            all of them.  The cache is not used with lazy imports.
+        report: LoadReport | None
+            If given, the time spent in each phase of loading the ontology
+            and each of its imported ontologies is recorded in this
+            `ontopy.loadreport.LoadReport` instance.
         kwargs:
             Additional keyword arguments are passed on to
             owlready2.Ontology.load().
@@ -672,28 +1335,95 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
 
         if self.loaded:
             return self
-        self._load(
-            only_local=only_local,
-            filename=filename,
-            format=format,
-            reload=reload,
-            reload_if_newer=reload_if_newer,
-            url_from_catalog=url_from_catalog,
-            catalog_file=catalog_file,
-            **kwargs,
-        )
+        world = self.world
+        if world._deferring_imports and not lazy_imports:
+            # Imported by an ontology loaded with lazy_imports=True
+            world._lazy_imports[self.base_iri] = self
+            return self
+        owns_report = report is not None and world._load_report is None
+        if owns_report:
+            world._load_report = report
+        report = world._load_report
+        try:
+            with report.module(self) if report else nullcontext():
+                self._load_module(
+                    only_local=only_local,
+                    filename=filename,
+                    format=format,
+                    reload=reload,
+                    reload_if_newer=reload_if_newer,
+                    url_from_catalog=url_from_catalog,
+                    catalog_file=catalog_file,
+                    emmo_based=emmo_based,
+                    prefix=prefix,
+                    prefix_emmo=prefix_emmo,
+                    cache_dir=cache_dir,
+                    parallel=parallel,
+                    lazy_imports=lazy_imports,
+                    **kwargs,
+                )
+        finally:
+            if owns_report:
+                world._load_report = None
+        return self
+
+    def _load_module(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        only_local,
+        filename,
+        format,  # pylint: disable=redefined-builtin
+        reload,
+        reload_if_newer,
+        url_from_catalog,
+        catalog_file,
+        emmo_based,
+        prefix,
+        prefix_emmo,
+        cache_dir,
+        parallel,
+        lazy_imports,
+        **kwargs,
+    ):
+        """Help function for load() that loads the ontology and sets
+        its prefix."""
+        cache_dir = None if lazy_imports else get_cache_dir(cache_dir)
+        with self._loading(parallel, lazy_imports, catalog_file):
+            if self.world._restoring:
+                with self._profile("cache"):
+                    self._finish_load(
+                        self.graph._iter_ontology_iri(self.graph.c)
+                    )
+            elif (
+                cache_dir
+                and not kwargs
+                and self.world._load_sources is None
+                and is_pristine(self.world, self)
+            ):
+                self._load_cached(
+                    LoadCache(cache_dir),
+                    only_local=only_local,
+                    filename=filename,
+                    format=format,
+                    reload=reload,
+                    url_from_catalog=url_from_catalog,
+                    catalog_file=catalog_file,
+                )
+            else:
+                self._load(
+                    only_local=only_local,
+                    filename=filename,
+                    format=format,
+                    reload=reload,
+                    reload_if_newer=reload_if_newer,
+                    url_from_catalog=url_from_catalog,
+                    catalog_file=catalog_file,
+                    **kwargs,
+                )
 
         # Enable optimised search by get_by_label()
         if self._special_labels is None and emmo_based:
-            top = self.world["http://www.w3.org/2002/07/owl#topObjectProperty"]
-            self._special_labels = {
-                "Thing": owlready2.Thing,
-                "Nothing": owlready2.Nothing,
-                "topObjectProperty": top,
-                "owl:Thing": owlready2.Thing,
-                "owl:Nothing": owlready2.Nothing,
-                "owl:topObjectProperty": top,
-            }
+            self._set_special_labels()
         # set prefix if another prefix is desired
         # if we do this, shouldn't we make the name of all
         # entities of the given ontology to the same?
@@ -705,10 +1435,225 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         if emmo_based and prefix_emmo is None:
             prefix_emmo = True
         if prefix_emmo:
-            self.set_common_prefix()
+            with self._profile("prefix"):
+                self.set_common_prefix()
+
+        self._mark_loaded(format)
+
+    def _set_special_labels(self):
+        """Help function for load() that sets the labels of the owl
+        entities that get_by_label() looks up without searching."""
+        top = self.world["http://www.w3.org/2002/07/owl#topObjectProperty"]
+        self._special_labels = {
+            "Thing": owlready2.Thing,
+            "Nothing": owlready2.Nothing,
+            "topObjectProperty": top,
+            "owl:Thing": owlready2.Thing,
+            "owl:Nothing": owlready2.Nothing,
+            "owl:topObjectProperty": top,
+        }
+
+    @contextmanager
+    def _loading(self, parallel, lazy_imports, catalog_file):
+        """Context manager for the parsing done by `_load_module()`.
+
+        Defers the loading of imported ontologies if `lazy_imports` is
+        true, or starts a parallel parser with `parallel` processes,
+        unless an ontology that imports this one already did so.
+        """
+        world = self.world
+        parser = None
+        deferring = lazy_imports and not world._deferring_imports
+        if deferring:
+            world._deferring_imports = True
+        elif parallel and parallel > 1 and world._parallel_parser is None:
+            parser = ParallelParser(parallel, world._iri_mappings, catalog_file)
+            world._parallel_parser = parser
+        try:
+            yield
+        finally:
+            if deferring:
+                world._deferring_imports = False
+            if parser:
+                parser.close()
+                world._parallel_parser = None
+            # Parsing bypasses the triple hooks
+            world._invalidate_indexes()
+
+    def _mark_loaded(self, format):  # pylint: disable=redefined-builtin
+        """Help function for load() that records that the ontology is in
+        sync with the file it was loaded from in format `format`."""
+        if not isinstance(self.world, World):
+            return
+        self._synced_files.clear()
+        location = self._load_location
+        if location and os.path.isfile(location):
+            self._mark_synced(
+                location, format or guess_format(location, fmap=FMAP)
+            )
+        else:
+            self.world._mark_unchanged(self)
+
+    def _profile(self, phase):
+        """Returns a context manager that records the time spent in load
+        phase `phase` if the ontology is loaded with a report."""
+        report = self.world._load_report
+        return report.phase(phase) if report else nullcontext()
+
+    def load_imports(self):
+        """Load all imported ontologies whose loading was deferred by
+        `load(lazy_imports=True)`.
+
+        This is done automatically before saving and reasoning.
+
+        Returns:
+            The ontology itself.
+        """
+        world = self.world
+        while world._lazy_imports and not world._deferring_imports:
+            world._load_lazy_imports()
+        return self
+
+    def _load_cached(self, cache, reload=None, **options):
+        """Help function for load().
+
+        Loads the ontology from `cache` if it has a valid entry.
+        Otherwise the ontology is loaded with `_load()` and stored in
+        the cache.
+        """
+        world = self.world
+        with self._profile("cache"):
+            key = cache.key(self, **options)
+            manifest = None if reload else cache.lookup(key)
+            if manifest is not None:
+                cache.restore(world, key, manifest)
+        if manifest is not None:
+            world._restoring = True
+            try:
+                self._finish_load(self.graph._iter_ontology_iri(self.graph.c))
+            finally:
+                world._restoring = False
+            return
+
+        onto_path = list(owlready2.onto_path)
+        world._load_sources = []
+        try:
+            self._load(reload=reload, **options)
+        finally:
+            sources, world._load_sources = world._load_sources, None
+        try:
+            with self._profile("cache"):
+                cache.store(world, key, sources, onto_path)
+        except (OSError, sqlite3.Error) as exc:
+            warnings.warn(f"Cannot store ontology in cache: {exc}")
+
+    def _finish_load(self, base_iri=None):
+        """Help function for load() when the triples of the ontology have
+        been added to the quadstore without owlready2, i.e. when parsed
+        with rdflib or restored from the cache.
 
+        Does what owlready2.Ontology.load() does after parsing.
+
+        Arguments:
+            base_iri: The base IRI of the ontology found in the triples.
+        """
+        if base_iri and base_iri != self._base_iri:
+            self._base_iri = base_iri
+            self._namespaces[base_iri] = self.world.ontologies[base_iri] = self
+            self.storid = self.world._abbreviate(
+                base_iri[:-1] if base_iri.endswith(("#", "/")) else base_iri
+            )
+            self.metadata = owlready2.namespace.Metadata(self, self.storid)
+        elif not self._has_obj_triple_spo(self.storid, rdf_type, owl_ontology):
+            self._add_obj_triple_raw_spo(self.storid, rdf_type, owl_ontology)
+        self.loaded = True
+        # Like when parsing, do not add triples for the new ontologies
+        with owlready2.LOADING:
+            imported = [
+                self.world.get_ontology(self._unabbreviate(abbrev_iri))
+                for abbrev_iri in self.world._get_obj_triples_sp_o(
+                    self.storid, owl_imports
+                )
+            ]
+        self._imported_ontologies._set([onto.load() for onto in imported])
+        self._load_properties()
+
+    def _load_rdflib(self, url, fmt, reload=False):
+        """Help function for _load() that parses `url` in format `fmt` with
+        rdflib directly into the quadstore.  Local N-Triples and N-Quads
+        files are streamed into the quadstore."""
+        local = not url.startswith(("http://", "https://", "ftp://"))
+        parser = self.world._parallel_parser
+        triples = None
+        if parser and local:
+            with self._profile("insert"):
+                triples = parser.result(url)
+        self.world.graph.acquire_write_lock()
+        try:
+            if reload:
+                self._destroy_cached_entities()
+            if triples:
+                with self._profile("insert"):
+                    base_iri = insert_triples(
+                        self.graph, *triples, filename=url
+                    )
+            elif local and fmt in STREAMING_FORMATS:
+                with self._profile("stream"):
+                    base_iri = stream_into(self.graph, url)
+            else:
+                cache = None if local else get_http_cache()
+                try:
+                    if cache:
+                        with self._profile("download"):
+                            path = str(cache.fetch(url))
+                        with self._profile("rdflib"):
+                            base_iri = parse_into(
+                                self.graph, path, fmt, publicID=url
+                            )
+                    else:
+                        with self._profile("rdflib"):
+                            base_iri = parse_into(
+                                self.graph,
+                                url,
+                                fmt,
+                                filename=url if local else None,
+                            )
+                except URLError as err:
+                    raise EMMOntoPyException("URL error", err, url) from err
+            if base_iri and base_iri != self._base_iri:
+                self.graph.add_ontology_alias(base_iri, self._base_iri)
+        finally:
+            self.world.graph.release_write_lock()
+        self._finish_load(base_iri)
         return self
 
+    def _load_http_cached(self, only_local=False, **kwargs):
+        """Help function for _load() that loads the ontology with
+        Owlready2, but downloads it via the HTTP cache.
+
+        Like Owlready2, local files in `owlready2.onto_path` take
+        precedence over the web.
+        """
+        # pylint: disable=protected-access
+        location = owlready2.namespace._get_onto_file(
+            self._orig_base_iri, self.name, "r", only_local
+        )
+        if not location.startswith(("http://", "https://")):
+            with self._profile("owlready2"):
+                return super().load(only_local=only_local, **kwargs)
+        try:
+            with self._profile("download"):
+                handle = get_http_cache().open(location)
+        except URLError as err:
+            raise owlready2.OwlReadyOntologyParsingError(
+                f"Cannot download {location!r}: {err}"
+            ) from err
+        # Like Owlready2, do not compare the modification time of web
+        # resources
+        kwargs["reload_if_newer"] = False
+        with handle, self._profile("owlready2"):
+            return super().load(only_local=only_local, fileobj=handle, **kwargs)
+
     def _load(  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
         self,
         *,
@@ -758,12 +1703,13 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             # update iris from current catalogurl
             else:
                 try:
-                    iris, dirs = read_catalog(
-                        uri=catalogurl,
-                        recursive=False,
-                        return_paths=True,
-                        catalog_file=catalog_file,
-                    )
+                    with self._profile("catalog"):
+                        iris, dirs = read_catalog(
+                            uri=catalogurl,
+                            recursive=False,
+                            return_paths=True,
+                            catalog_file=catalog_file,
+                        )
                 except ReadCatalogError:
                     if url_from_catalog is not None:
                         raise
@@ -776,6 +1722,12 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
                     )
             self.world._iri_mappings.update(iris)
         resolved_url = self.world._iri_mappings.get(url, url)
+        report = self.world._load_report
+        if report and report.current:
+            report.current.location = resolved_url
+        self._load_location = resolved_url
+        if self.world._load_sources is not None:
+            self.world._load_sources.append(resolved_url)
         # Append paths from catalog file to onto_path
         for path in sorted(dirs, reverse=True):
             if path not in owlready2.onto_path:
@@ -802,37 +1754,34 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         try:
             self.loaded = False
             fmt = format if format else guess_format(resolved_url, fmap=FMAP)
-            if fmt and fmt not in OWLREADY2_FORMATS:
-                # Convert filename to rdfxml before passing it to owlready2
-                graph = rdflib.Graph()
-                try:
-                    graph.parse(resolved_url, format=fmt)
-                except URLError as err:
-                    raise EMMOntoPyException(
-                        "URL error", err, resolved_url
-                    ) from err
-
-                with tempfile.NamedTemporaryFile() as handle:
-                    graph.serialize(destination=handle, format="xml")
-                    handle.seek(0)
+            if fmt and (
+                fmt not in OWLREADY2_FORMATS
+                or fmt in STREAMING_FORMATS
+                and not resolved_url.startswith(web_protocol)
+            ):
+                # Owlready2 cannot parse this format, parse it with rdflib.
+                # Local line-based files are streamed into the quadstore
+                return self._load_rdflib(resolved_url, fmt, reload=reload)
+            if resolved_url.startswith(web_protocol):
+                if get_http_cache():
+                    return self._load_http_cached(
+                        only_local=only_local,
+                        reload=reload,
+                        reload_if_newer=reload_if_newer,
+                        **kwargs,
+                    )
+                with self._profile("owlready2"):
                     return super().load(
-                        only_local=True,
-                        fileobj=handle,
+                        only_local=only_local,
                         reload=reload,
                         reload_if_newer=reload_if_newer,
-                        format="rdfxml",
                         **kwargs,
                     )
-            elif resolved_url.startswith(web_protocol):
-                return super().load(
-                    only_local=only_local,
-                    reload=reload,
-                    reload_if_newer=reload_if_newer,
-                    **kwargs,
-                )
 
             else:
-                with open(resolved_url, "rb") as handle:
+                with open(resolved_url, "rb") as handle, self._profile(
+                    "owlready2"
+                ):
                     return super().load(
                         only_local=only_local,
                         fileobj=handle,
@@ -852,21 +1801,26 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             warnings.warn(
                 "Recovering from Owlready2 parsing error... might be deprecated"
             )
+            if report and report.current:
+                report.current.fallback = True
 
             # Copy the ontology into a local folder and try again
             with tempfile.TemporaryDirectory() as handle:
                 output = os.path.join(handle, os.path.basename(resolved_url))
-                convert_imported(
-                    input_ontology=resolved_url,
-                    output_ontology=output,
-                    input_format=fmt,
-                    output_format="xml",
-                    url_from_catalog=url_from_catalog,
-                    catalog_file=catalog_file,
-                )
+                with self._profile("convert"):
+                    convert_imported(
+                        input_ontology=resolved_url,
+                        output_ontology=output,
+                        input_format=fmt,
+                        output_format="xml",
+                        url_from_catalog=url_from_catalog,
+                        catalog_file=catalog_file,
+                    )
 
                 self.loaded = False
-                with open(output, "rb") as handle:
+                with open(output, "rb") as handle, self._profile(
+                    "owlready2-retry"
+                ):
                     try:
                         return super().load(
                             only_local=True,
@@ -909,6 +1863,8 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         append_catalog=False,
         catalog_file="catalog-v001.xml",
         owlready2_properties=False,
+        workers=None,
+        incremental=True,
         **kwargs,
     ) -> Path:
         """Writes the ontology to file.
@@ -936,8 +1892,10 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             directory.
             The path to the final location is returned.
         squash: bool
-            If true, rdflib will be used to save the current ontology
-            together with all its sub-ontologies into `filename`.
+            If true, the current ontology is saved together with all its
+            imported ontologies into `filename`.  The triples are
+            streamed from the quadstore, without the declarations of the
+            imported ontologies and `owl:imports`.
             When combining with `recursive`, a folder structure of partly
             overlapping single-file ontologies will be created.
         namespaces: dict
@@ -952,6 +1910,17 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             to `dir`.
         owlready2_properties: Whether to keep Owlready2 properties.  If false,
             all triples with predicate in the Owlready2 namespace are removed.
+        workers: int | None
+            Number of worker processes used to write the ontologies
+            concurrently when `recursive` is true.  Only used for Turtle
+            and N-Triples and not combined with `squash`.  The workers
+            read a snapshot of the quadstore written to a temporary file.
+        incremental: bool
+            Whether to leave files untouched (including their modification
+            time) if their content would not change.  When saving
+            `recursive`ly, ontologies that are unchanged since they were
+            last saved to the same file with the same `namespaces` are
+            not written at all.
 
         Returns
         --------
@@ -962,18 +1931,11 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         # pylint: disable=too-many-locals,arguments-renamed,invalid-name
         # pylint: disable=not-an-iterable
 
-        # Extend rdflib defaults with namespaces suggested by FOOPS
+        self.load_imports()
+
         if namespaces is None:
             namespaces = {}
-        default_namespaces = {
-            "": self.base_iri,
-            "locn": "http://www.w3.org/ns/locn#",
-            "swrl": "http://www.w3.org/2003/11/swrl#",
-            "bibo": "http://purl.org/ontology/bibo/",
-        }
-        for prefix, ns in default_namespaces.items():
-            if ns not in namespaces.values():
-                namespaces[prefix] = ns
+        self._add_default_namespaces(namespaces)
 
         if not _validate_installed_version(
             package="rdflib", min_version="6.0.0"
@@ -1017,7 +1979,7 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             format = guess_format(file, fmap=FMAP)
         fmt = revmap.get(format, format)
 
-        if overwrite and os.path.exists(filepath):
+        if overwrite and not incremental and os.path.exists(filepath):
             os.remove(filepath)
 
         if recursive:
@@ -1028,20 +1990,52 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             # Update path to where the ontology is saved
             # Note that filename should include format when given
             returnpath = Path(dir) / f"{layout[self]}.{fmt}"
-            for onto, path in layout.items():
-                fname = Path(dir) / f"{path}.{fmt}"
-                onto.save(
-                    filename=fname,
+            modules = [
+                (onto, Path(dir) / f"{path}.{fmt}")
+                for onto, path in layout.items()
+            ]
+            # Writing modules in worker processes requires a serialised
+            # copy of the quadstore (Python >= 3.11)
+            parallel_save = (
+                bool(workers)
+                and workers > 1
+                and format in WRITER_FORMATS
+                and not squash
+                and not kwargs
+                and hasattr(self.world.graph.db, "serialize")
+            )
+            if parallel_save:
+                self._save_modules(
+                    modules,
                     format=format,
-                    dir=dir,
-                    mkdir=mkdir,
-                    overwrite=overwrite,
-                    recursive=False,
-                    squash=squash,
                     namespaces=namespaces,
-                    write_catalog_file=False,
-                    **kwargs,
+                    mkdir=mkdir,
+                    workers=workers,
+                    incremental=incremental,
                 )
+            else:
+                for onto, fname in modules:
+                    onto._add_default_namespaces(namespaces)
+                    if (
+                        incremental
+                        and not squash
+                        and not kwargs
+                        and onto._is_synced(fname, format, namespaces)
+                    ):
+                        continue
+                    onto.save(
+                        filename=fname,
+                        format=format,
+                        dir=dir,
+                        mkdir=mkdir,
+                        overwrite=overwrite,
+                        recursive=False,
+                        squash=squash,
+                        namespaces=namespaces,
+                        write_catalog_file=False,
+                        incremental=incremental,
+                        **kwargs,
+                    )
 
             if write_catalog_file:
                 catalog_files = set()
@@ -1059,122 +2053,411 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
                         directory=dir,
                         append=append_catalog,
                     )
-        elif squash:
-            URIRef, RDF, OWL = rdflib.URIRef, rdflib.RDF, rdflib.OWL
+        else:
+            self._save_file(
+                filepath,
+                format=format,
+                namespaces=namespaces,
+                squash=squash,
+                owlready2_properties=owlready2_properties,
+                incremental=incremental,
+                **kwargs,
+            )
+            if not squash and not kwargs:
+                self._mark_synced(filepath, format, namespaces)
 
-            # Make a copy of the owlready2 graph object to not mess with
-            # owlready2 internals
+        if write_catalog_file and not recursive:
+            write_catalog(
+                {self.get_version(as_iri=True): filepath},
+                output=catalog_file,
+                directory=dir,
+                append=append_catalog,
+            )
+        return Path(returnpath)
+
+    def _save_file(
+        self,
+        filepath,
+        *,
+        format,
+        namespaces,
+        squash,
+        owlready2_properties,
+        incremental,
+        **kwargs,
+    ):  # pylint: disable=redefined-builtin,too-many-arguments
+        """Help function for save() that writes this ontology (or with
+        `squash`, its import closure) to `filepath`.
+
+        If `incremental` is true and `filepath` exists, the ontology is
+        written to a temporary file first and `filepath` is only
+        overwritten if the content differs.
+        """
+        outpath = filepath
+        if incremental and os.path.exists(filepath):
+            handle, outpath = tempfile.mkstemp(suffix=Path(filepath).suffix)
+            os.close(handle)
+        fmt = {value: key for key, value in FMAP.items()}.get(format, format)
+        try:
+            if squash:
+                self._save_squashed(
+                    outpath,
+                    format=format,
+                    namespaces=namespaces,
+                    owlready2_properties=owlready2_properties,
+                )
+            elif not self.iri and format in OWLREADY2_FORMATS:
+                super().save(file=outpath, format=fmt, **kwargs)
+            elif format in WRITER_FORMATS and not kwargs:
+                # Stream directly from the quadstore
+                iri_map = {}
+                if self.iri:
+                    iri_map[self._unabbreviate(self.storid)] = self.iri
+                write_graph(
+                    self.graph,
+                    outpath,
+                    format=format,
+                    namespaces=namespaces,
+                    iri_map=iri_map,
+                )
+            else:
+                self._save_rdflib(
+                    outpath, format=format, namespaces=namespaces, **kwargs
+                )
+            if outpath != filepath:
+                _write_if_changed(outpath, filepath)
+        finally:
+            if outpath != filepath:
+                os.remove(outpath)
+
+    def _save_rdflib(self, filepath, *, format, namespaces, **kwargs):
+        """Help function for _save_file() that writes this ontology to
+        `filepath` by converting the output of owlready2 with rdflib."""
+        # pylint: disable=redefined-builtin
+        # The try-finally clause is needed for cleanup and because
+        # we have to provide delete=False to NamedTemporaryFile
+        # since Windows does not allow to reopen an already open
+        # file.
+        try:
+            with tempfile.NamedTemporaryFile(
+                suffix=".owl", delete=False
+            ) as handle:
+                tmpfile = handle.name
+            super().save(tmpfile, format="ntriples", **kwargs)
             graph = rdflib.Graph()
-            for triple in self.world.as_rdflib_graph():
-                graph.add(triple)
+            graph.parse(tmpfile, format="ntriples")
 
-            # Add additional namespaces to the graph
+            # Add additional namespaces to the output graph
             for prefix, ns in namespaces.items():
                 graph.namespace_manager.bind(
                     prefix, rdflib.Namespace(ns), override=True
                 )
 
-            # Remove all ontology-declarations in the graph that are
-            # not the current ontology.
-            for s, _, _ in graph.triples((None, RDF.type, OWL.Ontology)):
-                if str(s).rstrip("/#") != self.base_iri.rstrip("/#"):
-                    for _, p, o in graph.triples((s, None, None)):
-                        graph.remove((s, p, o))
-                graph.remove((s, OWL.imports, None))
-
             # Insert correct IRI of the ontology
             if self.iri:
-                for s, _, _ in graph.triples((None, RDF.type, OWL.Ontology)):
-                    for _, p, o in graph.triples((s, None, None)):
-                        graph.remove((s, p, o))
-                        graph.add((URIRef(self.iri), p, o))
-
-            # Remove triples from the owlready2 namespace
-            if not owlready2_properties:
-                ns = (
-                    "http://www.lesfleursdunormal.fr/static/_downloads/"
-                    "owlready_ontology.owl#"
-                )
-                for s, p, o in graph.triples((None, None, None)):
-                    if p.startswith(ns):
-                        graph.remove((s, p, o))
-
+                iri = rdflib.URIRef(self.base_iri.strip("#/"))
+                for s, p, o in graph.triples((iri, None, None)):
+                    graph.remove((s, p, o))
+                    graph.add((rdflib.URIRef(self.iri), p, o))
             graph.serialize(destination=filepath, format=format)
-        elif not self.iri and format in OWLREADY2_FORMATS:
-            super().save(file=filepath, format=fmt, **kwargs)
-        else:
-            # The try-finally clause is needed for cleanup and because
-            # we have to provide delete=False to NamedTemporaryFile
-            # since Windows does not allow to reopen an already open
-            # file.
-            try:
-                with tempfile.NamedTemporaryFile(
-                    suffix=".owl", delete=False
-                ) as handle:
-                    tmpfile = handle.name
-                super().save(tmpfile, format="ntriples", **kwargs)
-                graph = rdflib.Graph()
-                graph.parse(tmpfile, format="ntriples")
-
-                # Add additional namespaces to the output graph
-                for prefix, ns in namespaces.items():
-                    graph.namespace_manager.bind(
-                        prefix, rdflib.Namespace(ns), override=True
+        finally:
+            os.remove(tmpfile)
+
+    @property
+    def changed(self) -> bool:
+        """Whether triples have been added to or removed from this
+        ontology since it was loaded or last saved."""
+        if not isinstance(self.world, World):
+            return True
+        return self.world._is_changed(self)
+
+    def _mark_synced(self, filepath, format, namespaces=None):
+        """Help function for load() and save() recording that `filepath`
+        in format `format` contains the current triples of this ontology.
+        `namespaces` are the namespaces it was written with, or None if
+        it was not written by save().  The ontology is marked as
+        unchanged."""
+        # pylint: disable=redefined-builtin
+        if self.changed:
+            self._synced_files.clear()
+        key = self._synced_key(filepath, format, namespaces)
+        self._synced_files[key] = _file_state(filepath)
+        self.world._mark_unchanged(self)
+
+    def _is_synced(self, filepath, format, namespaces):
+        """Help function for save() that returns whether `filepath` in
+        format `format` is unmodified and contains the current triples of
+        this ontology, written with `namespaces`."""
+        # pylint: disable=redefined-builtin
+        if self.changed:
+            return False
+        key = self._synced_key(filepath, format, namespaces)
+        state = self._synced_files.get(key)
+        return state is not None and state == _file_state(filepath)
+
+    def _synced_key(self, filepath, format, namespaces):
+        """Help function for _mark_synced() and _is_synced() returning
+        the key of `filepath` in `_synced_files`."""
+        # pylint: disable=redefined-builtin
+        return (
+            os.path.abspath(filepath),
+            FMAP.get(format, format),
+            self.iri,
+            None if namespaces is None else tuple(namespaces.items()),
+        )
+
+    def _add_default_namespaces(self, namespaces):
+        """Help function for save() that extends `namespaces` with the
+        default namespaces of this ontology."""
+        # Extend rdflib defaults with namespaces suggested by FOOPS
+        default_namespaces = {
+            "": self.base_iri,
+            "locn": "http://www.w3.org/ns/locn#",
+            "swrl": "http://www.w3.org/2003/11/swrl#",
+            "bibo": "http://purl.org/ontology/bibo/",
+        }
+        for prefix, ns in default_namespaces.items():
+            if ns not in namespaces.values():
+                namespaces[prefix] = ns
+
+    def _save_modules(
+        self, modules, *, format, namespaces, mkdir, workers, incremental
+    ):
+        """Help function for save() that writes `modules`, a list of
+        `(onto, filepath)` pairs, in `workers` processes.
+
+        The output is the same as when the modules are saved one by one:
+        the namespaces of each module are extended in the same order.
+        """
+        # pylint: disable=redefined-builtin,too-many-arguments
+        # pylint: disable=too-many-locals
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tasks = []
+            saved = []
+            for onto, filepath in modules:
+                onto.load_imports()
+                onto._add_default_namespaces(namespaces)
+                if incremental and onto._is_synced(
+                    filepath, format, namespaces
+                ):
+                    continue
+                iri_map = {}
+                if onto.iri:
+                    iri_map[onto._unabbreviate(onto.storid)] = onto.iri
+                if mkdir:
+                    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+                # Existing files are only overwritten if they change
+                outpath = str(filepath)
+                if incremental and os.path.exists(filepath):
+                    outpath = os.path.join(tmpdir, f"{len(tasks)}.out")
+                saved.append((onto, filepath, outpath, dict(namespaces)))
+                tasks.append(
+                    (
+                        (onto.graph.c, onto.storid, outpath, format),
+                        {"namespaces": dict(namespaces), "iri_map": iri_map},
                     )
+                )
+            if not tasks:
+                return
 
-                # Insert correct IRI of the ontology
-                if self.iri:
-                    iri = rdflib.URIRef(self.base_iri.strip("#/"))
-                    for s, p, o in graph.triples((iri, None, None)):
-                        graph.remove((s, p, o))
-                        graph.add((rdflib.URIRef(self.iri), p, o))
-                graph.serialize(destination=filepath, format=format)
-            finally:
-                os.remove(tmpfile)
+            dbfile = os.path.join(tmpdir, "quadstore.sqlite3")
+            with open(dbfile, "wb") as handle:
+                handle.write(self.world.graph.db.serialize())
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        write_stored_graph, dbfile, *args, **options
+                    )
+                    for args, options in tasks
+                ]
+                for future in futures:
+                    future.result()
+
+            for onto, filepath, outpath, written_namespaces in saved:
+                if outpath != str(filepath):
+                    _write_if_changed(outpath, filepath)
+                onto._mark_synced(filepath, format, written_namespaces)
+
+    def _save_squashed(
+        self, filepath, format, namespaces, owlready2_properties
+    ):  # pylint: disable=redefined-builtin
+        """Help function for save() that writes this ontology and its
+        import closure as a single ontology.
+
+        The triples are streamed from the quadstore in one pass.  The
+        declarations of the imported ontologies, `owl:imports` and
+        (unless `owlready2_properties` is true) triples with predicate
+        in the Owlready2 namespace are dropped on the way.
+        """
+        closure = [self] + self.get_imported_ontologies(recursive=True)
+        iri_map = {}
+        if self.iri:
+            iri_map[self._unabbreviate(self.storid)] = self.iri
+        kwargs = {
+            "namespaces": namespaces,
+            "iri_map": iri_map,
+            "contexts": [onto.graph.c for onto in closure],
+            "filter": self._squash_filter(closure, owlready2_properties),
+        }
+        if format in WRITER_FORMATS:
+            write_graph(self.graph, filepath, format=format, **kwargs)
+            return
 
-        if write_catalog_file and not recursive:
-            write_catalog(
-                {self.get_version(as_iri=True): filepath},
-                output=catalog_file,
-                directory=dir,
-                append=append_catalog,
+        # Other formats are serialised with rdflib from a single graph
+        graph = rdflib.Graph()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpfile = os.path.join(tmpdir, "squashed.nt")
+            write_graph(self.graph, tmpfile, format="ntriples", **kwargs)
+            graph.parse(tmpfile, format="ntriples")
+        for prefix, ns in namespaces.items():
+            graph.namespace_manager.bind(
+                prefix, rdflib.Namespace(ns), override=True
             )
-        return Path(returnpath)
+        graph.serialize(destination=filepath, format=format)
+
+    def _squash_filter(self, closure, owlready2_properties):
+        """Help function for _save_squashed() that returns a filter for
+        write_graph() dropping the declarations of the ontologies in
+        `closure` other than this one, `owl:imports` and (unless
+        `owlready2_properties` is true) Owlready2 properties."""
+        contexts = ",".join(str(onto.graph.c) for onto in closure)
+        headers = {
+            s
+            for (s,) in self.world.graph.execute(
+                f"SELECT DISTINCT s FROM objs WHERE c IN ({contexts}) "
+                "AND p=? AND o=?",
+                (rdf_type, owl_ontology),
+            )
+        }
+        headers.discard(self.storid)
+        skip_predicates = {owl_imports}
+        if not owlready2_properties:
+            ns = (
+                "http://www.lesfleursdunormal.fr/static/_downloads/"
+                "owlready_ontology.owl#"
+            )
+            skip_predicates.update(
+                storid
+                for (storid,) in self.world.graph.execute(
+                    "SELECT storid FROM resources WHERE iri>=? AND iri<?",
+                    (ns, ns[:-1] + chr(ord(ns[-1]) + 1)),
+                )
+            )
+
+        def keep(_, s, p, o, d):  # pylint: disable=unused-argument
+            return s not in headers and p not in skip_predicates
+
+        return keep
 
     def copy(self):
-        """Return a copy of the ontology."""
-        with tempfile.TemporaryDirectory() as dirname:
-            filename = self.save(
-                dir=dirname,
-                format="turtle",
-                recursive=True,
-                write_catalog_file=True,
-                mkdir=True,
-            )
-            ontology = get_ontology(filename).load()
-            ontology.name = self.name
+        """Return a copy of the ontology and its imported ontologies in a
+        new world.
+
+        The triples are copied directly from the quadstore of this world,
+        without serialising and parsing the ontologies.
+        """
+        self.load_imports()
+        ontologies = [self] + [
+            onto
+            for onto in self.get_imported_ontologies(recursive=True)
+            if onto.world is self.world
+        ]
+        db = self.world.graph.db
+        if hasattr(db, "serialize"):
+            source = db.serialize()
+        else:  # Python < 3.11
+            db.commit()
+            source = db
+
+        world = World()
+        ontology = world.get_ontology(self.base_iri)
+        replace_quadstore(world, source, [onto.graph.c for onto in ontologies])
+        world._iri_mappings.update(self.world._iri_mappings)
+        world._restoring = True
+        try:
+            ontology.load()
+        finally:
+            world._restoring = False
+
+        for onto in ontologies:
+            copied = world.get_ontology(onto.base_iri)
+            copied.name = onto.name
+            copied.iri = onto.iri
+            copied.prefix = onto.prefix
+            copied.label_annotations = onto.label_annotations[:]
+            if onto._special_labels is not None:
+                copied._special_labels = {
+                    label: (
+                        entity
+                        if entity is None
+                        else world[entity.iri] or entity
+                    )
+                    for label, entity in onto._special_labels.items()
+                }
         return ontology
 
+    @property
+    def hierarchy(self) -> HierarchyIndex:
+        """Index of the class hierarchy of the world of this ontology.
+
+        It provides fast ancestor, descendant, parent, child and subclass
+        queries based on precomputed transitive closure bitsets.  The
+        index is rebuilt lazily after the hierarchy has been changed.
+        """
+        hierarchy = self.world._hierarchy
+        hierarchy.update()
+        return hierarchy
+
     def get_imported_ontologies(self, recursive=False):
         """Return a list with imported ontologies.
 
         If `recursive` is `True`, ontologies imported by imported ontologies
-        are also returned.
+        are also returned.  They are topologically ordered, i.e. each
+        ontology comes before the ontologies it imports (unless they
+        import each other cyclically), and ontologies reached through
+        several import paths are only included once.
+
+        The recursive import closure is cached.  The cache is invalidated
+        when `owl:imports` relations change or an ontology is loaded in
+        any of the worlds it spans.
         """
+        if not recursive:
+            world = self.world
+            if world._lazy_imports and not world._deferring_imports:
+                world._load_lazy_imports(
+                    [o for o in self.imported_ontologies if not o.loaded]
+                )
+            return self.imported_ontologies
+
+        self.load_imports()
+        if self._import_closure:
+            stamps, closure = self._import_closure
+            if all(
+                world._imports_generation == generation
+                for world, generation in stamps
+            ):
+                return list(closure)
 
-        def rec_imported(onto, imported):
-            for ontology in onto.imported_ontologies:
-                # pylint: disable=possibly-used-before-assignment
-                if ontology not in imported:
-                    imported.add(ontology)
-                    rec_imported(ontology, imported)
+        visited = set()
+        postorder = []
 
-        if recursive:
-            imported = set()
-            rec_imported(self, imported)
-            return list(imported)
-
-        return self.imported_ontologies
+        def visit(onto):
+            for ontology in onto.imported_ontologies:
+                if ontology not in visited:
+                    visited.add(ontology)
+                    visit(ontology)
+                    postorder.append(ontology)
+
+        visit(self)
+        closure = postorder[::-1]
+
+        # Only cache if all involved worlds track changes to owl:imports
+        worlds = {onto.world for onto in closure}
+        worlds.add(self.world)
+        if all(isinstance(world, World) for world in worlds):
+            stamps = [(world, world._imports_generation) for world in worlds]
+            self._import_closure = (stamps, closure)
+        return list(closure)
 
     def get_entities(  # pylint: disable=too-many-arguments
         self,
@@ -1223,20 +2506,20 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
 
         """
 
-        generator = []
+        entity_types = []
         if classes:
-            generator.append(self.classes(imported))
+            entity_types.append("classes")
         if individuals:
-            generator.append(self.individuals(imported))
+            entity_types.append("individuals")
         if object_properties:
-            generator.append(self.object_properties(imported))
+            entity_types.append("object_properties")
         if data_properties:
-            generator.append(self.data_properties(imported))
+            entity_types.append("data_properties")
         if annotation_properties:
-            generator.append(self.annotation_properties(imported))
+            entity_types.append("annotation_properties")
         if properties:
-            generator.append(self.properties(imported))
-        yield from itertools.chain(*generator)
+            entity_types.append("properties")
+        yield from self._entities(entity_types, imported=imported)
 
     def classes(self, imported=False):
         """Returns an generator over all classes.
@@ -1247,67 +2530,41 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         """
         return self._entities("classes", imported=imported)
 
-    def _entities(
-        self, entity_type, imported=False
-    ):  # pylint: disable=too-many-branches
-        """Returns an generator over all entities of the desired type.
-        This is a helper function for `classes()`, `individuals()`,
-        `object_properties()`, `data_properties()`,
+    def _entities(self, entity_types, imported=False):
+        """Returns an generator over all entities of the desired types.
+        This is a helper function for `get_entities()`, `classes()`,
+        `individuals()`, `object_properties()`, `data_properties()`,
         `annotation_properties()` and `properties`.
 
+        All (storid, type) pairs are fetched with a single query against
+        the quadstore per world, while the entities are created lazily.
+        Entities are only returned once, even if they are declared in
+        several ontologies or have several of the requested types.
+
         Arguments:
-            entity_type: The type of entity desired given as a string.
-                Can be any of `classes`, `individuals`,
-                `object_properties`, `data_properties`,
+            entity_types: The type of entity desired given as a string or
+                a sequence of strings.  Can be any of `classes`,
+                `individuals`, `object_properties`, `data_properties`,
                 `annotation_properties` or `properties`.
             imported: if `True`, entities in imported ontologies
                 are also returned.
         """
-
-        generator = []
+        if isinstance(entity_types, str):
+            entity_types = [entity_types]
+        ontologies = [self]
         if imported:
-            ontologies = self.get_imported_ontologies(recursive=True)
-            ontologies.append(self)
-            for onto in ontologies:
-                if entity_type == "classes":
-                    for cls in list(onto.classes()):
-                        generator.append(cls)
-                elif entity_type == "individuals":
-                    for ind in list(onto.individuals()):
-                        generator.append(ind)
-                elif entity_type == "object_properties":
-                    for prop in list(onto.object_properties()):
-                        generator.append(prop)
-                elif entity_type == "data_properties":
-                    for prop in list(onto.data_properties()):
-                        generator.append(prop)
-                elif entity_type == "annotation_properties":
-                    for prop in list(onto.annotation_properties()):
-                        generator.append(prop)
-                elif entity_type == "properties":
-                    generator.append(list(onto.properties()))
-        else:
-            if entity_type == "classes":
-                generator = list(super().classes())
-                # Add new triples of type rdfs:Class
-                rdf_schema_class = self._abbreviate(
-                    "http://www.w3.org/2000/01/rdf-schema#Class"
-                )
-                for s in self._get_obj_triples_po_s(rdf_type, rdf_schema_class):
-                    if not s < 0:
-                        generator.append(self.world._get_by_storid(s))
-            elif entity_type == "individuals":
-                generator = super().individuals()
-            elif entity_type == "object_properties":
-                generator = super().object_properties()
-            elif entity_type == "data_properties":
-                generator = super().data_properties()
-            elif entity_type == "annotation_properties":
-                generator = super().annotation_properties()
-            elif entity_type == "properties":
-                generator = self.properties()
-
-        yield from generator
+            # Entities of imported ontologies come first
+            ontologies[:0] = self.get_imported_ontologies(recursive=True)
+        worlds = defaultdict(dict)  # maps world to {id: ontology}
+        for onto in ontologies:
+            worlds[onto.world][id(onto)] = onto
+
+        for world, ontos in worlds.items():
+            ontos = list(ontos.values())
+            if isinstance(world, World):
+                yield from world._query_entities(entity_types, ontos)
+            else:
+                yield from _owlready2_entities(entity_types, ontos)
 
     def individuals(self, imported=False):
         """Returns an generator over all individuals.
@@ -1355,36 +2612,15 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             imported: if `True`, entities in imported ontologies
                 are also returned.
         """
-        generator = []
-        for prop in list(
-            self._entities("object_properties", imported=imported)
-        ):
-            generator.append(prop)
-
-        for prop in list(
-            self._entities("annotation_properties", imported=imported)
-        ):
-            generator.append(prop)
-
-        for prop in list(self._entities("data_properties", imported=imported)):
-            generator.append(prop)
-
-        rdf_property = self._abbreviate(
-            "http://www.w3.org/1999/02/22-rdf-syntax-ns#Property"
-        )
-        for s in self._get_obj_triples_po_s(rdf_type, rdf_property):
-            if not s < 0:
-                generator.append(self._unabbreviate(s))
-                # generator.append(self[self._unabbreviate(s)])
-                # generator.append(self.world._get_by_storid(s))
-        yield from generator
+        return self._entities("properties", imported=imported)
 
     def get_root_classes(self, imported=False):
         """Returns a list or root classes."""
+        hierarchy = self.hierarchy
         return [
             cls
             for cls in self.classes(imported=imported)
-            if not cls.ancestors().difference(set([cls, owlready2.Thing]))
+            if hierarchy.is_root(cls)
         ]
 
     def get_root_object_properties(self, imported=False):
@@ -1473,6 +2709,7 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         from ontopy.exceptions import _require_java
 
         _require_java()
+        self.load_imports()
 
         removed_gspo = []  # obj: (ontology, s, p, o)
         removed_gspod = []  # data: (ontology, s, p, o, d)
@@ -1553,6 +2790,7 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
                 g._add_obj_triple_spo(s, p, o)
             for g, s, p, o, d in removed_gspod:
                 g.world._del_data_triple_spod(s, p, o, d)
+            self.world._invalidate_indexes()
 
     def sync_attributes(  # pylint: disable=too-many-branches
         self,
@@ -1938,6 +3176,10 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
 
     def number_of_generations(self, descendant, ancestor):
         """Return shortest distance from ancestor to descendant"""
+        try:
+            return self.hierarchy.distance(descendant, ancestor)
+        except KeyError:
+            pass
         if ancestor not in descendant.ancestors():
             raise ValueError("Descendant is not a descendant of ancestor")
         return self._number_of_generations(descendant, ancestor, 0)
@@ -1958,20 +3200,39 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
 
     def closest_common_ancestors(self, cls1, cls2):
         """Returns a list with closest_common_ancestor for cls1 and cls2"""
+        hierarchy = self.hierarchy
+        try:
+            common = hierarchy.entities(
+                hierarchy.ancestor_bits(cls1) & hierarchy.ancestor_bits(cls2)
+            )
+        except KeyError:
+            common = self.common_ancestors(cls1, cls2)
         distances = {}
-        for ancestor in self.common_ancestors(cls1, cls2):
+        for ancestor in common:
             distances[ancestor] = self.number_of_generations(
                 cls1, ancestor
             ) + self.number_of_generations(cls2, ancestor)
+        if not distances:
+            return []
+        shortest = min(distances.values())
         return [
             ancestor
             for ancestor, distance in distances.items()
-            if distance == min(distances.values())
+            if distance == shortest
         ]
 
     @staticmethod
     def closest_common_ancestor(*classes):
         """Returns closest_common_ancestor for the given classes."""
+        namespace = getattr(classes[0], "namespace", None) if classes else None
+        hierarchy = getattr(
+            getattr(namespace, "world", None), "_hierarchy", None
+        )
+        if hierarchy is not None:
+            closest = hierarchy.closest_common_ancestor(*classes)
+            if closest is not None:
+                return closest
+
         mros = [cls.mro() for cls in classes]
         track = defaultdict(int)
         while mros:
@@ -2024,17 +3285,26 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
                 )
 
             closest_ancestor = self.closest_common_ancestor(*classes)
-            for cls in classes:
-                ancestors.update(
-                    anc
-                    for anc in cls.ancestors()
-                    if closest_ancestor in anc.ancestors()
-                )
+            hierarchy = self.hierarchy
+            try:
+                bits = 0
+                for cls in classes:
+                    bits |= hierarchy.ancestor_bits(cls)
+                bits &= hierarchy.descendant_bits(closest_ancestor)
+                ancestors.update(hierarchy.entities(bits))
+            except KeyError:
+                for cls in classes:
+                    ancestors.update(
+                        anc
+                        for anc in cls.ancestors()
+                        if closest_ancestor in anc.ancestors()
+                    )
         elif isinstance(generations, int):
             for entity in classes:
                 addancestors(entity, generations, ancestors)
         else:
-            ancestors.update(*(cls.ancestors() for cls in classes))
+            hierarchy = self.hierarchy
+            ancestors.update(*(hierarchy.ancestors(cls) for cls in classes))
 
         if strict:
             return ancestors.difference(classes)
@@ -2074,10 +3344,12 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
             return set()
 
         if not generations:
+            hierarchy = self.hierarchy
             for entity in classes:
-                descendants[entity] = entity.descendants()
                 # only include proper descendants
-                descendants[entity].remove(entity)
+                descendants[entity] = hierarchy.descendants(
+                    entity, include_self=False
+                )
         else:
             for entity in classes:
                 _children_recursively(1, entity, entity, descendants)
@@ -2101,6 +3373,47 @@ class Ontology(owlready2.Ontology):  # pylint: disable=too-many-public-methods
         generations2 = self.number_of_generations(cls2, cca)
         return 2 * ccadepth / (generations1 + generations2 + 2 * ccadepth)
 
+    def similarity_matrix(  # pylint: disable=too-many-arguments
+        self,
+        classes_a: "Sequence[ThingClass]",
+        classes_b: "Optional[Sequence[ThingClass]]" = None,
+        *,
+        measure: str = "wu_palmer",
+        chunksize: int = 256,
+        processes: "Optional[int]" = None,
+    ):
+        """Return a matrix with the semantic similarity between all pairs
+        of classes in `classes_a` and `classes_b`.
+
+        For the "wu_palmer" measure, the elements are equal to what
+        `get_wu_palmer_measure()` returns for each pair.  See
+        `ontopy.similarity` for a description of the supported measures.
+
+        Arguments:
+            classes_a: Sequence of classes corresponding to the rows.
+            classes_b: Sequence of classes corresponding to the columns.
+                Defaults to `classes_a`.
+            measure: Similarity measure.  One of "wu_palmer", "resnik"
+                or "lin".
+            chunksize: Number of rows computed at a time.
+            processes: If given and larger than one, the rows are
+                computed by a pool of this number of processes.
+
+        Returns:
+            A NumPy array of shape `(len(classes_a), len(classes_b))`.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        return similarity_matrix(
+            self.hierarchy,
+            classes_a,
+            classes_b,
+            measure=measure,
+            chunksize=chunksize,
+            processes=processes,
+        )
+
     def new_entity(  # pylint: disable=too-many-arguments,too-many-branches,too-many-positional-arguments
         self,
         name: str,
@@ -2409,6 +3722,41 @@ class BlankNode:
         return isinstance(other, BlankNode)
 
 
+def _file_state(path):
+    """Returns the `(mtime, size)` tuple of file `path` or None if it does
+    not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _write_if_changed(src, dst):
+    """Overwrite file `dst` with the content of file `src` if their
+    content differs.
+
+    `dst` is written in place, such that its permissions, ownership,
+    symbolic links and hard links are kept.
+    """
+    if not filecmp.cmp(src, dst, shallow=False):
+        shutil.copyfile(src, dst)
+
+
+def _owlready2_entities(entity_types, ontologies):
+    """Yield the entities of the given types in `ontologies` with the
+    enumeration methods of owlready2, for worlds that are not ontopy
+    worlds.  Entities are only returned once."""
+    seen = set()
+    for entity_type in entity_types:
+        method = getattr(owlready2.Ontology, entity_type)
+        for onto in ontologies:
+            for entity in method(onto):
+                if entity.storid not in seen:
+                    seen.add(entity.storid)
+                    yield entity
+
+
 def flatten(items):
     """Yield items from any nested iterable."""
     for item in items:
@@ -67,6 +67,10 @@ def get_parents(self, strict=False):
     excluded.
     """
     if strict:
+        # Use the hierarchy index of ontopy worlds if `self` is indexed
+        hierarchy = getattr(self.namespace.world, "_hierarchy", None)
+        if hierarchy is not None and hierarchy.number(self) is not None:
+            return hierarchy.parents(self, strict=True)
         parents = self.get_parents()
         for entity in parents.copy():
             parents.difference_update(entity.ancestors(include_self=False))
@@ -0,0 +1,678 @@
+"""Direct ingestion of RDF triples into the Owlready2 quadstore.
+
+Owlready2 can only parse RDF/XML, OWL/XML and N-Triples.  Other
+formats supported by rdflib are parsed with rdflib into a
+`QuadstoreSink`, an rdflib store that converts the triples to the
+representation used by Owlready2 and inserts them in batches into the
+quadstore of an ontology.  The triples are never kept in an rdflib
+graph and no intermediate file is written.
+
+IRIs are abbreviated to storids with the same dictionary-backed
+function that Owlready2 uses when parsing, such that SQLite is only
+queried once per distinct IRI.
+
+When loading with `parallel=N`, a `ParallelParser` parses the files of
+the import closure in N worker processes with a `TripleCollector` and
+the collected triples are inserted with `insert_triples()`.
+
+Local N-Triples and N-Quads files are streamed into the quadstore with
+`stream_into()`, which reads the file line by line and commits the
+triples in batches with a `StreamingInserter`.  Memory usage is bounded
+independently of the file size (apart from the number of distinct blank
+nodes), which makes it suitable for large instance data loaded into a
+file-backed `World(filename=...)`.
+"""
+
+# pylint: disable=protected-access
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import TYPE_CHECKING
+
+import rdflib
+from rdflib.plugins.parsers.ntriples import (
+    ParseError,
+    W3CNTriplesParser,
+    r_tail,
+    r_wspace,
+)
+from rdflib.store import Store
+from rdflib.util import guess_format
+from owlready2.driver import INT_DATATYPES, FLOAT_DATATYPES
+
+from ontopy.exceptions import ReadCatalogError
+from ontopy.utils import FMAP, OWLREADY2_FORMATS, read_catalog
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, List, Optional, Tuple, Union
+
+    from owlready2.triplelite import SubGraph
+
+
+# Number of triples inserted at a time
+BATCHSIZE = 100000
+
+# Number of IRIs above which the IRI cache of StreamingInserter is cleared
+CACHESIZE = 200000
+
+# Line-based formats that are streamed with stream_into()
+STREAMING_FORMATS = "ntriples", "nt", "nt11", "nquads"
+
+OWL_IMPORTS = "http://www.w3.org/2002/07/owl#imports"
+
+WEB_PROTOCOLS = ("http://", "https://", "ftp://")
+
+
+class TripleCollector(Store):
+    """An rdflib store that converts triples added to it to the
+    representation used by Owlready2 when parsing and collects them in
+    the lists `objs` and `datas`.
+
+    The store only supports adding triples.  Named graphs are ignored.
+
+    Arguments:
+        batchsize: If given, `flush()` is called whenever this number of
+            triples have been collected.
+    """
+
+    context_aware = True  # required by some parsers, like JSON-LD
+
+    def __init__(self, batchsize: "Optional[int]" = None):
+        super().__init__()
+        self.batchsize = batchsize
+        self.objs = []
+        self.datas = []
+        self.count = 0
+
+    def add(self, triple, context=None, quoted=False) -> None:
+        subject, predicate, obj = triple
+        if isinstance(obj, rdflib.Literal):
+            value, datatype = literal_value(obj)
+            self.datas.append(
+                (node_iri(subject), str(predicate), value, datatype)
+            )
+        else:
+            self.objs.append((node_iri(subject), str(predicate), node_iri(obj)))
+        self.count += 1
+        if (
+            self.batchsize
+            and len(self.objs) + len(self.datas) >= self.batchsize
+        ):
+            self.flush()
+
+    def addN(self, quads) -> None:  # pylint: disable=invalid-name
+        for subject, predicate, obj, context in quads:
+            self.add((subject, predicate, obj), context)
+
+    def __len__(self, context=None) -> int:
+        return self.count
+
+    def flush(self) -> None:
+        """Called when `batchsize` triples have been collected.  Does
+        nothing by default."""
+
+    def query(self, query, *args, **kwargs):
+        raise NotImplementedError(f"{type(self).__name__} is write-only")
+
+    def update(self, update, *args, **kwargs):
+        raise NotImplementedError(f"{type(self).__name__} is write-only")
+
+
+# query() and update() are deliberately left unsupported by TripleCollector
+class QuadstoreSink(TripleCollector):  # pylint: disable=abstract-method
+    """An rdflib store that inserts triples added to it into the
+    quadstore of an Owlready2 ontology.
+
+    Arguments:
+        subgraph: The Owlready2 subgraph (`onto.graph`) of the ontology
+            to add the triples to.
+        filename: Name of the file that is parsed.  Its modification time
+            is stored as the last update time of the ontology.
+        delete_existing_triples: Whether to delete the triples already in
+            the ontology.
+        batchsize: Number of triples inserted at a time.
+    """
+
+    def __init__(
+        self,
+        subgraph: "SubGraph",
+        filename: "Optional[str]" = None,
+        delete_existing_triples: bool = True,
+        batchsize: int = BATCHSIZE,
+    ):
+        super().__init__(batchsize)
+        self.insert_objs, self.insert_datas, self._finish = (
+            subgraph.import_triples_from_queue(
+                None, filename, delete_existing_triples
+            )
+        )
+
+    def flush(self) -> None:
+        """Inserts the collected triples into the quadstore."""
+        if self.objs:
+            self.insert_objs(self.objs)
+            self.objs = []
+        if self.datas:
+            self.insert_datas(self.datas)
+            self.datas = []
+
+    def finish(self) -> str:
+        """Inserts the remaining triples and updates the ontology.
+
+        Returns:
+            The IRI of the ontology found among the inserted triples or an
+            empty string if no ontology was found.
+        """
+        self.flush()
+        return self._finish()
+
+
+def node_iri(node: "Union[rdflib.URIRef, rdflib.BNode]") -> str:
+    """Returns the IRI of an rdflib node as used by Owlready2 when
+    parsing, i.e. blank nodes are prefixed with "_:"."""
+    if isinstance(node, rdflib.BNode):
+        return f"_:{node}"
+    return str(node)
+
+
+def literal_value(literal: rdflib.Literal) -> "Tuple[object, str]":
+    """Returns a `(value, datatype)` tuple for an rdflib literal as
+    used by Owlready2 when parsing.
+
+    Integers and floats are converted to Python numbers and the
+    language of tagged strings is returned as "@lang".
+    """
+    if literal.language:
+        return str(literal), f"@{literal.language}"
+    if literal.datatype is None:
+        return str(literal), ""
+    datatype = str(literal.datatype)
+    return typed_value(str(literal), datatype), datatype
+
+
+def typed_value(lexical: str, datatype: str) -> "Union[str, int, float]":
+    """Returns the value of a literal with lexical form `lexical` and
+    datatype IRI `datatype` as stored by Owlready2.
+
+    Integers and floats are converted to Python numbers.
+    """
+    try:
+        if datatype in INT_DATATYPES:
+            return int(lexical)
+        if datatype in FLOAT_DATATYPES:
+            return float(lexical)
+    except ValueError:  # ill-typed literal, keep its lexical form
+        pass
+    return lexical
+
+
+def parse_into(
+    subgraph: "SubGraph",
+    source,
+    format: str,  # pylint: disable=redefined-builtin
+    filename: "Optional[str]" = None,
+    **kwargs,
+) -> str:
+    """Parse `source` with rdflib directly into the quadstore.
+
+    Arguments:
+        subgraph: The Owlready2 subgraph (`onto.graph`) of the ontology to
+            add the triples to.  Existing triples are deleted.
+        source: Source to parse.  Anything accepted by
+            `rdflib.Graph.parse()`.
+        format: rdflib format of `source`.
+        filename: Name of the parsed file, if it is a local file.
+        kwargs: Additional keyword arguments passed to
+            `rdflib.Graph.parse()`.
+
+    Returns:
+        The IRI of the ontology found in `source` or an empty string if
+        `source` does not define an ontology.
+    """
+    sink = QuadstoreSink(subgraph, filename=filename)
+    rdflib.Graph(store=sink).parse(source, format=format, **kwargs)
+    return sink.finish()
+
+
+def insert_triples(
+    subgraph: "SubGraph",
+    objs: "List[Tuple]",
+    datas: "List[Tuple]",
+    filename: "Optional[str]" = None,
+) -> str:
+    """Insert triples collected by a `TripleCollector` into the quadstore.
+
+    Arguments:
+        subgraph: The Owlready2 subgraph (`onto.graph`) of the ontology to
+            add the triples to.  Existing triples are deleted.
+        objs: Object triples.
+        datas: Data triples.
+        filename: Name of the parsed file, if it is a local file.
+
+    Returns:
+        The IRI of the ontology found among the triples or an empty
+        string if they do not define an ontology.
+    """
+    insert_objs, insert_datas, finish = subgraph.import_triples_from_queue(
+        None, filename, True
+    )
+    insert_objs(objs)
+    insert_datas(datas)
+    return finish()
+
+
+def parse_file(
+    path: str, format: str  # pylint: disable=redefined-builtin
+) -> "Tuple[List[Tuple], List[Tuple], List[str]]":
+    """Parse file `path` in rdflib format `format`.
+
+    This function is run in the worker processes of `ParallelParser`.
+
+    Returns:
+        A `(objs, datas, imports)` tuple, where `objs` and `datas` are the
+        object and data triples as collected by `TripleCollector` and
+        `imports` is a list with the IRIs of the imported ontologies.
+    """
+    collector = TripleCollector()
+    rdflib.Graph(store=collector).parse(path, format=format)
+    imports = [obj for _, pred, obj in collector.objs if pred == OWL_IMPORTS]
+    return collector.objs, collector.datas, imports
+
+
+class ParallelParser:
+    """Parses the files in the import closure of an ontology in a pool of
+    processes, while the ontologies are inserted into the quadstore in
+    the usual (sequential) order.
+
+    When a file has been parsed, the files of its imported ontologies
+    are submitted to the pool.  Only local files in formats parsed by
+    rdflib are handled; other ontologies are loaded as usual.
+
+    Arguments:
+        processes: Number of worker processes.
+        iri_mappings: Dict mapping IRIs to locations.  It is consulted
+            when resolving imported ontologies and may be updated while
+            loading.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        iri_mappings: "Dict[str, str]",
+        catalog_file: str = "catalog-v001.xml",
+    ):
+        self.executor = ProcessPoolExecutor(max_workers=processes)
+        self.iri_mappings = iri_mappings
+        self.catalog_file = catalog_file
+        self.catalog_mappings = {}
+        self.directories = set()  # directories whose catalog has been read
+        self.futures = {}  # maps path to future, None when consumed
+        self.seen = set()  # futures whose imports have been submitted
+
+    def read_catalog(self, directory: str) -> None:
+        """Add the IRI mappings of the catalog file in `directory`, if
+        any.  They are used for resolving imports that have not yet been
+        loaded."""
+        if directory in self.directories:
+            return
+        self.directories.add(directory)
+        catalog = os.path.join(directory, self.catalog_file)
+        if os.path.exists(catalog):
+            try:
+                self.catalog_mappings.update(
+                    read_catalog(catalog, catalog_file=self.catalog_file)
+                )
+            except ReadCatalogError:
+                pass
+
+    def resolve(self, iri: str) -> "Optional[str]":
+        """Returns the local path of the ontology with IRI `iri` or None if
+        it cannot be resolved to a local file."""
+        url = iri.rstrip("/#")
+        url = self.iri_mappings.get(url, self.catalog_mappings.get(url, url))
+        if url.startswith("file://"):
+            url = url[7:]
+        if url.startswith(WEB_PROTOCOLS) or not os.path.isfile(url):
+            return None
+        return os.path.normpath(os.path.abspath(url))
+
+    def submit(self, path: str) -> bool:
+        """Submit file `path` for parsing if it has not already been
+        submitted and its format is parsed by rdflib.
+
+        Returns true if `path` is or has been submitted.
+        """
+        if path in self.futures:
+            return True
+        fmt = guess_format(path, fmap=FMAP)
+        if not fmt or fmt in OWLREADY2_FORMATS or fmt in STREAMING_FORMATS:
+            return False
+        self.read_catalog(os.path.dirname(path))
+        self.futures[path] = self.executor.submit(parse_file, path, fmt)
+        return True
+
+    def result(self, path: str) -> "Optional[Tuple[List, List]]":
+        """Returns the `(objs, datas)` triples of file `path`.
+
+        Returns None if `path` cannot be parsed by the pool, has already
+        been returned or if parsing failed, in which case the file should
+        be loaded as usual.
+        """
+        path = os.path.normpath(os.path.abspath(path))
+        if not self.submit(path) or self.futures[path] is None:
+            return None
+        future = self.futures[path]
+        while not future.done():
+            pending = [f for f in self.futures.values() if f and not f.done()]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for other in done:
+                self._submit_imports(other)
+        self._submit_imports(future)
+        self.futures[path] = None
+        if future.exception():
+            return None
+        objs, datas, _ = future.result()
+        return objs, datas
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        self.executor.shutdown(cancel_futures=True)
+
+    def _submit_imports(self, future) -> None:
+        """Submit the imports of the file parsed by `future`."""
+        if future in self.seen:
+            return
+        self.seen.add(future)
+        if future.exception():
+            return
+        for iri in future.result()[2]:
+            path = self.resolve(iri)
+            if path:
+                self.submit(path)
+
+
+class StreamingInserter:
+    """Inserts triples into the quadstore of an Owlready2 ontology in
+    batches that are committed separately.
+
+    Unlike `QuadstoreSink`, whose triples are inserted in a single
+    transaction, memory usage is bounded.  IRIs are abbreviated with a
+    cache that is cleared whenever it grows beyond `cachesize` IRIs and
+    looked up in the quadstore otherwise.  Only the mapping of blank
+    nodes grows with the input.
+
+    Arguments:
+        subgraph: The Owlready2 subgraph (`onto.graph`) of the ontology
+            to add the triples to.  Existing triples are deleted.
+        filename: Name of the parsed file.  Its modification time is
+            stored as the last update time of the ontology.
+        batchsize: Number of triples inserted and committed at a time.
+        cachesize: Maximum number of IRIs kept in the cache between
+            batches.
+        progress: Optional callback called after each batch with the
+            number of triples inserted so far and the average number of
+            triples inserted per second.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        subgraph: "SubGraph",
+        filename: "Optional[str]" = None,
+        batchsize: "Optional[int]" = None,
+        cachesize: "Optional[int]" = None,
+        progress: "Optional[Callable[[int, float], None]]" = None,
+    ):
+        self.subgraph = subgraph
+        self.graph = subgraph.parent
+        self.filename = filename
+        self.batchsize = batchsize or BATCHSIZE
+        self.cachesize = cachesize or CACHESIZE
+        self.progress = progress
+        self.objs = []
+        self.datas = []
+        self.count = 0
+        self.cache = {"": 60}
+        self.blanks = {}
+        self.new_resources = []
+        self.start = time.perf_counter()
+        self.cursor = self.graph.db.cursor()
+        self.cursor.execute("DELETE FROM objs WHERE c=?", (subgraph.c,))
+        self.cursor.execute("DELETE FROM datas WHERE c=?", (subgraph.c,))
+        self.current_resource = self.cursor.execute(
+            "SELECT current_resource FROM store"
+        ).fetchone()[0]
+
+    def add(self, subject: str, predicate: str, obj: str) -> None:
+        """Add an object triple.  Blank nodes are prefixed with "_:"."""
+        self.objs.append((subject, predicate, obj))
+        if len(self.objs) + len(self.datas) >= self.batchsize:
+            self.flush()
+
+    def add_data(
+        self, subject: str, predicate: str, value, datatype: str
+    ) -> None:
+        """Add a data triple.  `datatype` is a datatype IRI, "@" followed
+        by a language tag or an empty string."""
+        self.datas.append((subject, predicate, value, datatype))
+        if len(self.objs) + len(self.datas) >= self.batchsize:
+            self.flush()
+
+    def add_rdflib(self, triple: "Tuple") -> None:
+        """Add a triple of rdflib nodes."""
+        subject, predicate, obj = triple
+        if isinstance(obj, rdflib.Literal):
+            self.add_data(
+                node_iri(subject), str(predicate), *literal_value(obj)
+            )
+        else:
+            self.add(node_iri(subject), str(predicate), node_iri(obj))
+
+    def flush(self) -> None:
+        """Insert and commit the collected triples."""
+        abbreviate = self._abbreviate
+        objs = [
+            (abbreviate(s), abbreviate(p), abbreviate(o))
+            for s, p, o in self.objs
+        ]
+        datas = [
+            (
+                abbreviate(s),
+                abbreviate(p),
+                o,
+                abbreviate(d) if d and not d.startswith("@") else d or 60,
+            )
+            for s, p, o, d in self.datas
+        ]
+        cursor = self.cursor
+        if self.new_resources:
+            cursor.executemany(
+                "INSERT INTO resources VALUES (?,?)", self.new_resources
+            )
+            self.new_resources = []
+        context = self.subgraph.c
+        cursor.executemany(
+            f"INSERT OR IGNORE INTO objs VALUES ({context},?,?,?)", objs
+        )
+        cursor.executemany(
+            f"INSERT OR IGNORE INTO datas VALUES ({context},?,?,?,?)", datas
+        )
+        cursor.execute(
+            "UPDATE store SET current_resource=?", (self.current_resource,)
+        )
+        self.graph.db.commit()
+        self.count += len(objs) + len(datas)
+        self.objs = []
+        self.datas = []
+        if len(self.cache) > self.cachesize:
+            self.cache = {"": 60}
+        if self.progress:
+            elapsed = time.perf_counter() - self.start
+            self.progress(self.count, self.count / elapsed if elapsed else 0.0)
+
+    def finish(self) -> str:
+        """Inserts the remaining triples and updates the ontology.
+
+        Returns:
+            The IRI of the ontology found among the inserted triples or an
+            empty string if no ontology was found.
+        """
+        self.flush()
+        _, _, finish = self.subgraph.import_triples_from_queue(
+            None, self.filename, False
+        )
+        base_iri = finish()
+        self.graph.db.commit()
+        return base_iri
+
+    def _abbreviate(self, iri: str) -> int:
+        """Returns the storid of `iri`, creating it if needed."""
+        storid = self.cache.get(iri)
+        if storid is None:
+            if iri.startswith("_"):  # blank node
+                storid = self.blanks.get(iri)
+                if storid is None:
+                    storid = self.blanks[iri] = self.graph.new_blank_node()
+                return storid
+            row = self.cursor.execute(
+                "SELECT storid FROM resources WHERE iri=? LIMIT 1", (iri,)
+            ).fetchone()
+            if row:
+                storid = row[0]
+            else:
+                self.current_resource += 1
+                storid = self.current_resource
+                self.new_resources.append((storid, iri))
+            self.cache[iri] = storid
+        return storid
+
+
+# Matches N-Triples and N-Quads lines without escape sequences.  Other
+# lines are parsed with `LineParser`.
+_IRI = r"<([^<>\\\s]*)>"
+_BNODE = r"_:(\S+)"
+NT_LINE = re.compile(
+    rf"[ \t]*(?:{_IRI}|{_BNODE})[ \t]+{_IRI}[ \t]+"
+    rf'(?:{_IRI}|{_BNODE}|"([^"\\\\]*)"'
+    r"(?:\^\^<([^<>\\\s]*)>|@([a-zA-Z]+(?:-[a-zA-Z0-9]+)*))?)"
+    r"(?:[ \t]+(?:<[^<>\s]*>|_:\S+))?"  # graph name (N-Quads)
+    r"[ \t]*\.[ \t]*(?:#.*)?\r?$"
+)
+
+
+class _BlankNodeLabels(dict):
+    """Blank node context for rdflib parsers that keeps the labels of
+    blank nodes."""
+
+    def get(self, key, default=None):  # pylint: disable=unused-argument
+        return rdflib.BNode(key)
+
+
+class LineParser(W3CNTriplesParser):
+    """Parser for single N-Triples or N-Quads lines.  Graph names are
+    ignored and blank nodes keep their labels."""
+
+    def __init__(self):
+        super().__init__(bnode_context=_BlankNodeLabels())
+        self.triple = None
+
+    def parse_line(self, line: str) -> "Optional[Tuple]":
+        """Returns the rdflib triple on `line` or None if the line is
+        empty or a comment."""
+        self.line = line.rstrip("\r\n")
+        self.triple = None
+        self.parseline()
+        return self.triple
+
+    def parseline(self, bnode_context=None) -> None:
+        self.eat(r_wspace)
+        if (not self.line) or self.line.startswith("#"):
+            return
+        subject = self.subject(bnode_context)
+        self.eat(r_wspace)
+        predicate = self.predicate()
+        self.eat(r_wspace)
+        obj = self.object(bnode_context)
+        self.eat(r_wspace)
+        if not self.uriref():  # graph name
+            self.nodeid(bnode_context)
+        self.eat(r_tail)
+        if self.line:
+            raise ParseError("Trailing garbage")
+        self.triple = subject, predicate, obj
+
+
+def stream_into(  # pylint: disable=too-many-arguments,too-many-locals
+    subgraph: "SubGraph",
+    path: str,
+    filename: "Optional[str]" = None,
+    *,
+    batchsize: "Optional[int]" = None,
+    cachesize: "Optional[int]" = None,
+    progress: "Optional[Callable[[int, float], None]]" = None,
+) -> str:
+    """Stream the N-Triples or N-Quads file `path` into the quadstore.
+
+    The file is read line by line and the triples are committed in
+    batches of `batchsize` triples.  Graph names of N-Quads are ignored,
+    i.e. all triples are added to the same ontology.
+
+    Arguments:
+        subgraph: The Owlready2 subgraph (`onto.graph`) of the ontology to
+            add the triples to.  Existing triples are deleted.
+        path: Path to the file to parse.
+        filename: Name of the parsed file.  Defaults to `path`.
+        batchsize: Number of triples inserted and committed at a time.
+            Defaults to `BATCHSIZE`.
+        cachesize: Maximum number of IRIs kept in the cache between
+            batches.  Defaults to `CACHESIZE`.
+        progress: Optional callback called after each batch with the
+            number of triples inserted so far and the average number of
+            triples inserted per second.
+
+    Returns:
+        The IRI of the ontology found in the file or an empty string if
+        the file does not define an ontology.
+    """
+    inserter = StreamingInserter(
+        subgraph,
+        filename=filename or path,
+        batchsize=batchsize,
+        cachesize=cachesize,
+        progress=progress,
+    )
+    add, add_data, match = inserter.add, inserter.add_data, NT_LINE.match
+    parser = None
+    with open(path, "rt", encoding="utf8") as handle:
+        for lineno, line in enumerate(handle, 1):
+            groups = match(line)
+            if groups:
+                subj, sbnode, pred, obj, obnode, lexical, dtype, lang = (
+                    groups.groups()
+                )
+                if subj is None:
+                    subj = f"_:{sbnode}"
+                if obj is not None:
+                    add(subj, pred, obj)
+                elif obnode is not None:
+                    add(subj, pred, f"_:{obnode}")
+                elif lang:
+                    add_data(subj, pred, lexical, f"@{lang}")
+                elif dtype:
+                    add_data(subj, pred, typed_value(lexical, dtype), dtype)
+                else:
+                    add_data(subj, pred, lexical, "")
+                continue
+            if parser is None:
+                parser = LineParser()
+            try:
+                triple = parser.parse_line(line)
+            except ParseError as exc:
+                raise ParseError(
+                    f"{path}, line {lineno}: {exc}: {line.strip()!r}"
+                ) from exc
+            if triple:
+                inserter.add_rdflib(triple)
+    return inserter.finish()
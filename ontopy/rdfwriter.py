@@ -0,0 +1,460 @@
+"""Streaming Turtle and N-Triples writer for the Owlready2 quadstore.
+
+`write_graph()` writes the triples of an Owlready2 graph, e.g. the
+sub-graph of an ontology, directly from the SQLite quadstore to a file.
+The triples are never collected in an rdflib graph and no intermediate
+file is written, so memory usage is independent of the size of the
+ontology.
+
+IRIs are rewritten with an `iri_map` (used by `Ontology.save()` to
+replace the base IRI of the ontology with its versioned `iri`) and
+compacted with namespace prefixes while writing.  Prefixes are declared
+when they are used for the first time, such that only the prefixes that
+are actually used end up in the output.
+
+Turtle output groups triples by subject.  The ontology declaration is
+written first, followed by the other subjects in the order of the
+quadstore.  Blank nodes that are referred to exactly once are written
+inline as `[ ... ]` and RDF lists as `( ... )`, which is how OWL
+restrictions and class expressions normally appear in Turtle.
+
+`write_stored_graph()` writes an ontology from a quadstore file, e.g.
+in a worker process of `Ontology.save(recursive=True, workers=N)`.
+"""
+
+# pylint: disable=protected-access
+import io
+import re
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import rdflib
+
+if TYPE_CHECKING:
+    from typing import (
+        Callable,
+        Dict,
+        Iterable,
+        List,
+        Optional,
+        TextIO,
+        Tuple,
+        Union,
+    )
+
+    from owlready2.triplelite import Graph, SubGraph
+
+
+# Formats written by write_graph()
+WRITER_FORMATS = "turtle", "ttl", "ntriples", "nt", "nt11"
+
+# Size of the buffer of output files
+BUFFERSIZE = 1 << 20
+
+# Maximum number of cached IRIs
+CACHESIZE = 200000
+
+_RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+_XSD = "http://www.w3.org/2001/XMLSchema#"
+RDF_TYPE = _RDF + "type"
+RDF_FIRST = _RDF + "first"
+RDF_REST = _RDF + "rest"
+RDF_NIL = _RDF + "nil"
+
+# Local names that can be written as prefixed names
+_LOCAL_NAME = re.compile(r"(?:[A-Za-z0-9_](?:[\w.-]*[\w-])?)?$", re.ASCII)
+_INTEGER = re.compile(r"[+-]?\d+$")
+
+
+def write_graph(  # pylint: disable=too-many-arguments
+    graph: "Union[Graph, SubGraph]",
+    destination: "Union[str, Path, TextIO]",
+    format: str = "turtle",  # pylint: disable=redefined-builtin
+    *,
+    namespaces: "Optional[Dict[str, str]]" = None,
+    iri_map: "Optional[Dict[str, str]]" = None,
+    contexts: "Optional[Iterable[int]]" = None,
+    filter: "Optional[Callable]" = None,  # pylint: disable=redefined-builtin
+) -> None:
+    """Write the triples of an Owlready2 graph to `destination`.
+
+    Arguments:
+        graph: The Owlready2 graph, typically `onto.graph`.
+        destination: File name or text file object to write to.
+        format: Output format.  Either "turtle" or "ntriples".
+        namespaces: Dict mapping prefixes to namespaces used in Turtle
+            output.  It extends the namespaces that rdflib binds by
+            default.
+        iri_map: Dict mapping IRIs to the IRIs written in their place.
+        contexts: Contexts to write the union of.  See
+            `QuadstoreWriter.write()`.
+        filter: Callable selecting the triples to write.  See
+            `QuadstoreWriter.write()`.
+    """
+    if isinstance(destination, io.TextIOBase):
+        writer = QuadstoreWriter(destination, format, namespaces, iri_map)
+        writer.write(graph, contexts=contexts, filter=filter)
+        writer.close()
+        return
+    with open(
+        destination, "wt", encoding="utf8", buffering=BUFFERSIZE
+    ) as handle:
+        writer = QuadstoreWriter(handle, format, namespaces, iri_map)
+        writer.write(graph, contexts=contexts, filter=filter)
+        writer.close()
+
+
+class QuadstoreWriter:  # pylint: disable=too-many-instance-attributes
+    """Writes triples from the Owlready2 quadstore as Turtle or N-Triples.
+
+    Arguments:
+        handle: Text file object to write to.
+        format: Output format.  Either "turtle" or "ntriples".
+        namespaces: Dict mapping prefixes to namespaces used in Turtle
+            output.  It extends the namespaces that rdflib binds by
+            default.
+        iri_map: Dict mapping IRIs to the IRIs written in their place.
+    """
+
+    def __init__(
+        self,
+        handle: "TextIO",
+        format: str = "turtle",  # pylint: disable=redefined-builtin
+        namespaces: "Optional[Dict[str, str]]" = None,
+        iri_map: "Optional[Dict[str, str]]" = None,
+    ):
+        if format not in WRITER_FORMATS:
+            raise ValueError(f"unsupported format: {format!r}")
+        self.handle = handle
+        self.turtle = format in ("turtle", "ttl")
+        self.iri_map = iri_map or {}
+        prefixes = {
+            prefix: str(ns)
+            for prefix, ns in rdflib.Graph().namespace_manager.namespaces()
+        }
+        prefixes.update(namespaces or {})
+        self.prefixes = {ns: prefix for prefix, ns in prefixes.items()}
+        self._unsplit = sorted(
+            (ns for ns in self.prefixes if not ns.endswith(("#", "/"))),
+            key=len,
+            reverse=True,
+        )
+        self.declared = set()
+        self._pending = []  # prefixes to declare before the next block
+        self._graph = None
+        self._filter = None
+        self._where = "1"
+        self._unabbreviate = None
+        self._rdf = {}
+        self._wrote_block = False
+
+    def write(
+        self,
+        graph: "Union[Graph, SubGraph]",
+        contexts: "Optional[Iterable[int]]" = None,
+        filter: "Optional[Callable]" = None,  # pylint: disable=redefined-builtin
+    ) -> None:
+        """Write the triples of `graph`.
+
+        Arguments:
+            graph: The Owlready2 graph, typically `onto.graph`.
+            contexts: Contexts (the `c` attribute of the sub-graphs of
+                ontologies) to write the union of.  Triples in more than
+                one context are only written once.  Defaults to the
+                context of `graph` or the whole world if `graph` is the
+                graph of the world.
+            filter: Callable called as `filter(graph, s, p, o, d)` for
+                each triple, like the filter of Owlready2's `save()`.
+                Triples for which it returns false are not written.
+        """
+        self._graph = graph
+        self._filter = filter
+        self._unabbreviate = lru_cache(CACHESIZE)(graph._unabbreviate)
+        self._rdf = {
+            iri: graph._abbreviate(iri, False)
+            for iri in (RDF_TYPE, RDF_FIRST, RDF_REST, RDF_NIL)
+        }
+        if contexts is None:
+            c = getattr(graph, "c", None)
+            contexts = () if c is None else (c,)
+        contexts = sorted(set(contexts))
+        if contexts:
+            self._where = f"c IN ({','.join(str(int(c)) for c in contexts)})"
+        else:
+            self._where = "1"
+
+        onto = getattr(graph, "onto", None)
+        first = onto.storid if onto is not None and self.turtle else None
+        if first is not None:
+            self._write_subject(first, self._triples(first))
+
+        cursor = graph.db.cursor()
+        cursor.execute(
+            f"SELECT s,p,o,d FROM quads WHERE {self._where}"
+            + (" ORDER BY s" if self.turtle or len(contexts) != 1 else "")
+        )
+        write = self._write_subject if self.turtle else self._write_triples
+        subject, triples = None, {}
+        for s, p, o, d in cursor:
+            if s != subject:
+                write(subject, triples)
+                subject, triples = s, {}
+            if s != first and (filter is None or filter(graph, s, p, o, d)):
+                triples[p, o, d] = None
+        write(subject, triples)
+
+    def close(self) -> None:
+        """Flush the output.  The file object is not closed."""
+        self.handle.flush()
+
+    def _write_triples(self, subject, triples) -> None:
+        """Write the predicate-object pairs `triples` of `subject` as
+        N-Triples."""
+        if not triples:
+            return
+        node = self._node(subject)
+        self.handle.write(
+            "".join(
+                f"{node} {self._iri(p)} {self._object(o, d)} .\n"
+                for p, o, d in triples
+            )
+        )
+
+    def _write_subject(self, subject, triples) -> None:
+        """Write the Turtle block for `subject` with the predicate-object
+        pairs `triples`."""
+        if not triples:
+            return
+        if subject < 0 and self._references(subject) == 1:
+            return  # written inline
+        block = f"{self._node(subject)} {self._predicates(triples, 1)} .\n"
+        parts = ["\n"] if self._wrote_block else []
+        if self._pending:
+            parts.extend(
+                f"@prefix {prefix}: <{ns}> .\n" for prefix, ns in self._pending
+            )
+            parts.append("\n")
+            self._pending.clear()
+        parts.append(block)
+        self.handle.write("".join(parts))
+        self._wrote_block = True
+
+    def _predicates(self, triples, level: int) -> str:
+        """Returns the predicate-object list of `triples` in Turtle."""
+        indent = "    " * level
+        objects = {}
+        for p, o, d in triples:
+            objects.setdefault(p, []).append((o, d))
+        parts = []
+        rdf_type = self._rdf[RDF_TYPE]
+        for p in sorted(objects, key=lambda p: p != rdf_type):
+            predicate = "a" if p == rdf_type else self._iri(p)
+            values = ", ".join(
+                self._turtle_object(o, d, level) for o, d in objects[p]
+            )
+            parts.append(f"{predicate} {values}")
+        return f" ;\n{indent}".join(parts)
+
+    def _turtle_object(self, o, d, level: int) -> str:
+        """Returns object `o` with datatype `d` in Turtle."""
+        if d is not None or o >= 0 or self._references(o) != 1:
+            return self._object(o, d)
+        items = self._collection(o)
+        if items is not None:
+            return (
+                "( "
+                + " ".join(
+                    self._turtle_object(item, datatype, level + 1)
+                    for item, datatype in items
+                )
+                + " )"
+            )
+        triples = self._triples(o)
+        if not triples:
+            return "[ ]"
+        indent = "    " * level
+        return (
+            f"[\n{indent}    {self._predicates(triples, level + 1)}\n"
+            f"{indent}]"
+        )
+
+    def _collection(self, node: int) -> "Optional[List[Tuple[int, object]]]":
+        """Returns the items of the RDF list starting at blank node `node`
+        or None if `node` is not a well-formed list."""
+        first, rest = self._rdf[RDF_FIRST], self._rdf[RDF_REST]
+        nil = self._rdf[RDF_NIL]
+        items = []
+        while node != nil:
+            if node >= 0 or (items and self._references(node) != 1):
+                return None
+            triples = self._triples(node)
+            predicates = sorted(p for p, _, _ in triples)
+            if predicates != sorted((first, rest)):
+                return None
+            for p, o, d in triples:
+                if p == first:
+                    items.append((o, d))
+                else:
+                    node = o
+                    if d is not None:
+                        return None
+        return items
+
+    def _triples(self, subject: int) -> "List[Tuple[int, object, object]]":
+        """Returns the predicate-object pairs of `subject`."""
+        graph = self._graph
+        triples = graph.execute(
+            f"SELECT p,o,NULL FROM objs WHERE {self._where} AND s=? "
+            f"UNION SELECT p,o,d FROM datas WHERE {self._where} AND s=?",
+            (subject, subject),
+        ).fetchall()
+        if self._filter is None:
+            return triples
+        return [t for t in triples if self._filter(graph, subject, *t)]
+
+    def _references(self, node: int) -> int:
+        """Returns the number of distinct triples with `node` as object."""
+        return self._graph.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT s,p FROM objs "
+            f"WHERE o=? AND {self._where})",
+            (node,),
+        ).fetchone()[0]
+
+    def _node(self, storid: int) -> str:
+        """Returns the subject or object resource `storid`."""
+        if storid < 0:
+            return f"_:b{-storid}"
+        return self._iri(storid)
+
+    def _iri(self, storid: int) -> str:
+        """Returns the IRI of `storid`, compacted in Turtle output."""
+        iri = self._unabbreviate(storid)
+        iri = self.iri_map.get(iri, iri)
+        if self.turtle:
+            return self._compact(iri)
+        return f"<{iri}>"
+
+    def _compact(self, iri: str) -> str:
+        """Returns `iri` as a prefixed name if possible."""
+        split = max(iri.rfind("#"), iri.rfind("/")) + 1
+        namespace, local = iri[:split], iri[split:]
+        prefix = self.prefixes.get(namespace)
+        if prefix is None:
+            # Namespaces that do not end with "#" or "/"
+            for namespace in self._unsplit:
+                if iri.startswith(namespace):
+                    prefix = self.prefixes[namespace]
+                    local = iri[len(namespace) :]
+                    break
+        if prefix is None or not _LOCAL_NAME.match(local):
+            return f"<{iri}>"
+        if namespace not in self.declared:
+            self.declared.add(namespace)
+            self._pending.append((prefix, namespace))
+        return f"{prefix}:{local}"
+
+    def _object(self, o, d) -> str:
+        """Returns object `o` with datatype `d` (None for resources)."""
+        if d is None:
+            return self._node(o)
+        lexical = str(o)
+        if isinstance(d, str) and d.startswith("@"):
+            return f"{self._string(lexical)}{d}"
+        if not d:
+            return self._string(lexical)
+        return self._typed_literal(lexical, self._unabbreviate(d))
+
+    def _typed_literal(self, lexical: str, datatype: str) -> str:
+        """Returns the literal `lexical` with datatype IRI `datatype`."""
+        if not self.turtle:
+            return f"{self._string(lexical)}^^<{datatype}>"
+        if (datatype == _XSD + "integer" and _INTEGER.match(lexical)) or (
+            datatype == _XSD + "boolean" and lexical in ("true", "false")
+        ):
+            return lexical
+        return f"{self._string(lexical)}^^{self._compact(datatype)}"
+
+    def _string(self, value: str) -> str:
+        """Returns `value` as a quoted string literal."""
+        value = value.replace("\\", "\\\\").replace('"', '\\"')
+        if self.turtle and "\n" in value:
+            return f'"""{value}"""'.replace("\r", "\\r")
+        return '"' + value.replace("\n", "\\n").replace("\r", "\\r") + '"'
+
+
+class StoredGraph:  # pylint: disable=too-few-public-methods
+    """Read-only view of the sub-graph of an ontology in an Owlready2
+    quadstore file, providing what `QuadstoreWriter` needs.
+
+    Arguments:
+        filename: Path to the SQLite quadstore file.
+        c: Context of the ontology in the quadstore.
+        storid: Storid of the ontology.
+    """
+
+    def __init__(self, filename: "Union[str, Path]", c: int, storid: int):
+        uri = Path(filename).resolve().as_uri() + "?mode=ro"
+        self.db = sqlite3.connect(uri, uri=True)
+        self.execute = self.db.execute
+        self.c = c
+        self.onto = SimpleNamespace(storid=storid)
+
+    def _abbreviate(self, iri: str, create_if_missing: bool = False):
+        """Returns the storid of `iri` or None if it is not stored."""
+        if create_if_missing:
+            raise ValueError("StoredGraph is read-only")
+        row = self.execute(
+            "SELECT storid FROM resources WHERE iri=? LIMIT 1", (iri,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _unabbreviate(self, storid: int) -> str:
+        """Returns the IRI of `storid`."""
+        return self.execute(
+            "SELECT iri FROM resources WHERE storid=? LIMIT 1", (storid,)
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.db.close()
+
+
+def write_stored_graph(  # pylint: disable=too-many-arguments
+    filename: "Union[str, Path]",
+    c: int,
+    storid: int,
+    destination: "Union[str, Path]",
+    format: str = "turtle",  # pylint: disable=redefined-builtin
+    *,
+    namespaces: "Optional[Dict[str, str]]" = None,
+    iri_map: "Optional[Dict[str, str]]" = None,
+) -> str:
+    """Write an ontology from the quadstore file `filename`.
+
+    Arguments:
+        filename: Path to the SQLite quadstore file.
+        c: Context of the ontology in the quadstore.
+        storid: Storid of the ontology.
+        destination: File name to write to.
+        format: Output format.  Either "turtle" or "ntriples".
+        namespaces: Dict mapping prefixes to namespaces.
+        iri_map: Dict mapping IRIs to the IRIs written in their place.
+
+    Returns:
+        The file name written to.
+    """
+    graph = StoredGraph(filename, c, storid)
+    try:
+        write_graph(
+            graph,
+            destination,
+            format,
+            namespaces=namespaces,
+            iri_map=iri_map,
+        )
+    finally:
+        graph.close()
+    return str(destination)
@@ -0,0 +1,364 @@
+"""Semantic similarity between sets of classes.
+
+The `similarity_matrix()` function implemented in this module is
+available as `Ontology.similarity_matrix()`.  All quantities that
+depend on a single class (depths, generation distances, MRO positions
+and information content) are taken from the hierarchy index once, such
+that the similarity of each pair of classes reduces to a minimum or
+maximum over the ancestors they have in common.
+
+Supported measures:
+
+- "wu_palmer": Wu-Palmer measure, with the same closest common ancestor
+  and distances as `Ontology.get_wu_palmer_measure()`.
+- "resnik": Resnik measure, i.e. the information content of the most
+  informative common ancestor.
+- "lin": Lin measure, i.e. twice the Resnik measure divided by the sum
+  of the information content of the two classes.
+
+The information content of a class is estimated from the hierarchy as
+`-log(n/N)`, where `n` is the number of descendants of the class
+(including itself) and `N` the number of classes in the index.
+
+The matrix is computed with NumPy (which must be installed) in chunks
+of rows, optionally distributed over a pool of processes.
+"""
+
+# pylint: disable=protected-access
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from owlready2.base import owl_thing
+
+from ontopy.hierarchy import iterbits
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Sequence
+
+    from owlready2 import ThingClass
+
+    from ontopy.hierarchy import HierarchyIndex
+
+
+MEASURES = ("wu_palmer", "resnik", "lin")
+
+# Position used for classes that are not in an MRO
+_NOT_IN_MRO = 2**30
+
+# Maximum number of elements in temporary NumPy arrays
+_BLOCKSIZE = 2**22
+
+
+def similarity_matrix(
+    hierarchy: "HierarchyIndex",
+    classes_a: "Sequence[ThingClass]",
+    classes_b: "Optional[Sequence[ThingClass]]" = None,
+    *,
+    measure: str = "wu_palmer",
+    chunksize: int = 256,
+    processes: "Optional[int]" = None,
+) -> "np.ndarray":
+    """Returns a matrix with the semantic similarity between all pairs
+    of classes in `classes_a` and `classes_b`.
+
+    Arguments:
+        hierarchy: Hierarchy index of the world the classes belong to.
+        classes_a: Sequence of classes corresponding to the rows.
+        classes_b: Sequence of classes corresponding to the columns.
+            Defaults to `classes_a`.
+        measure: Similarity measure.  One of "wu_palmer", "resnik" or
+            "lin".
+        chunksize: Number of rows computed at a time.
+        processes: If given and larger than one, the chunks are computed
+            by a pool of this number of processes.
+
+    Returns:
+        A NumPy array of shape `(len(classes_a), len(classes_b))`.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    if np is None:
+        raise ImportError(
+            "similarity_matrix() requires NumPy.  Install it with "
+            "`pip install numpy`."
+        )
+    if measure not in MEASURES:
+        raise ValueError(
+            f"Unknown similarity measure {measure!r}.  Should be one of: "
+            + ", ".join(MEASURES)
+        )
+    if classes_b is None:
+        classes_b = classes_a
+    hierarchy.update()
+    nodes_a = _numbers(hierarchy, classes_a)
+    nodes_b = _numbers(hierarchy, classes_b)
+    tables = _Tables(hierarchy, set(nodes_a).union(nodes_b), measure)
+
+    # Group rows with similar ancestors, such that each chunk only
+    # involves a small number of ancestors
+    order = sorted(range(len(nodes_a)), key=lambda i: tables.rank(nodes_a[i]))
+    chunks = [
+        [nodes_a[i] for i in order[start : start + chunksize]]
+        for start in range(0, len(order), chunksize)
+    ]
+    args = [tables.chunk_arguments(chunk, nodes_b) for chunk in chunks]
+    if processes and processes > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_compute_chunk, args))
+    else:
+        results = [_compute_chunk(arg) for arg in args]
+
+    matrix = np.empty((len(nodes_a), len(nodes_b)))
+    start = 0
+    for chunk, (values, fallback) in zip(chunks, results):
+        rows = order[start : start + len(chunk)]
+        start += len(chunk)
+        for i, j in zip(*np.nonzero(fallback)):
+            values[i, j] = tables.similarity(chunk[i], nodes_b[j])
+        matrix[rows] = values
+    return matrix
+
+
+def _numbers(hierarchy, classes) -> "List[int]":
+    """Returns a list with the node numbers of `classes`."""
+    numbers = []
+    for cls in classes:
+        node = hierarchy.number(cls)
+        if node is None:
+            raise ValueError(f"{cls} is not in the hierarchy index")
+        numbers.append(node)
+    return numbers
+
+
+class _Tables:
+    """Per-class quantities needed for computing similarities.
+
+    Arguments:
+        hierarchy: The hierarchy index.
+        nodes: Node numbers of all classes that are compared.
+        measure: The similarity measure.
+    """
+
+    def __init__(self, hierarchy, nodes, measure):
+        self.hierarchy = hierarchy
+        self.measure = measure
+        self.mros = {}  # maps node to (MRO positions, MRO length)
+        self.distances = {}  # maps node to {ancestor: generations}
+        self.ancestors = {}  # maps node to set of ancestor nodes
+        self.depth = {}  # maps ancestor node to depth
+        self.ic = {}  # maps node to information content
+
+        for node in nodes:
+            self.mros[node] = hierarchy.mro_positions(node)
+            positions = self.mros[node][0]
+            if measure == "wu_palmer":
+                self.distances[node] = {
+                    anc: hierarchy._distance(node, anc) for anc in positions
+                }
+                for anc in positions:
+                    if anc not in self.depth:
+                        self.depth[anc] = hierarchy._distance(
+                            anc, hierarchy.numbers[owl_thing]
+                        )
+            else:
+                ancestors = self.ancestors[node] = set(
+                    iterbits(hierarchy._ancestors[node])
+                )
+                for anc in ancestors.union([node]):
+                    if anc not in self.ic:
+                        self.ic[anc] = self._information_content(anc)
+
+    def rank(self, node: int) -> "List[int]":
+        """Returns a key grouping classes with similar ancestors."""
+        positions = self.mros[node][0]
+        return sorted(positions, key=positions.get)[::-1]
+
+    def _information_content(self, node: int) -> float:
+        """Returns the information content of `node`."""
+        total = len(self.hierarchy.storids)
+        return -math.log(self.hierarchy.descendant_count(node) / total)
+
+    def columns(self, nodes: "Sequence[int]") -> "List[int]":
+        """Returns a sorted list of all ancestors of `nodes`."""
+        if self.measure == "wu_palmer":
+            columns = set().union(*(self.mros[node][0] for node in nodes))
+        else:
+            columns = set().union(*(self.ancestors[node] for node in nodes))
+        return sorted(columns)
+
+    def similarity(self, a: int, b: int) -> float:
+        """Returns the similarity between nodes `a` and `b`."""
+        if self.measure == "wu_palmer":
+            hierarchy = self.hierarchy
+            cca = hierarchy._closest_common_ancestor([a, b])
+            if cca is None:
+                cca = hierarchy.number(_walk_mros(a, b, hierarchy))
+            depth = self.depth.get(cca)
+            if depth is None:
+                depth = hierarchy._distance(cca, hierarchy.numbers[owl_thing])
+            generations = hierarchy._distance(a, cca) + hierarchy._distance(
+                b, cca
+            )
+            denominator = generations + 2 * depth
+            return 2 * depth / denominator if denominator else 1.0
+
+        common = self.ancestors[a].intersection(self.ancestors[b])
+        resnik = max((self.ic[anc] for anc in common), default=0.0)
+        if self.measure == "resnik":
+            return resnik
+        denominator = self.ic[a] + self.ic[b]
+        return 2 * resnik / denominator if denominator else 1.0
+
+    def chunk_arguments(
+        self, chunk: "Sequence[int]", nodes_b: "Sequence[int]"
+    ) -> tuple:
+        """Returns arguments for `_compute_chunk()` for rows `chunk`."""
+        columns = self.columns(chunk)
+        if self.measure == "wu_palmer":
+
+            def table(nodes, values):
+                array = np.full(
+                    (len(nodes), len(columns)), _NOT_IN_MRO, dtype=np.int32
+                )
+                for i, node in enumerate(nodes):
+                    row = values(node)
+                    for j, column in enumerate(columns):
+                        if column in row:
+                            array[i, j] = row[column]
+                return array
+
+            def tables(nodes):
+                return (
+                    table(nodes, lambda node: self.mros[node][0]),
+                    table(nodes, self.distances.get),
+                    np.array([self.mros[node][1] for node in nodes]),
+                )
+
+            return (
+                self.measure,
+                tables(chunk),
+                tables(nodes_b),
+                np.array([self.depth[column] for column in columns]),
+            )
+
+        def mask(nodes):
+            array = np.zeros((len(nodes), len(columns)), dtype=bool)
+            for i, node in enumerate(nodes):
+                ancestors = self.ancestors[node]
+                for j, column in enumerate(columns):
+                    array[i, j] = column in ancestors
+            return array
+
+        return (
+            self.measure,
+            (mask(chunk), np.array([self.ic[node] for node in chunk])),
+            (mask(nodes_b), np.array([self.ic[node] for node in nodes_b])),
+            np.array([self.ic[column] for column in columns]),
+        )
+
+
+def _compute_chunk(args: tuple):
+    """Compute the similarities for one chunk of rows with NumPy.
+
+    `args` is a `(measure, tables_a, tables_b, column_values)` tuple,
+    where `tables_a` and `tables_b` are tuples of arrays with one row per
+    class of the chunk and per column class, respectively.
+
+    Returns a `(values, fallback)` tuple, where `fallback` is a boolean
+    array marking the pairs that must be computed by
+    `_Tables.similarity()`.
+    """
+    measure, tables_a, tables_b, column_values = args
+    rows, ncolumns = tables_a[0].shape
+    ncolumns_b = len(tables_b[0])
+    step = max(1, _BLOCKSIZE // max(1, rows * ncolumns))
+    values = np.empty((rows, ncolumns_b))
+    fallback = np.zeros((rows, ncolumns_b), dtype=bool)
+    for start in range(0, ncolumns_b, step):
+        block = slice(start, start + step)
+        tables_block = tuple(table[block] for table in tables_b)
+        if measure == "wu_palmer":
+            values[:, block], fallback[:, block] = _wu_palmer_block(
+                tables_a, tables_block, column_values
+            )
+        else:
+            values[:, block] = _resnik_block(
+                measure, tables_a, tables_block, column_values
+            )
+    return values, fallback
+
+
+def _wu_palmer_block(tables_a, tables_b, depth):
+    """Returns Wu-Palmer similarities and fallback mask for a block.
+
+    `tables_a` and `tables_b` are `(MRO positions, distances, MRO
+    lengths)` tuples for the rows and columns, respectively, and `depth`
+    the depths of the ancestors.
+    """
+    pos_a, dist_a, len_a = tables_a
+    pos_b, dist_b, len_b = tables_b
+    # The MRO walk in Ontology.closest_common_ancestor() pops one element
+    # from each MRO in turn.  An ancestor is found when it has been popped
+    # from both MROs, i.e. in round max(pa, pb) and from the second MRO if
+    # pb is at least pa.
+    rounds = np.maximum(pos_a[:, None, :], pos_b[None, :, :])
+    best = np.argmin(
+        2 * rounds + (pos_b[None, :, :] >= pos_a[:, None, :]), axis=2
+    )
+    cca_round = np.take_along_axis(rounds, best[..., None], axis=2)[..., 0]
+    generations = (
+        dist_a[np.arange(len(pos_a))[:, None], best]
+        + dist_b[np.arange(len(pos_b))[None, :], best]
+    )
+    denominator = generations + 2 * depth[best]
+    values = np.divide(
+        2.0 * depth[best],
+        denominator,
+        out=np.ones(denominator.shape),
+        where=denominator != 0,
+    )
+    # The walk changes order when an MRO is exhausted.  Leave these rare
+    # cases to the exact implementation.
+    return values, (cca_round >= np.minimum(len_a[:, None], len_b[None, :]) - 1)
+
+
+def _resnik_block(measure, tables_a, tables_b, ic):
+    """Returns Resnik or Lin similarities for a block.
+
+    `tables_a` and `tables_b` are `(ancestor mask, information content)`
+    tuples for the rows and columns, respectively, and `ic` the
+    information content of the ancestors.
+    """
+    mask_a, ic_a = tables_a
+    mask_b, ic_b = tables_b
+    common = mask_a[:, None, :] & mask_b[None, :, :]
+    resnik = np.max(np.where(common, ic, 0.0), axis=2, initial=0.0)
+    if measure == "resnik":
+        return resnik
+    denominator = ic_a[:, None] + ic_b[None, :]
+    return np.divide(
+        2 * resnik,
+        denominator,
+        out=np.ones(denominator.shape),
+        where=denominator != 0,
+    )
+
+
+def _walk_mros(a: int, b: int, hierarchy: "HierarchyIndex") -> "ThingClass":
+    """Returns the closest common ancestor of nodes `a` and `b` as found
+    by `Ontology.closest_common_ancestor()`."""
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from ontopy.ontology import Ontology
+
+    get = hierarchy.world._get_by_storid
+    return Ontology.closest_common_ancestor(
+        get(hierarchy.storids[a]), get(hierarchy.storids[b])
+    )
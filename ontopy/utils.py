@@ -12,7 +12,6 @@ import textwrap
 from pathlib import Path
 from sqlite3 import IntegrityError
 from typing import TYPE_CHECKING
-import urllib.request
 import urllib.parse
 import warnings
 import defusedxml.ElementTree as ET
@@ -30,6 +29,8 @@ from ontopy.exceptions import (
     UnknownVersion,
     IncompatibleVersion,
 )
+from ontopy.catalogindex import get_catalog_index
+from ontopy.httpcache import DownloadPool, parse_graph
 
 if TYPE_CHECKING:
     from typing import Optional, Union
@@ -46,6 +47,7 @@ FMAP = {
     "ttl": "turtle",
     "n3": "ntriples",
     "nt": "ntriples",
+    "nq": "nquads",
     "owl": "xml",
     "rdfxml": "xml",
 }
@@ -322,6 +324,8 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
     return_paths=False,
     visited_iris=None,
     visited_paths=None,
+    downloads=None,
+    read_files=None,
 ):
     """Reads a Protègè catalog file and returns as a dict.
 
@@ -348,8 +352,21 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
     If `return_paths` is true, a set of directory paths to source
     files is returned in addition to the default dict.
 
-    The `visited_uris` and `visited_paths` arguments are only intended for
-    internal use to avoid infinite recursions.
+    The `visited_uris`, `visited_paths`, `downloads` and `read_files`
+    arguments are only intended for internal use to avoid infinite
+    recursions, to share downloads and to record the catalog files that
+    are read.
+
+    Catalog files on the web are downloaded concurrently: all candidate
+    URLs for a catalog are requested at once and, when reading
+    recursively, the catalogs of all sub-folders are requested as soon
+    as their parent catalog has been read.  The catalogs are still read
+    in the same order as if they were downloaded one by one.
+
+    If the `ONTOPY_CACHE_DIR` environment variable is set, the result of
+    reading local catalog files is stored in a persistent index and
+    reused as long as the modification times of the catalog files are
+    unchanged.  See `ontopy.catalogindex`.
 
     A ReadCatalogError is raised if the catalog file cannot be found.
     """
@@ -363,43 +380,68 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
     if uri in iris:
         return (iris, dirs) if return_paths else iris
 
-    if uri.startswith(web_protocols):
-        # Call read_catalog() recursively to ensure that the temporary
-        # file is properly cleaned up
-        with tempfile.TemporaryDirectory() as tmpdir:
-            destfile = os.path.join(tmpdir, catalog_file)
-            uris = {  # maps uri to base
-                uri: (baseuri if baseuri else os.path.dirname(uri)),
-                f'{uri.rstrip("/")}/{catalog_file}': (
-                    baseuri if baseuri else uri.rstrip("/")
-                ),
-                f"{os.path.dirname(uri)}/{catalog_file}": (
-                    os.path.dirname(uri)
-                ),
-            }
-            for url, base in uris.items():
-                try:
-                    # The URL can only contain the schemes from `web_protocols`.
-                    _, msg = urllib.request.urlretrieve(url, destfile)  # nosec
-                except urllib.request.URLError:
-                    continue
-                else:
-                    if "Content-Length" not in msg:
-                        continue
+    if downloads is None:
+        index = None
+        if not (uri.startswith(web_protocols) or iris or dirs):
+            index = get_catalog_index()
+        if index:
+            key = index.key(
+                uri[7:] if uri.startswith("file://") else uri,
+                catalog_file=catalog_file,
+                baseuri=baseuri,
+                recursive=recursive,
+            )
+            cached = index.lookup(key)
+            if cached:
+                iris, dirs = cached
+                return _catalog_result(iris, dirs, relative_to, return_paths)
+
+        # Call read_catalog() recursively to ensure that the downloaded
+        # files are properly cleaned up
+        read_files = []
+        with DownloadPool(catalog_file) as pool:
+            iris, dirs = read_catalog(
+                uri,
+                catalog_file=catalog_file,
+                baseuri=baseuri,
+                recursive=recursive,
+                return_paths=True,
+                visited_iris=visited_iris,
+                visited_paths=visited_paths,
+                downloads=pool,
+                read_files=read_files,
+            )
+        if index and not any(f.startswith(web_protocols) for f in read_files):
+            try:
+                index.store(key, iris, dirs, read_files)
+            except OSError as exc:
+                warnings.warn(f"Cannot store catalog in index: {exc}")
+        return _catalog_result(iris, dirs, relative_to, return_paths)
 
-                    return read_catalog(
-                        destfile,
-                        catalog_file=catalog_file,
-                        baseuri=baseuri if baseuri else base,
-                        recursive=recursive,
-                        return_paths=return_paths,
-                        visited_iris=iris,
-                        visited_paths=dirs,
-                    )
-            raise ReadCatalogError(
-                "Cannot download catalog from URLs: " + ", ".join(uris)
+    if uri.startswith(web_protocols):
+        uris = _catalog_candidates(uri, catalog_file, baseuri)
+        for url in uris:
+            downloads.submit(url)
+        for url, base in uris.items():
+            result = downloads.result(url)
+            if result is None or "Content-Length" not in result[1]:
+                continue
+            if read_files is not None:
+                read_files.append(url)
+            return read_catalog(
+                result[0],
+                catalog_file=catalog_file,
+                baseuri=baseuri if baseuri else base,
+                recursive=recursive,
+                return_paths=return_paths,
+                visited_iris=iris,
+                visited_paths=dirs,
+                downloads=downloads,
             )
-    elif uri.startswith("file://"):
+        raise ReadCatalogError(
+            "Cannot download catalog from URLs: " + ", ".join(uris)
+        )
+    if uri.startswith("file://"):
         path = uri[7:]
     else:
         path = uri
@@ -418,6 +460,8 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
     def load_catalog(filepath):
         if not os.path.exists(filepath):
             raise ReadCatalogError("No such catalog file: " + filepath)
+        if read_files is not None:
+            read_files.append(filepath)
         dirname = os.path.normpath(os.path.dirname(filepath))
         dirs.add(baseuri if baseuri else dirname)
         xml = ET.parse(filepath)
@@ -427,26 +471,41 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
                 f"expected root tag of catalog file {filepath!r} to be "
                 '"catalog"'
             )
+        uris = []
         for child in root:
             if gettag(child) == "uri":
-                load_uri(child, dirname)
+                uris.append(child)
             elif gettag(child) == "group":
-                for uri in child:
-                    load_uri(uri, dirname)
+                uris.extend(child)
+        if recursive:
+            # Start downloading the catalogs of all sub-folders
+            for uri in uris:
+                if gettag(uri) != "uri":
+                    continue
+                directory = os.path.dirname(get_location(uri, dirname))
+                if (
+                    directory.startswith(web_protocols)
+                    and directory not in dirs
+                ):
+                    catalog = os.path.join(directory, catalog_file)
+                    for url in _catalog_candidates(catalog, catalog_file):
+                        downloads.submit(url)
+        for uri in uris:
+            load_uri(uri, dirname)
+
+    def get_location(uri, dirname):
+        uri_as_str = uri.attrib["uri"]
+        if uri_as_str.startswith(web_protocols):
+            return uri_as_str
+        uri_as_str = os.path.normpath(uri_as_str)
+        if baseuri and baseuri.startswith(web_protocols):
+            return f"{baseuri}/{uri_as_str}"
+        return os.path.join(baseuri if baseuri else dirname, uri_as_str)
 
     def load_uri(uri, dirname):
         if gettag(uri) != "uri":
             raise ValueError(f"{gettag(uri)!r} should be 'uri'.")
-        uri_as_str = uri.attrib["uri"]
-        if uri_as_str.startswith(web_protocols):
-            url = uri_as_str
-        else:
-            uri_as_str = os.path.normpath(uri_as_str)
-            if baseuri and baseuri.startswith(web_protocols):
-                url = f"{baseuri}/{uri_as_str}"
-            else:
-                url = os.path.join(baseuri if baseuri else dirname, uri_as_str)
-
+        url = get_location(uri, dirname)
         iris.setdefault(uri.attrib["name"], url)
         if recursive:
             directory = os.path.dirname(url)
@@ -461,6 +520,8 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
                         return_paths=True,
                         visited_iris=iris,
                         visited_paths=dirs,
+                        downloads=downloads,
+                        read_files=read_files,
                     )
                     iris.update(iris_)
                     dirs.update(dirs_)
@@ -468,16 +529,40 @@ def read_catalog(  # pylint: disable=too-many-locals,too-many-statements,too-man
                     load_catalog(catalog)
 
     load_catalog(filepath)
+    return _catalog_result(iris, dirs, relative_to, return_paths)
 
-    if relative_to:
-        for iri, path in iris.items():
-            iris[iri] = os.path.relpath(path, relative_to)
 
+def _catalog_result(iris, dirs, relative_to=None, return_paths=False):
+    """Help function for read_catalog().
+
+    Returns the result of read_catalog() for the given IRI mappings and
+    directories.
+    """
+    if relative_to:
+        iris = {
+            iri: os.path.relpath(path, relative_to)
+            for iri, path in iris.items()
+        }
     if return_paths:
         return iris, dirs
     return iris
 
 
+def _catalog_candidates(uri, catalog_file, baseuri=None):
+    """Help function for read_catalog().
+
+    Returns a dict mapping candidate URLs for the catalog at web
+    location `uri` to their base URI, in order of preference.
+    """
+    return {
+        uri: (baseuri if baseuri else os.path.dirname(uri)),
+        f'{uri.rstrip("/")}/{catalog_file}': (
+            baseuri if baseuri else uri.rstrip("/")
+        ),
+        f"{os.path.dirname(uri)}/{catalog_file}": (os.path.dirname(uri)),
+    }
+
+
 def write_catalog(
     irimap: dict,
     output: "Union[str, Path]" = "catalog-v001.xml",
@@ -659,7 +744,7 @@ def convert_imported(  # pylint: disable=too-many-arguments,too-many-locals
                     else guess_format(inpath, fmap=FMAP)
                 )
                 new_graph = Graph()
-                new_graph.parse(iris.get(inpath, inpath), format=fmt)
+                parse_graph(new_graph, iris.get(inpath, inpath), format=fmt)
                 new_graph.serialize(destination=outpath, format=output_format)
                 recur(new_graph, outext)
 
@@ -689,7 +774,7 @@ def convert_imported(  # pylint: disable=too-many-arguments,too-many-locals
 
     graph = Graph()
     try:
-        graph.parse(input_ontology, format=fmt)
+        parse_graph(graph, input_ontology, format=fmt)
     except PluginException as exc:  # Add input_ontology to exception msg
         raise PluginException(
             f'Cannot load "{input_ontology}": {exc.msg}'
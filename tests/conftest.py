@@ -57,3 +57,38 @@ def testonto() -> "Ontology":
     testonto = get_ontology(str(path) + "/testonto.ttl").load()
 
     return testonto
+
+
+@pytest.fixture
+def http_server():
+    """Returns a function that serves a directory on a local web server.
+
+    The function takes the directory as argument and returns a
+    `(baseurl, requests)` tuple, where `requests` is a list of
+    `(path, status)` tuples for all handled requests.
+    """
+    import functools
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    servers = []
+
+    def serve(directory):
+        requests = []
+
+        class Handler(SimpleHTTPRequestHandler):
+            """Request handler that records requests."""
+
+            def log_request(self, code="-", size="-"):
+                requests.append((self.path, int(code)))
+
+        handler = functools.partial(Handler, directory=str(directory))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}", requests
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -115,3 +115,43 @@ def test__has_unabbreviated_triple():
         animal, m + "Cat", skos + "prefLabel", "Cat", "@no"
     )
     assert not _has_unabbreviated_triple(animal, "no-match")
+
+
+def test_get_imported_ontologies():
+    """Test the cached recursive import closure."""
+    from ontopy import World
+
+    world = World()
+    top = world.get_ontology("http://example.com/top#")
+    left = world.get_ontology("http://example.com/left#")
+    right = world.get_ontology("http://example.com/right#")
+    base = world.get_ontology("http://example.com/base#")
+    top.imported_ontologies.extend([left, right])
+    left.imported_ontologies.append(base)
+    right.imported_ontologies.append(base)
+
+    # Diamond imports are only included once, in topological order.
+    # Compare by identity, since Ontology.__eq__() compares triples.
+    closure = top.get_imported_ontologies(recursive=True)
+    assert len(closure) == 3
+    assert {id(onto) for onto in closure} == {id(left), id(right), id(base)}
+    assert closure[-1] is base
+    assert top.get_imported_ontologies(recursive=True) is not closure
+
+    # The cache is invalidated when imports change
+    extra = world.get_ontology("http://example.com/extra#")
+    base.imported_ontologies.append(extra)
+    assert top.get_imported_ontologies(recursive=True)[-1] is extra
+    right.imported_ontologies.remove(base)
+    left.imported_ontologies.remove(base)
+    closure = top.get_imported_ontologies(recursive=True)
+    assert {id(onto) for onto in closure} == {id(left), id(right)}
+
+    # ...also in other worlds
+    other = get_ontology("http://example.com/other#")
+    right.imported_ontologies.append(other)
+    closure = top.get_imported_ontologies(recursive=True)
+    assert any(onto is other for onto in closure)
+    other.imported_ontologies.append(extra)
+    closure = top.get_imported_ontologies(recursive=True)
+    assert any(onto is extra for onto in closure)
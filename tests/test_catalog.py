@@ -140,3 +140,117 @@ def test_write_catalog_choosing_relative_paths(
     paths = [uri.attrib["uri"] for uri in catalog_w_http_paths_root[0]]
 
     assert set(catalog3.values()) == set(paths)
+
+
+def test_read_remote_catalog(http_server, tmp_path: "Path") -> None:
+    """Test reading nested catalogs from a web server."""
+    from pathlib import Path
+
+    # Create a catalog with one sub-directory per module, each with its
+    # own catalog and a sub-module in a sub-directory
+    modules = [f"module{i}" for i in range(5)]
+    write_catalog(
+        {f"http://example.com/onto/{m}": f"{m}/{m}.ttl" for m in modules},
+        directory=tmp_path,
+        relative_paths=False,
+    )
+    for module in modules:
+        (tmp_path / module / "sub").mkdir(parents=True)
+        write_catalog(
+            {
+                f"http://example.com/onto/{module}": f"{module}.ttl",
+                f"http://example.com/onto/{module}/sub": "sub/sub.ttl",
+            },
+            directory=tmp_path / module,
+            relative_paths=False,
+        )
+        write_catalog(
+            {f"http://example.com/onto/{module}/sub": "sub.ttl"},
+            directory=tmp_path / module / "sub",
+            relative_paths=False,
+        )
+
+    baseurl, requests = http_server(tmp_path)
+    iris, dirs = read_catalog(
+        f"{baseurl}/catalog-v001.xml", recursive=True, return_paths=True
+    )
+    assert iris == {
+        **{
+            f"http://example.com/onto/{m}": f"{baseurl}/{m}/{m}.ttl"
+            for m in modules
+        },
+        **{
+            f"http://example.com/onto/{m}/sub": f"{baseurl}/{m}/sub/sub.ttl"
+            for m in modules
+        },
+    }
+    assert dirs == {baseurl} | {
+        f"{baseurl}/{m}{sub}" for m in modules for sub in ("", "/sub")
+    }
+    assert ("/module4/sub/catalog-v001.xml", 200) in requests
+
+    # Same result as when reading the catalogs from the file system
+    local = read_catalog(tmp_path, recursive=True)
+    assert list(local) == list(iris)
+    assert {
+        iri: Path(loc).relative_to(tmp_path).as_posix()
+        for iri, loc in local.items()
+    } == {iri: loc[len(baseurl) + 1 :] for iri, loc in iris.items()}
+
+
+def test_catalog_index(tmp_path: "Path", monkeypatch) -> None:
+    """Test the persistent index of read catalogs."""
+    import os
+    import ontopy.utils
+    from ontopy.loadcache import CACHE_DIR_ENV
+
+    modules = [f"module{i}" for i in range(3)]
+    ontodir = tmp_path / "onto"
+    for module in modules:
+        (ontodir / module).mkdir(parents=True)
+    write_catalog(
+        {f"http://example.com/onto/{m}": f"{m}/{m}.ttl" for m in modules},
+        directory=ontodir,
+        relative_paths=False,
+    )
+    for module in modules:
+        write_catalog(
+            {f"http://example.com/onto/{module}": f"{module}.ttl"},
+            directory=ontodir / module,
+            relative_paths=False,
+        )
+
+    expected = read_catalog(ontodir, recursive=True, return_paths=True)
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    assert read_catalog(ontodir, recursive=True, return_paths=True) == (
+        expected
+    )
+    assert len(list((tmp_path / "cache" / "catalogs").glob("*.json"))) == 1
+
+    # The index is used without parsing the catalogs
+    with monkeypatch.context() as mpatch:
+        mpatch.setattr(ontopy.utils.ET, "parse", None)
+        assert read_catalog(ontodir, recursive=True, return_paths=True) == (
+            expected
+        )
+        assert read_catalog(ontodir, recursive=True, relative_to=ontodir) == {
+            f"http://example.com/onto/{m}": os.path.join(m, f"{m}.ttl")
+            for m in modules
+        }
+
+    # Changed catalogs are read again
+    catalog = ontodir / "module1" / "catalog-v001.xml"
+    write_catalog(
+        {
+            "http://example.com/onto/module1": "module1.ttl",
+            "http://example.com/onto/module1/extra": "extra.ttl",
+        },
+        directory=ontodir / "module1",
+        relative_paths=False,
+    )
+    stat = catalog.stat()
+    os.utime(catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    iris = read_catalog(ontodir, recursive=True)
+    assert iris["http://example.com/onto/module1/extra"] == str(
+        ontodir / "module1" / "extra.ttl"
+    )
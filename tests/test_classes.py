@@ -64,3 +64,54 @@ def test_classes() -> None:
         testonto.hasDataProperty
     }
     assert set(testonto.data_properties(imported=False)) == set()
+
+
+def test_get_entities_unique() -> None:
+    """Test that entities declared several times are only returned once."""
+    import ontopy
+    import owlready2
+
+    world = ontopy.World()
+    onto = world.get_ontology("http://domain_ontology/unique#")
+    other = world.get_ontology("http://domain_ontology/other#")
+    onto.imported_ontologies.append(other)
+    cls = onto.new_entity("Class", owlready2.Thing)
+    prop = onto.new_object_property("hasPart", owlready2.ObjectProperty)
+
+    # Declare the class once more in another ontology and pun the
+    # property as an annotation property
+    other._add_obj_triple_spo(
+        cls.storid, owlready2.rdf_type, owlready2.owl_class
+    )
+    onto._add_obj_triple_spo(
+        prop.storid, owlready2.rdf_type, owlready2.owl_annotation_property
+    )
+
+    assert list(onto.classes(imported=True)) == [cls]
+    assert list(onto.properties()) == [prop]
+    entities = list(onto.get_entities(imported=True))
+    assert len(entities) == len(set(entities))
+    assert {cls, prop}.issubset(entities)
+
+
+def test_get_entities_order() -> None:
+    """Test that entities are grouped by type."""
+    import ontopy
+    import owlready2
+
+    world = ontopy.World()
+    onto = world.get_ontology("http://domain_ontology/order#")
+    with onto:
+        prop = onto.new_object_property("hasPart", owlready2.ObjectProperty)
+        cls = onto.new_entity("Class", owlready2.Thing)
+        ind = cls("individual")
+        annot = onto.new_annotation_property(
+            "comment", owlready2.AnnotationProperty
+        )
+    # A class declared as rdfs:Class after all other entities
+    rdfs_class = world._abbreviate("http://www.w3.org/2000/01/rdf-schema#Class")
+    storid = world._abbreviate("http://domain_ontology/order#RDFSClass")
+    onto._add_obj_triple_spo(storid, owlready2.rdf_type, rdfs_class)
+    cls2 = world._get_by_storid(storid)
+
+    assert list(onto.get_entities()) == [cls, cls2, ind, prop, annot]
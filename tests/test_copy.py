@@ -38,3 +38,30 @@ def test_copy(testonto: "Ontology") -> None:
 def test_copy_emmo() -> None:
     """Test copying the emmo ontology is done in test_save.py as not to
     Import emmo more times than necessary"""
+
+
+def test_copy_attributes(testonto: "Ontology") -> None:
+    """Test that the copy is in a new world and keeps the attributes of
+    the ontology and its imported ontologies"""
+    testonto.iri = "http://emmo.info/testonto/0.2.0"
+    testonto.label_annotations.append("http://example.com/myLabel")
+    models = testonto.get_imported_ontologies()[0]
+    models.prefix = "mymodels"
+
+    testonto_copy = testonto.copy()
+    assert testonto_copy.world is not testonto.world
+    assert testonto_copy == testonto
+    assert testonto_copy.iri == testonto.iri
+    assert testonto_copy.label_annotations == testonto.label_annotations
+    assert testonto_copy.label_annotations is not testonto.label_annotations
+    assert testonto_copy._special_labels.keys() == (
+        testonto._special_labels.keys()
+    )
+    models_copy = testonto_copy.get_imported_ontologies()[0]
+    assert models_copy.prefix == "mymodels"
+
+    # Changes to imported ontologies are not shared
+    with models_copy:
+        models_copy.new_entity("CopyOnlyClass", models_copy.TestClass)
+    assert testonto_copy.CopyOnlyClass
+    assert not testonto.world[f"{models.base_iri}CopyOnlyClass"]
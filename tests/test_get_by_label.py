@@ -1,3 +1,5 @@
+import types
+
 import pytest
 
 
@@ -123,3 +125,166 @@ def test_get_by_label_emmo(emmo: "Ontology") -> None:
         onto.get_by_label("Element:X")
 
     assert onto.get_by_label("Element:X", colon_in_label=True) == onto.Atom
+
+
+def test_get_by_label_index() -> None:
+    """Test that the label index follows changes to the ontology."""
+    from ontopy import get_ontology
+    from ontopy.ontology import NoSuchLabelError
+    import owlready2
+
+    onto = get_ontology("http://domain_ontology/index_ontology#")
+    preflabel = onto.new_annotation_property(
+        "prefLabel", parent=[owlready2.AnnotationProperty]
+    )
+    preflabel.iri = "http://www.w3.org/2004/02/skos/core#prefLabel"
+    cls = onto.new_entity("Cls", owlready2.Thing, preflabel="Alpha")
+    assert onto.get_by_label("Alpha") == cls
+    assert "Alpha" in onto
+
+    # Replacing a label updates the index
+    cls.prefLabel = ["Beta"]
+    assert onto.get_by_label("Beta") == cls
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("Alpha")
+    assert "Alpha" not in onto
+
+    # Appending and removing labels
+    cls.prefLabel.append("Gamma")
+    assert onto.get_by_label_all("Gamma", exact_match=True) == {cls}
+    cls.prefLabel.remove("Gamma")
+    assert onto.get_by_label_all("Gamma", exact_match=True) == set()
+
+    # Labels of entities in other ontologies are not found with
+    # imported=False
+    other = onto.world.get_ontology("http://domain_ontology/other#")
+    with other:
+        other_cls = types.new_class("OtherCls", (owlready2.Thing,))
+    other_cls.prefLabel = ["Delta"]
+    assert onto.get_by_label("Delta") == other_cls
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("Delta", imported=False)
+
+    # Destroyed entities are removed from the index
+    owlready2.destroy_entity(other_cls)
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("Delta")
+
+
+def test_get_by_label_name_index() -> None:
+    """Test lookup of entities by the name-part of their IRI."""
+    from ontopy import get_ontology
+    from ontopy.ontology import NoSuchLabelError
+    import owlready2
+
+    onto = get_ontology("http://domain_ontology/names#")
+    cls = onto.new_entity("SomeClass", owlready2.Thing, preflabel=False)
+    assert onto.get_by_label("SomeClass") == cls
+    assert onto.get_by_label_all("SomeClass", exact_match=True) == {cls}
+    assert onto.get_by_label_all("Some*") == {cls}
+
+    # Failed lookups are cached, but the cache is cleared on changes
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("OtherClass")
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("OtherClass")
+    other = onto.new_entity("OtherClass", owlready2.Thing, preflabel=False)
+    assert onto.get_by_label("OtherClass") == other
+
+    # Renaming updates the name index
+    other.name = "RenamedClass"
+    assert onto.get_by_label("RenamedClass") == other
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("OtherClass")
+
+    # Entities are found in imported ontologies from other worlds
+    imported = get_ontology("http://domain_ontology/imported#")
+    imp = imported.new_entity("ImportedClass", owlready2.Thing)
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("ImportedClass")
+    onto.imported_ontologies.append(imported)
+    assert onto.get_by_label("ImportedClass") == imp
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_label("ImportedClass", imported=False)
+
+
+def test_get_by_label_all_glob() -> None:
+    """Test glob matching of labels and names in get_by_label_all()."""
+    from ontopy import get_ontology
+    import owlready2
+
+    onto = get_ontology("http://domain_ontology/glob#")
+    preflabel = onto.new_annotation_property(
+        "prefLabel", parent=[owlready2.AnnotationProperty]
+    )
+    preflabel.iri = "http://www.w3.org/2004/02/skos/core#prefLabel"
+    atom = onto.new_entity("Atom", owlready2.Thing, preflabel=False)
+    nucleus = onto.new_entity("AtomNucleus", owlready2.Thing, preflabel=False)
+    hydrogen = onto.new_entity("HydrogenAtom", owlready2.Thing, preflabel=False)
+    electron = onto.new_entity("Electron", owlready2.Thing, preflabel=False)
+    anon = onto.new_entity("EMMO_1234", owlready2.Thing, preflabel="Molecule")
+
+    assert onto.get_by_label_all("Atom*") == {atom, nucleus}
+    assert onto.get_by_label_all("*Atom") == {atom, hydrogen}
+    assert onto.get_by_label_all("*tom*") == {atom, nucleus, hydrogen}
+    assert onto.get_by_label_all("*ec*") == {electron, anon}
+    assert onto.get_by_label_all("EMMO_*") == {anon}
+    assert onto.get_by_label_all("[AE]*") == {
+        atom,
+        nucleus,
+        electron,
+        anon,
+    }
+    assert onto.get_by_label_all("*") >= {atom, electron, anon}
+    assert onto.get_by_label_all("Molecul?") == set()
+
+    # The glob indexes are kept up to date
+    ion = onto.new_entity("AtomIon", owlready2.Thing, preflabel=False)
+    assert onto.get_by_label_all("Atom*") == {atom, nucleus, ion}
+    nucleus.name = "Nucleus"
+    assert onto.get_by_label_all("Atom*") == {atom, ion}
+    assert onto.get_by_label_all("*cleus") == {nucleus}
+
+
+def test_get_by_labels() -> None:
+    """Test batch lookup of labels with get_by_labels()."""
+    from ontopy import get_ontology
+    from ontopy.ontology import AmbiguousLabelError, NoSuchLabelError
+    import owlready2
+
+    onto = get_ontology("http://domain_ontology/batch#")
+    onto.prefix = "batch"
+    preflabel = onto.new_annotation_property(
+        "prefLabel", parent=[owlready2.AnnotationProperty]
+    )
+    preflabel.iri = "http://www.w3.org/2004/02/skos/core#prefLabel"
+    atom = onto.new_entity("Atom", owlready2.Thing)
+    anon = onto.new_entity("EMMO_1234", owlready2.Thing, preflabel="Molecule")
+    first = onto.new_entity("First", owlready2.Thing, preflabel="Twin")
+    second = onto.new_entity("Second", owlready2.Thing, preflabel="Twin")
+
+    labels = ["Atom", "Molecule", "EMMO_1234", atom.iri, "batch:Atom", "Twin"]
+    entities, missing, ambiguous = onto.get_by_labels(labels)
+    assert entities == {label: onto.get_by_label(label) for label in labels}
+    assert entities["Molecule"] == anon
+    assert not missing
+    assert ambiguous == {"Twin": {first, second}}
+
+    with pytest.raises(NoSuchLabelError):
+        onto.get_by_labels(["Atom", "Unknown"])
+    with pytest.warns(UserWarning):
+        entities, missing, _ = onto.get_by_labels(
+            ["Atom", "Unknown"], on_missing="warn"
+        )
+    assert entities == {"Atom": atom}
+    assert missing == ["Unknown"]
+
+    # Ambiguous labels within a prefix are not resolved
+    with pytest.raises(AmbiguousLabelError):
+        onto.get_by_labels(["batch:Twin"])
+    entities, missing, ambiguous = onto.get_by_labels(
+        ["batch:Twin", "other:Atom"], on_missing="ignore"
+    )
+    assert entities == {}
+    assert missing == ["other:Atom"]
+    assert ambiguous == {"batch:Twin": {first, second}}
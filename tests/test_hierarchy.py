@@ -0,0 +1,152 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_hierarchy(repo_dir: "Path") -> None:
+    """Test the hierarchy index."""
+    import types
+
+    import owlready2
+    from ontopy import get_ontology
+
+    onto = get_ontology(
+        repo_dir / "tests" / "testonto" / "testontology.ttl"
+    ).load()
+    hierarchy = onto.hierarchy
+
+    assert hierarchy.ancestors(onto.Avocado) == onto.Avocado.ancestors()
+    assert hierarchy.ancestors(onto.Avocado, include_self=False) == {
+        onto.EvergreenTree,
+        onto.Tree,
+        onto.NaturalDye,
+        owlready2.Thing,
+    }
+    assert hierarchy.descendants(onto.Tree) == onto.Tree.descendants()
+    assert hierarchy.parents(onto.Avocado) == {
+        onto.EvergreenTree,
+        onto.NaturalDye,
+    }
+    assert hierarchy.children(onto.Spruce) == {
+        onto.NorwaySpruce,
+        onto.EngelmannSpruce,
+    }
+    assert hierarchy.issubclass(onto.NorwaySpruce, onto.Tree)
+    assert not hierarchy.issubclass(onto.Tree, onto.NorwaySpruce)
+    assert hierarchy.is_root(onto.Tree)
+    assert not hierarchy.is_root(onto.Spruce)
+    assert set(onto.get_root_classes()) == {onto.Tree, onto.NaturalDye}
+
+    # Strict parents exclude parents that are ancestors of other parents
+    onto.NorwaySpruce.is_a.append(onto.Tree)
+    assert onto.NorwaySpruce.get_parents(strict=True) == {onto.Spruce}
+    assert onto.hierarchy.parents(onto.NorwaySpruce) == {
+        onto.Spruce,
+        onto.Tree,
+    }
+
+    # The index follows changes to the hierarchy
+    with onto:
+        pine = types.new_class("Pine", (onto.EvergreenTree,))
+    assert pine in onto.hierarchy.descendants(onto.Tree)
+    onto.Spruce.is_a.append(onto.NaturalDye)
+    assert onto.hierarchy.issubclass(onto.NorwaySpruce, onto.NaturalDye)
+    assert onto.get_descendants(onto.NaturalDye) == {
+        onto.Avocado,
+        onto.ShingledHedgehogMushroom,
+        onto.Spruce,
+        onto.NorwaySpruce,
+        onto.EngelmannSpruce,
+    }
+
+    # Equivalent classes share their ancestors
+    with onto:
+        conifer = types.new_class("Conifer", (owlready2.Thing,))
+    conifer.equivalent_to.append(onto.EvergreenTree)
+    assert onto.Tree in onto.hierarchy.ancestors(conifer)
+    assert onto.hierarchy.ancestors(conifer) == conifer.ancestors()
+    assert onto.hierarchy.descendants(conifer) == conifer.descendants()
+
+
+def test_distances(repo_dir: "Path") -> None:
+    """Test number_of_generations() and closest_common_ancestors()."""
+    import pytest
+    import owlready2
+    from ontopy import get_ontology
+
+    onto = get_ontology(
+        repo_dir / "tests" / "testonto" / "testontology.ttl"
+    ).load()
+
+    assert onto.number_of_generations(onto.NorwaySpruce, onto.Tree) == 3
+    assert onto.number_of_generations(onto.Avocado, owlready2.Thing) == 2
+    assert onto.hierarchy.depth(onto.NorwaySpruce) == 4
+    with pytest.raises(ValueError):
+        onto.number_of_generations(onto.Tree, onto.NorwaySpruce)
+
+    assert onto.closest_common_ancestors(onto.NorwaySpruce, onto.Avocado) == [
+        onto.EvergreenTree
+    ]
+    assert set(
+        onto.closest_common_ancestors(
+            onto.Avocado, onto.ShingledHedgehogMushroom
+        )
+    ) == {onto.NaturalDye}
+
+    assert (
+        onto.closest_common_ancestor(onto.NorwaySpruce, onto.Avocado)
+        == onto.EvergreenTree
+    )
+    assert (
+        onto.closest_common_ancestor(
+            onto.NorwaySpruce, onto.EngelmannSpruce, onto.Avocado
+        )
+        == onto.EvergreenTree
+    )
+    assert onto.closest_common_ancestor(onto.Spruce) == onto.Spruce
+    assert onto.get_ancestors(
+        [onto.NorwaySpruce, onto.Avocado], closest=True
+    ) == {onto.Spruce, onto.EvergreenTree}
+
+    # A shortcut in the hierarchy shortens the distance
+    assert onto.number_of_generations(onto.EngelmannSpruce, onto.Tree) == 3
+    onto.EngelmannSpruce.is_a.append(onto.Tree)
+    assert onto.number_of_generations(onto.EngelmannSpruce, onto.Tree) == 1
+
+
+def test_similarity_matrix(repo_dir: "Path") -> None:
+    """Test similarity_matrix()."""
+    import pytest
+    from ontopy import get_ontology
+
+    onto = get_ontology(
+        repo_dir / "tests" / "testonto" / "testontology.ttl"
+    ).load()
+    classes = [
+        onto.Tree,
+        onto.Spruce,
+        onto.NorwaySpruce,
+        onto.EngelmannSpruce,
+        onto.Avocado,
+        onto.NaturalDye,
+        onto.ShingledHedgehogMushroom,
+    ]
+
+    matrix = onto.similarity_matrix(classes)
+    for i, cls1 in enumerate(classes):
+        for j, cls2 in enumerate(classes):
+            assert matrix[i][j] == pytest.approx(
+                onto.get_wu_palmer_measure(cls1, cls2)
+            )
+
+    matrix = onto.similarity_matrix(classes[:2], classes, measure="lin")
+    assert matrix.shape == (2, len(classes))
+    assert matrix[0][0] == pytest.approx(1.0)
+    assert matrix[1][2] < 1.0
+    resnik = onto.similarity_matrix(classes, measure="resnik")
+    assert resnik[2][3] == pytest.approx(resnik[1][1])
+    assert resnik[0][5] == pytest.approx(0.0)
+
+    with pytest.raises(ValueError):
+        onto.similarity_matrix(classes, measure="unknown")
@@ -0,0 +1,74 @@
+"""Test the HTTP cache against a local web server."""
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_httpcache(http_server, repo_dir: "Path", tmp_path: "Path") -> None:
+    """Test fetching, revalidation and offline mode."""
+    from urllib.error import HTTPError, URLError
+    from ontopy.httpcache import HTTPCache
+
+    baseurl, requests = http_server(repo_dir / "tests" / "testonto")
+    url = f"{baseurl}/mammal.ttl"
+
+    cache = HTTPCache(tmp_path)
+    path = cache.fetch(url)
+    assert b"mammal" in path.read_bytes()
+    assert cache.fetch(url) == path
+    assert requests == [("/mammal.ttl", 200)]
+
+    # Revalidation of unchanged content
+    cache.ttl = 0
+    assert cache.fetch(url) == path
+    assert requests[-1] == ("/mammal.ttl", 304)
+
+    # Header names are case-insensitive
+    entry = cache.lookup(url)
+    entry["headers"] = {k.lower(): v for k, v in entry["headers"].items()}
+    cache._write_entry(entry)
+    assert cache.fetch(url) == path
+    assert requests[-1] == ("/mammal.ttl", 304)
+
+    with pytest.raises(HTTPError):
+        cache.fetch(f"{baseurl}/nonexisting.ttl")
+
+    offline = HTTPCache(tmp_path, ttl=0, offline=True)
+    requests.clear()
+    assert offline.fetch(url) == path
+    with pytest.raises(URLError):
+        offline.fetch(f"{baseurl}/animal.ttl")
+    assert not requests
+
+    assert [entry["url"] for entry in cache.entries()] == [url]
+    assert cache.remove(url)
+    assert cache.prune() == 0
+    assert not list(tmp_path.glob("objects/*"))
+
+
+def test_load_httpcache(
+    http_server, repo_dir: "Path", tmp_path: "Path", monkeypatch
+) -> None:
+    """Test loading an ontology and its imports over the web via the
+    cache and then again offline."""
+    from ontopy import get_ontology
+    from ontopy.httpcache import HTTP_CACHE_DIR_ENV, OFFLINE_ENV
+
+    baseurl, requests = http_server(repo_dir / "tests" / "testonto")
+    monkeypatch.setenv(HTTP_CACHE_DIR_ENV, str(tmp_path))
+
+    onto = get_ontology(f"{baseurl}/testonto.ttl").load()
+    assert onto.imported_ontologies
+    assert ("/models.ttl", 200) in requests
+
+    requests.clear()
+    monkeypatch.setenv(OFFLINE_ENV, "1")
+    offline = get_ontology(f"{baseurl}/testonto.ttl").load()
+    assert not requests
+    assert set(map(str, offline.classes(imported=True))) == set(
+        map(str, onto.classes(imported=True))
+    )
@@ -52,3 +52,203 @@ def test_load() -> None:
         "datamodel-ontology/master/datamodel.ttl"
     ).load()
     assert onto.DataModel
+
+
+def test_load_cache(repo_dir: "Path", tmp_path: "Path", monkeypatch) -> None:
+    """Test loading ontologies from the persistent cache."""
+    import shutil
+
+    import pytest
+    from ontopy import get_ontology
+    from ontopy.ontology import Ontology
+
+    ontodir = tmp_path / "testonto"
+    shutil.copytree(repo_dir / "tests" / "testonto", ontodir)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("ONTOPY_CACHE_DIR", str(cache_dir))
+
+    mammal = get_ontology(ontodir / "mammal.ttl").load()
+    assert len(list(cache_dir.glob("*.sqlite3"))) == 1
+    classes = set(mammal.get_entities(imported=True))
+    imported = [onto.base_iri for onto in mammal.imported_ontologies]
+
+    # Loading again should use the cache instead of parsing
+    def fail(*args, **kwargs):
+        pytest.fail("ontology was parsed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Ontology, "_load", fail)
+        cached = get_ontology(ontodir / "mammal.ttl").load()
+    assert {entity.iri for entity in cached.get_entities(imported=True)} == {
+        entity.iri for entity in classes
+    }
+    assert [onto.base_iri for onto in cached.imported_ontologies] == imported
+    assert cached.loaded and all(
+        onto.loaded for onto in cached.get_imported_ontologies(recursive=True)
+    )
+    assert cached.world._iri_mappings == mammal.world._iri_mappings
+
+    # The cached ontology can be modified
+    with cached:
+        new = cached.new_entity("NewAnimal", cached.Animal)
+    assert cached.get_by_label("NewAnimal") is new
+
+    # Changing a source invalidates the cache
+    with open(ontodir / "animal.ttl", "at", encoding="utf8") as handle:
+        handle.write("\n# changed\n")
+    parsed = []
+    original = Ontology._load
+
+    def record(self, **kwargs):
+        parsed.append(self.base_iri)
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(Ontology, "_load", record)
+    reloaded = get_ontology(ontodir / "mammal.ttl").load()
+    assert parsed
+    assert "NewAnimal" not in reloaded
+
+
+def test_load_rdflib_formats(tmp_path: "Path") -> None:
+    """Test loading formats that are parsed with rdflib."""
+    import rdflib
+    from ontopy import get_ontology
+
+    turtle = """\
+@prefix : <http://example.com/onto#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+<http://example.com/onto> a owl:Ontology .
+
+:hasPart a owl:ObjectProperty .
+:count a owl:AnnotationProperty .
+
+:Part a owl:Class .
+:Whole a owl:Class ;
+    rdfs:label "Whole"@en, "Helhet"@nb ;
+    :count 3 ;
+    rdfs:comment "A whole." ;
+    rdfs:subClassOf [
+        a owl:Restriction ;
+        owl:onProperty :hasPart ;
+        owl:someValuesFrom :Part
+    ] .
+"""
+    ttlfile = tmp_path / "onto.ttl"
+    ttlfile.write_text(turtle, encoding="utf8")
+    jsonfile = tmp_path / "onto.jsonld"
+    rdflib.Graph().parse(ttlfile).serialize(jsonfile, format="json-ld")
+
+    for path, fmt in (ttlfile, None), (jsonfile, "json-ld"):
+        onto = get_ontology(path).load(format=fmt, emmo_based=False)
+        assert onto.base_iri == "http://example.com/onto#"
+        whole = onto.Whole
+        assert set(map(str, whole.label)) == {"Whole", "Helhet"}
+        assert {label.lang for label in whole.label} == {"en", "nb"}
+        assert whole.count == [3]
+        assert whole.comment == ["A whole."]
+        assert onto.hasPart.some(onto.Part) in whole.is_a
+
+
+def test_load_parallel(repo_dir: "Path") -> None:
+    """Test parsing the imported ontologies in parallel."""
+    from ontopy import get_ontology
+
+    path = repo_dir / "tests" / "testonto" / "testonto.ttl"
+    onto = get_ontology(path).load()
+    parallel = get_ontology(path).load(parallel=2)
+
+    assert parallel.world._parallel_parser is None
+    assert len(parallel.imported_ontologies) == len(onto.imported_ontologies)
+    assert set(map(str, parallel.classes(imported=True))) == set(
+        map(str, onto.classes(imported=True))
+    )
+    assert len(list(parallel.world.get_triples())) == len(
+        list(onto.world.get_triples())
+    )
+
+
+def test_load_lazy_imports(repo_dir: "Path") -> None:
+    """Test deferring loading of imported ontologies."""
+    from ontopy import get_ontology
+
+    path = repo_dir / "tests" / "testonto" / "emmo" / "emmo.ttl"
+    onto = get_ontology(path).load()
+    lazy = get_ontology(path).load(lazy_imports=True)
+    world = lazy.world
+
+    assert len(world._lazy_imports) == 1
+    assert not any(o.loaded for o in lazy.imported_ontologies)
+
+    # Entities in imported ontologies are loaded on demand
+    assert lazy.get_by_label("Numerical").iri == onto.Numerical.iri
+    assert all(o.loaded for o in lazy.imported_ontologies)
+    assert world._lazy_imports
+
+    lazy.load_imports()
+    assert not world._lazy_imports
+    assert set(map(str, lazy.classes(imported=True))) == set(
+        map(str, onto.classes(imported=True))
+    )
+
+
+def test_load_streaming(tmp_path: "Path") -> None:
+    """Test streaming N-Triples and N-Quads files into a file-backed
+    world."""
+    from rdflib import BNode, Literal, URIRef, RDFS
+    from ontopy import World
+    from ontopy.quadstore import stream_into
+
+    ex = "http://example.com/data"
+    rdfs = "http://www.w3.org/2000/01/rdf-schema#"
+    xsd = "http://www.w3.org/2001/XMLSchema#"
+    lines = [
+        "# A comment",
+        f"<{ex}> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> "
+        "<http://www.w3.org/2002/07/owl#Ontology> .",
+        "",
+        f'<{ex}#a> <{rdfs}label> "A \\"quoted\\"\\nlabel"@en-GB .',
+        f'<{ex}#a> <{ex}#n> "42"^^<{xsd}int> .',
+        f'<{ex}#a> <{ex}#s> "plain" .',
+        f"<{ex}#a> <{ex}#b> _:b1 .",
+        f'_:b1 <{ex}#s> "x"@en.',
+    ]
+    lines.extend(
+        f"<{ex}#i{i}> <{ex}#next> <{ex}#i{i + 1}> ." for i in range(25)
+    )
+    text = "\n".join(lines) + "\n"
+    (tmp_path / "data.nt").write_text(text, encoding="utf8")
+    (tmp_path / "data.nq").write_text(
+        "\n".join(line.replace(" .", f" <{ex}#graph> .") for line in lines),
+        encoding="utf8",
+    )
+
+    for name in "data.nt", "data.nq":
+        world = World(filename=tmp_path / f"{name}.sqlite3")
+        onto = world.get_ontology(tmp_path / name).load()
+        assert onto.base_iri == f"{ex}#"
+        graph = world.as_rdflib_graph()
+        assert len(graph) == 32
+        assert graph.value(URIRef(f"{ex}#a"), RDFS.label) == Literal(
+            'A "quoted"\nlabel', lang="en-GB"
+        )
+        assert graph.value(URIRef(f"{ex}#a"), URIRef(f"{ex}#n")).value == 42
+        blank = graph.value(URIRef(f"{ex}#a"), URIRef(f"{ex}#b"))
+        assert isinstance(blank, BNode)
+        assert graph.value(blank, URIRef(f"{ex}#s")) == Literal("x", lang="en")
+
+    # Batches are committed and reported while streaming
+    world = World(filename=tmp_path / "stream.sqlite3")
+    onto = world.get_ontology(f"{ex}#")
+    counts = []
+    stream_into(
+        onto.graph,
+        str(tmp_path / "data.nt"),
+        batchsize=10,
+        cachesize=5,
+        progress=lambda count, rate: counts.append(count),
+    )
+    assert counts == [10, 20, 30, 31]
+    assert not world.graph.db.in_transaction
@@ -0,0 +1,121 @@
+"""Test planning of loading an ontology and its imports."""
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_plan_load(repo_dir: "Path") -> None:
+    """Test that the plan covers the same ontologies as loading."""
+    from ontopy import get_ontology, plan_load
+
+    path = repo_dir / "tests" / "testonto" / "emmo" / "emmo.ttl"
+    plan = plan_load(path)
+    plan.check()
+    assert not plan.remote
+    assert all(e.format == "turtle" and e.size for e in plan.entries.values())
+
+    onto = get_ontology(str(path)).load()
+    ontologies = [onto] + onto.get_imported_ontologies(recursive=True)
+    assert {e.ontology_iri for e in plan.entries.values()} == {
+        o.base_iri.rstrip("/#") for o in ontologies
+    }
+
+    # Imported ontologies come before the ontologies importing them
+    order = [e.iri for e in plan.order()]
+    assert order[-1] == str(path)
+    for importer, imported in plan.edges():
+        assert order.index(imported) < order.index(importer)
+    levels = plan.levels()
+    assert sum(len(level) for level in levels) == len(plan.entries)
+    assert levels[-1] == [plan.entries[str(path)]]
+
+    # Cyclic imports
+    plan = plan_load(repo_dir / "tests" / "testonto" / "testonto-recursive.ttl")
+    assert len(plan.levels()) == 1
+    assert len(plan.order()) == 3
+
+
+@pytest.mark.parametrize("chunksize", [None, 7])
+def test_plan_load_missing(tmp_path: "Path", monkeypatch, chunksize) -> None:
+    """Test RDF/XML headers and missing imports.  With a small chunk
+    size, the scan for later imports crosses chunk boundaries."""
+    from ontopy import loadplan, plan_load
+    from ontopy.exceptions import MissingImportError
+
+    if chunksize:
+        monkeypatch.setattr(loadplan, "_CHUNKSIZE", chunksize)
+
+    (tmp_path / "onto.owl").write_text(
+        """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xml:base="http://example.com/onto">
+  <owl:Ontology rdf:about="">
+    <owl:imports rdf:resource="sub"/>
+  </owl:Ontology>
+  <owl:Class rdf:about="#A"/>
+  <rdf:Description rdf:about="http://example.com/onto">
+    <owl:imports rdf:resource="file:///nonexisting/missing.ttl"/>
+  </rdf:Description>
+</rdf:RDF>
+""",
+        encoding="utf8",
+    )
+    (tmp_path / "sub.ttl").write_text(
+        "@prefix owl: <http://www.w3.org/2002/07/owl#> .\n"
+        '# Comment with <http://example.com/x> and "quotes"\n'
+        "<http://example.com/sub> a owl:Ontology ;\n"
+        '    owl:versionInfo """multi-line\n . string""" .\n'
+        "<http://example.com/sub#A> a owl:Class .\n"
+        "<http://example.com/sub> owl:imports <file:///nonexisting/late.ttl> .\n",
+        encoding="utf8",
+    )
+    (tmp_path / "catalog-v001.xml").write_text(
+        """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<catalog prefer="public" xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
+    <uri name="http://example.com/sub" uri="sub.ttl"/>
+</catalog>
+""",
+        encoding="utf8",
+    )
+
+    plan = plan_load(tmp_path / "onto.owl")
+    root = plan.entries[str(tmp_path / "onto.owl")]
+    assert root.format == "xml"
+    assert root.ontology_iri == "http://example.com/onto"
+    assert root.imports == [
+        "http://example.com/sub",
+        "file:///nonexisting/missing.ttl",
+    ]
+    sub = plan.entries["http://example.com/sub"]
+    assert sub.location == str(tmp_path / "sub.ttl")
+    assert sub.ontology_iri == "http://example.com/sub"
+    assert sub.imports == ["file:///nonexisting/late.ttl"]
+    assert sorted(e.location for e in plan.missing) == [
+        "/nonexisting/late.ttl",
+        "/nonexisting/missing.ttl",
+    ]
+    with pytest.raises(MissingImportError):
+        plan.check()
+
+
+def test_plan_load_remote(http_server, repo_dir: "Path", monkeypatch) -> None:
+    """Test planning of loading remote ontologies."""
+    import owlready2
+    from ontopy import plan_load
+
+    # Local directories added to onto_path by other tests would shadow
+    # the web server
+    monkeypatch.setattr(owlready2.namespace, "onto_path", [])
+    baseurl, requests = http_server(repo_dir / "tests" / "testonto")
+    plan = plan_load(f"{baseurl}/testonto.ttl")
+    assert [e.status for e in plan.entries.values()] == ["remote"]
+    assert not requests
+
+    plan = plan_load(f"{baseurl}/testonto.ttl", fetch=True)
+    assert len(plan.entries) == 2
+    assert all(e.size for e in plan.entries.values())
@@ -0,0 +1,33 @@
+"""Test profiling of Ontology.load()."""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_loadreport(repo_dir: "Path") -> None:
+    """Test recording a load report."""
+    from ontopy import get_ontology
+    from ontopy.loadreport import LoadReport
+
+    path = repo_dir / "tests" / "testonto" / "testonto.ttl"
+    report = LoadReport(memory=True)
+    onto = get_ontology(path).load(report=report)
+
+    assert onto.world._load_report is None
+    assert [m.iri for m in report.modules] == [
+        "http://emmo.info/testonto#",
+        "http://emmo.info/models#",
+    ]
+    top, models = report.modules
+    assert top.depth == 0 and models.depth == 1
+    assert top.location == str(path)
+    assert models.location.endswith("models.ttl")
+    assert "rdflib" in top.phases and "catalog" in top.phases
+    assert top.time >= top.self_time + models.time * 0.99
+    assert report.time == top.time
+    assert report.peak_memory > 0
+    assert report.slowest(1)[0] in report.modules
+    assert set(report.asdict()["phases"]) == set(report.phase_totals())
+    assert "http://emmo.info/models#" in str(report)
@@ -265,3 +265,217 @@ def test_save_emmo_domain_ontology() -> None:
     )
     for fname in ("isq.rdfxml", "catalog-v001.xml"):
         assert fname in created_files
+
+
+def test_save_streaming(tmp_path: "Path") -> None:
+    """Test that Turtle and N-Triples are streamed from the quadstore."""
+    import owlready2
+    import rdflib
+    from ontopy import World
+
+    onto = World().get_ontology("http://example.com/onto#")
+    A = onto.new_entity("A", owlready2.Thing)
+    B = onto.new_entity("B", owlready2.Thing)
+    C = onto.new_entity("C", owlready2.Thing)
+    hasPart = onto.new_object_property("hasPart", owlready2.ObjectProperty)
+
+    A.comment.append('A "quoted"\nmulti-line comment')
+    A.is_a.append(hasPart.some(B))
+    A.equivalent_to.append(B | C)
+    onto.iri = "http://example.com/onto/1.0"
+
+    path = onto.save(tmp_path / "onto.ttl")
+    text = path.read_text(encoding="utf8")
+    assert "<http://example.com/onto/1.0> a owl:Ontology" in text
+    assert "owl:unionOf ( :B :C )" in text
+    assert "owl:someValuesFrom :B" in text
+
+    graph = rdflib.Graph().parse(path, format="turtle")
+    assert len(graph) == len(list(onto.get_unabbreviated_triples()))
+    assert (
+        rdflib.URIRef(onto.iri),
+        rdflib.RDF.type,
+        rdflib.OWL.Ontology,
+    ) in graph
+
+    loaded = World().get_ontology(str(path)).load()
+    assert set(loaded.get_unabbreviated_triples(blank="_:b")) == {
+        tuple(onto.iri if x == "http://example.com/onto" else x for x in t)
+        for t in onto.get_unabbreviated_triples(blank="_:b")
+    }
+
+    path = onto.save(tmp_path / "onto.nt")
+    ntgraph = rdflib.Graph().parse(path, format="ntriples")
+    assert ntgraph.isomorphic(graph)
+
+
+def test_save_squash_closure(repo_dir: "Path", tmp_path: "Path") -> None:
+    """Test that squashing only writes the import closure."""
+    import rdflib
+    from ontopy import World
+
+    world = World()
+    testonto = world.get_ontology(
+        repo_dir / "tests" / "testonto" / "testonto.ttl"
+    ).load()
+    other = world.get_ontology(
+        repo_dir / "tests" / "testonto" / "mammal.ttl"
+    ).load()
+    testonto.iri = "http://emmo.info/testonto/0.2.0"
+
+    for name, format in ("squashed.ttl", "turtle"), ("squashed.owl", "xml"):
+        path = testonto.save(tmp_path / name, squash=True)
+        graph = rdflib.Graph().parse(path, format=format)
+        ontologies = set(graph.subjects(rdflib.RDF.type, rdflib.OWL.Ontology))
+        assert ontologies == {rdflib.URIRef(testonto.iri)}
+        assert not set(graph.triples((None, rdflib.OWL.imports, None)))
+        subjects = set(map(str, graph.subjects()))
+        assert "https://schema.org/Organization" in subjects  # imported
+        assert not any(
+            str(s).startswith(other.base_iri) for s in graph.subjects()
+        )
+
+
+def test_save_recursive_workers(repo_dir: "Path", tmp_path: "Path") -> None:
+    """Test that saving recursively in worker processes gives the same
+    files as saving serially."""
+    from ontopy import get_ontology
+
+    emmo = get_ontology(
+        repo_dir / "tests" / "testonto" / "emmo" / "emmo.ttl"
+    ).load()
+    for workers in None, 2:
+        emmo.save(
+            format="turtle",
+            dir=tmp_path / str(workers),
+            recursive=True,
+            mkdir=True,
+            write_catalog_file=True,
+            workers=workers,
+        )
+    serial = sorted(
+        p.relative_to(tmp_path / "None") for p in (tmp_path / "None").rglob("*")
+    )
+    parallel = sorted(
+        p.relative_to(tmp_path / "2") for p in (tmp_path / "2").rglob("*")
+    )
+    assert serial == parallel
+    for path in serial:
+        if path.suffix:
+            assert (tmp_path / "None" / path).read_bytes() == (
+                tmp_path / "2" / path
+            ).read_bytes()
+
+
+def test_save_incremental(repo_dir: "Path", tmp_path: "Path") -> None:
+    """Test that recursive saves only write changed modules."""
+    import owlready2
+    from ontopy import get_ontology
+
+    emmo = get_ontology(
+        repo_dir / "tests" / "testonto" / "emmo" / "emmo.ttl"
+    ).load()
+    for workers in None, 2:
+        outdir = tmp_path / str(workers)
+        emmo.save(format="turtle", dir=outdir, recursive=True, mkdir=True)
+        mtimes = {p: p.stat().st_mtime_ns for p in outdir.rglob("*.ttl")}
+        assert not emmo.changed
+
+        # Unchanged modules are not written again
+        emmo.save(
+            format="turtle",
+            dir=outdir,
+            recursive=True,
+            mkdir=True,
+            workers=workers,
+        )
+        assert {p: p.stat().st_mtime_ns for p in outdir.rglob("*.ttl")} == (
+            mtimes
+        )
+
+        # Only the changed module is written
+        module = emmo.get_imported_ontologies()[0]
+        with module:
+            cls = module.new_entity(f"NewClass{workers}", owlready2.Thing)
+        assert module.changed
+        assert not emmo.changed
+        emmo.save(
+            format="turtle",
+            dir=outdir,
+            recursive=True,
+            mkdir=True,
+            workers=workers,
+        )
+        assert not module.changed
+        changed = [
+            p
+            for p in outdir.rglob("*.ttl")
+            if p.stat().st_mtime_ns != mtimes[p]
+        ]
+        assert len(changed) == 1
+        assert f"NewClass{workers}" in changed[0].read_text(encoding="utf8")
+        owlready2.destroy_entity(cls)
+
+
+def test_save_incremental_files(
+    testonto: "Ontology", tmp_path: "Path", monkeypatch
+) -> None:
+    """Test that incremental saves write existing files in place and
+    honour changed namespaces."""
+    import os
+    import tempfile
+
+    import owlready2
+    import pytest
+
+    import ontopy.ontology
+
+    target = tmp_path / "target.ttl"
+    link = tmp_path / "link.ttl"
+    testonto.save(target)
+    target.chmod(0o644)
+    link.symlink_to(target)
+
+    new_class = testonto.new_entity("NewClass", testonto.TestClass)
+    testonto.save(link)
+    assert link.is_symlink()
+    assert "NewClass" in target.read_text(encoding="utf8")
+    assert target.stat().st_mode & 0o777 == 0o644
+
+    # Changed namespaces are written, even if the ontology is unchanged
+    outdir = tmp_path / "recursive"
+    testonto.save(dir=outdir, format="turtle", recursive=True, mkdir=True)
+    namespaces = {"tst": testonto.base_iri}
+    testonto.save(
+        dir=outdir, format="turtle", recursive=True, namespaces=namespaces
+    )
+    saved = outdir / f"{testonto.name}.ttl"
+    assert "@prefix tst:" in saved.read_text(encoding="utf8")
+    mtime = saved.stat().st_mtime_ns
+    testonto.save(
+        dir=outdir,
+        format="turtle",
+        recursive=True,
+        namespaces={"tst": testonto.base_iri},
+    )
+    assert saved.stat().st_mtime_ns == mtime
+
+    # Temporary files are removed if writing fails
+    def fail(*args, **kwargs):
+        raise RuntimeError("write error")
+
+    new_class2 = testonto.new_entity("NewClass2", testonto.TestClass)
+    monkeypatch.setattr(ontopy.ontology, "write_graph", fail)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+    os.mkdir(tmp_path / "tmp")
+    with pytest.raises(RuntimeError):
+        testonto.save(target)
+    assert not os.listdir(tmp_path / "tmp")
+    assert sorted(os.listdir(tmp_path)) == [
+        "link.ttl",
+        "recursive",
+        "target.ttl",
+        "tmp",
+    ]
+    owlready2.destroy_entity(new_class)
+    owlready2.destroy_entity(new_class2)
@@ -0,0 +1,37 @@
+"""Tests for the `ontokit cache` sub-command."""
+
+from argparse import Namespace
+
+from ontopy.ontokit.cache import cache_subcommand
+
+
+def test_cache_subcommand(tmp_path, capsys):
+    """Check listing and clearing the HTTP cache."""
+    from ontopy.httpcache import HTTPCache
+
+    cache = HTTPCache(tmp_path)
+    (tmp_path / "objects").mkdir()
+    source = tmp_path / "objects" / ".tmpdownload"
+    source.write_text("<http://example.com/onto> a <http://example.com/C> .")
+    url = "http://example.com/onto.ttl"
+    cache._store(  # pylint: disable=protected-access
+        url, str(source), url, {"Content-Type": "text/turtle"}
+    )
+
+    def run(action, *urls):
+        args = Namespace(
+            action=action,
+            urls=list(urls),
+            cache_dir=str(tmp_path),
+            max_age=None,
+            ttl=0,
+        )
+        return cache_subcommand(args)
+
+    assert run("list") == 0
+    assert url in capsys.readouterr().out
+    assert run("remove", url) == 0
+    assert not list(cache.entries())
+    assert not list(tmp_path.glob("objects/*"))
+    assert run("clear") == 0
+    assert not (tmp_path / "index").exists()